@@ -6,12 +6,17 @@ Aplicar Escenario Monte Carlo al Modelo
 
 Este script toma un escenario generado por Monte Carlo y lo integra
 en el archivo Parametros_Finales.xlsx para ser usado por el modelo.
+
+Alternativamente, escenario_en_memoria() arma los parámetros de un escenario
+sin reescribir el Excel, y resolver_escenarios() resuelve varios escenarios
+en paralelo dentro de un pool de procesos.
 """
 
 import pandas as pd
 import numpy as np
 import sys
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -19,6 +24,13 @@ from pathlib import Path
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
+# Los módulos del modelo viven en la raíz del proyecto
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from parametros_laja import ParametrosLaja
+from cargar_datos_5temporadas import afluentes_desde_escenario, cargar_escenarios_afluentes
+
 ARCHIVO_EXCEL = PROJECT_ROOT / 'Parametros_Nuevos.xlsx'
 BACKUP_DIR = SCRIPT_DIR / 'backups_parametros'
 ESCENARIOS_DIR = SCRIPT_DIR / 'escenarios_montecarlo'
@@ -82,9 +94,11 @@ def aplicar_escenario(num_escenario=None, usar_promedio=False):
     
     print(f"  Datos: {len(df_escenario)} filas")
     
-    # Cargar el Excel de parámetros para obtener el formato original
+    # Cargar el Excel de parámetros (una sola apertura): formato original de QA y todas las hojas
     print(f"\n📂 Cargando {ARCHIVO_EXCEL}...")
-    df_qa_original = pd.read_excel(ARCHIVO_EXCEL, sheet_name='QA_a,w,t', header=None)
+    with pd.ExcelFile(ARCHIVO_EXCEL, engine='openpyxl') as libro:
+        df_qa_original = libro.parse('QA_a,w,t', header=None)
+        excel_data = pd.read_excel(libro, sheet_name=None)
     
     # Guardar nombres de columnas originales (primera fila con fechas)
     columnas_originales = df_qa_original.iloc[0, :].tolist()
@@ -139,12 +153,6 @@ def aplicar_escenario(num_escenario=None, usar_promedio=False):
     print(f"  Primeras 5 filas:")
     print(df_qa_nuevo.head())
     
-    # Cargar todas las hojas del Excel
-    excel_data = pd.read_excel(ARCHIVO_EXCEL, sheet_name=None)
-    
-    # Cargar todas las hojas del Excel
-    excel_data = pd.read_excel(ARCHIVO_EXCEL, sheet_name=None)
-    
     # Reemplazar la hoja QA_a,w,t
     excel_data['QA_a,w,t'] = df_qa_nuevo
     
@@ -176,6 +184,117 @@ def aplicar_escenario(num_escenario=None, usar_promedio=False):
     print("\n" + "=" * 70)
 
 
+def escenario_en_memoria(parametros_base, qa_escenario):
+    """
+    Parámetros de un escenario Monte Carlo, sin tocar Parametros_Nuevos.xlsx
+    
+    Parámetros:
+    -----------
+    parametros_base : ParametrosLaja o dict, p. ej. cargar_parametros_excel()
+    qa_escenario : array (6, 48, T) con los afluentes del escenario, p. ej. tensor[s]
+                   de cargar_escenarios_afluentes()
+    
+    Retorna:
+    --------
+    ParametrosLaja nuevo, listo para ModeloLajaLatex.cargar_parametros. El
+    diccionario base no se modifica y puede reutilizarse para otros escenarios.
+    """
+    return ParametrosLaja.desde_dict(parametros_base).con_afluentes(qa_escenario)
+
+
+def qa_escenario_promedio():
+    """Afluentes del escenario promedio como arreglo (6, 48, T)"""
+    return afluentes_desde_escenario(pd.read_excel(ESCENARIOS_DIR / 'escenario_promedio.xlsx'))
+
+
+# Modelo construido una vez por proceso trabajador (ver _iniciar_trabajador)
+_MODELO_TRABAJADOR = None
+
+
+def _iniciar_trabajador(parametros_base, hilos):
+    """
+    Construye el modelo una sola vez en cada proceso del pool
+    
+    Los escenarios siguientes solo cambian QA con actualizar_afluentes(), sin
+    reconstruir el modelo, y parten de la solución del escenario anterior.
+    """
+    global _MODELO_TRABAJADOR
+    from modelo_laja_latex import ModeloLajaLatex
+    
+    modelo = ModeloLajaLatex()
+    modelo.cargar_parametros(parametros_base)
+    modelo.construir_modelo()
+    if hilos:
+        modelo.model.Params.Threads = hilos
+    _MODELO_TRABAJADOR = modelo
+
+
+def _resolver_escenario(tarea):
+    """
+    Resuelve un escenario en un proceso trabajador, reutilizando su modelo
+    
+    Debe estar a nivel de módulo para que ProcessPoolExecutor pueda enviarla.
+    """
+    qa, num_escenario, time_limit, mip_gap, carpeta_salida = tarea
+    modelo = _MODELO_TRABAJADOR
+    
+    modelo.actualizar_afluentes(qa)
+    modelo.optimizar(time_limit=time_limit, mip_gap=mip_gap)
+    
+    resultado = {
+        'Escenario': num_escenario,
+        'Estado': modelo.model.Status,
+        'Objetivo': modelo.model.ObjVal if modelo.model.SolCount > 0 else np.nan,
+        'Cota': modelo.model.ObjBound if modelo.model.IsMIP and modelo.model.SolCount > 0 else np.nan,
+        'Tiempo_s': modelo.model.Runtime,
+    }
+    if carpeta_salida is not None:
+        modelo.exportar_resultados(str(Path(carpeta_salida) / f'escenario_{num_escenario:03d}'))
+    return resultado
+
+
+def resolver_escenarios(parametros_base, tensor, numeros, procesos=None, time_limit=600,
+                        mip_gap=0.02, hilos_por_proceso=1, carpeta_salida=None):
+    """
+    Resuelve varios escenarios en paralelo, todos en memoria
+    
+    Cada proceso construye el modelo una sola vez y luego solo actualiza los
+    afluentes de cada escenario (con procesos=1 el barrido es secuencial y
+    se construye un único modelo).
+    
+    Parámetros:
+    -----------
+    parametros_base : ParametrosLaja o dict con los parámetros comunes
+    tensor : array (S, 6, 48, T) de cargar_escenarios_afluentes()
+    numeros : números de escenario N de cada índice s del tensor
+    procesos : número de procesos del pool (None: uno por núcleo)
+    hilos_por_proceso : Threads de Gurobi en cada proceso (evita sobre-suscribir la CPU)
+    carpeta_salida : si se entrega, exporta cada escenario a <carpeta>/escenario_NNN
+    
+    Retorna:
+    --------
+    DataFrame con estado, objetivo, cota y tiempo por escenario
+    """
+    parametros_base = ParametrosLaja.desde_dict(parametros_base)
+    tareas = [
+        (np.asarray(tensor[s]), n, time_limit, mip_gap, carpeta_salida)
+        for s, n in enumerate(numeros)
+    ]
+    
+    print(f"\n🚀 Resolviendo {len(tareas)} escenarios en paralelo (procesos={procesos or 'auto'})...")
+    resultados = []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                             initargs=(parametros_base, hilos_por_proceso)) as pool:
+        futuros = [pool.submit(_resolver_escenario, tarea) for tarea in tareas]
+        for futuro in as_completed(futuros):
+            resultado = futuro.result()
+            resultados.append(resultado)
+            print(f"  ✓ Escenario #{resultado['Escenario']}: objetivo {resultado['Objetivo']:,.2f} GWh "
+                  f"({resultado['Tiempo_s']:.1f} s)")
+    
+    return pd.DataFrame(resultados).sort_values('Escenario').reset_index(drop=True)
+
+
 if __name__ == '__main__':
     import os
     
@@ -190,6 +309,16 @@ if __name__ == '__main__':
         arg = sys.argv[1]
         if arg.lower() == 'promedio':
             aplicar_escenario(usar_promedio=True)
+        elif arg.lower() == 'resolver':
+            # Resolver todos los escenarios en memoria, en paralelo, sin reescribir el Excel
+            from cargar_datos_5temporadas import cargar_parametros_excel
+            procesos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            parametros = cargar_parametros_excel(str(ARCHIVO_EXCEL))
+            tensor, numeros = cargar_escenarios_afluentes(TODOS_ESCENARIOS_FILE, memmap=True)
+            df_resultados = resolver_escenarios(parametros, tensor, numeros, procesos=procesos,
+                                                carpeta_salida=SCRIPT_DIR / 'resultados_escenarios')
+            df_resultados.to_csv(SCRIPT_DIR / 'resultados_escenarios' / 'resumen_escenarios.csv', index=False)
+            print(df_resultados.to_string(index=False))
         elif arg.isdigit():
             num = int(arg)
             if 1 <= num <= 100:
@@ -198,9 +327,10 @@ if __name__ == '__main__':
                 print("❌ Error: El número de escenario debe estar entre 1 y 100")
                 sys.exit(1)
         else:
-            print("Uso: python3 aplicar_escenario_montecarlo.py [promedio|1-100]")
+            print("Uso: python3 aplicar_escenario_montecarlo.py [promedio|1-100|resolver [procesos]]")
             print("  promedio: aplica el escenario promedio")
             print("  1-100: aplica el escenario específico")
+            print("  resolver: resuelve todos los escenarios en memoria y en paralelo")
             sys.exit(1)
     else:
         # Por defecto: mostrar menú
@@ -3,17 +3,62 @@ Script para cargar los parámetros desde el archivo Excel
 Versión para 5 temporadas
 """
 
+import contextlib
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 
-def cargar_nombres_centrales(archivo_excel="Parametros_Nuevos.xlsx"):
+from parametros_laja import ParametrosLaja
+
+# Versión del cargador: se incluye en la clave del caché, por lo que cualquier
+# cambio en la forma de leer el Excel debe incrementarla para invalidar cachés
+VERSION_CARGADOR = 3
+
+# Hojas del libro de parámetros que se leen con encabezado en la primera fila
+HOJAS_PARAMETROS = ['Generales', 'f_k', 'v_k', 'vr_k', 'vg_k', 'QD_d,j,w', 'Gamma_i', 'Rho_i', 'FS_w']
+# Hoja de afluentes: tiene dos filas de encabezado propias, se lee sin encabezado
+HOJA_AFLUENTES = 'QA_a,w,t'
+
+def abrir_libro(archivo_excel="Parametros_Nuevos.xlsx"):
+    """
+    Abre el libro de parámetros una sola vez para compartirlo entre lectores
+    
+    Returns:
+        pd.ExcelFile: Libro abierto (usar como context manager para cerrarlo)
+    """
+    return pd.ExcelFile(archivo_excel, engine='openpyxl')
+
+def leer_hojas_parametros(libro):
+    """
+    Lee en una sola pasada todas las hojas que necesita cargar_parametros_excel
+    
+    Args:
+        libro: pd.ExcelFile ya abierto (ver abrir_libro)
+    
+    Returns:
+        dict: {nombre_hoja: DataFrame}. Si la hoja de afluentes no existe, no se incluye.
+    """
+    hojas = pd.read_excel(libro, sheet_name=HOJAS_PARAMETROS)
+    if HOJA_AFLUENTES in libro.sheet_names:
+        hojas[HOJA_AFLUENTES] = libro.parse(HOJA_AFLUENTES, header=None)
+    return hojas
+
+def cargar_nombres_centrales(archivo_excel="Parametros_Nuevos.xlsx", libro=None):
     """
     Carga los nombres de las centrales desde la hoja Índices
     
+    Args:
+        archivo_excel: Ruta al libro de parámetros
+        libro: pd.ExcelFile ya abierto; si se entrega, se reutiliza en vez de abrir el archivo
+    
     Returns:
         dict: Diccionario {i: nombre_central} para i=1..16
     """
-    df_indices = pd.read_excel(archivo_excel, sheet_name='Índices')
+    df_indices = pd.read_excel(libro if libro is not None else archivo_excel, sheet_name='Índices')
     
     # Extraer columnas de Centrales (asumiendo que están en las dos primeras columnas)
     centrales_df = df_indices[['Centrales', 'Unnamed: 1']].dropna()
@@ -33,139 +78,222 @@ def cargar_nombres_centrales(archivo_excel="Parametros_Nuevos.xlsx"):
     
     return nombres
 
-def cargar_parametros_excel(archivo_excel="Parametros_Nuevos.xlsx"): 
+def _huella_archivo(archivo_excel):
+    """
+    Calcula la huella SHA-256 del contenido del archivo junto a la versión del cargador
+    """
+    h = hashlib.sha256()
+    h.update(f"cargador-v{VERSION_CARGADOR}".encode())
+    with open(archivo_excel, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def _ruta_cache(archivo_excel):
+    """Ruta del caché compilado, junto al libro: Parametros_Nuevos.xlsx -> Parametros_Nuevos.cache.npz"""
+    ruta = Path(archivo_excel)
+    return ruta.with_name(f"{ruta.stem}.cache.npz")
+
+def _guardar_cache(ruta_cache, huella, parametros, nombres_centrales=None):
+    """
+    Guarda los arreglos de ParametrosLaja en formato .npz (sin pickle), junto
+    a los nombres de las centrales si se entregan
+    """
+    arreglos = parametros.a_arreglos()
+    arreglos['__huella__'] = np.array(huella)
+    arreglos['__version__'] = np.array(VERSION_CARGADOR)
+    if nombres_centrales is not None:
+        arreglos['__centrales__'] = np.array(list(nombres_centrales.keys()), dtype=np.int64)
+        arreglos['__nombres_centrales__'] = np.array(list(nombres_centrales.values()), dtype=np.str_)
+    
+    # Escritura atómica: archivo temporal en la misma carpeta y luego reemplazo
+    fd, ruta_tmp = tempfile.mkstemp(dir=ruta_cache.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arreglos)
+        os.replace(ruta_tmp, ruta_cache)
+    except BaseException:
+        os.remove(ruta_tmp)
+        raise
+
+def _leer_cache(ruta_cache, huella):
+    """
+    Lee el caché compilado si existe y corresponde a la huella dada
+    
+    Returns:
+        tuple: (parametros, nombres_centrales) con parametros ParametrosLaja o
+               None si el caché no es válido, y nombres_centrales None si el
+               caché no los guarda
+    """
+    if not ruta_cache.exists():
+        return None, None
+    
+    with np.load(ruta_cache, allow_pickle=False) as datos:
+        if str(datos['__huella__']) != huella or int(datos['__version__']) != VERSION_CARGADOR:
+            return None, None
+        nombres = None
+        if '__nombres_centrales__' in datos.files:
+            nombres = dict(zip(datos['__centrales__'].tolist(), datos['__nombres_centrales__'].tolist()))
+        parametros = ParametrosLaja.desde_arreglos({c: datos[c] for c in datos.files if not c.startswith('__')})
+        return parametros, nombres
+
+def _cargar_con_cache(archivo_excel, usar_cache, libro, con_nombres):
+    """
+    Parámetros y, si con_nombres, nombres de centrales (None si no) desde el
+    caché compilado o desde el libro (ver cargar_parametros_excel)
+    """
+    if not usar_cache:
+        if not con_nombres:
+            return _leer_parametros_excel(archivo_excel, libro), None
+        with contextlib.ExitStack() as pila:
+            if libro is None:
+                libro = pila.enter_context(abrir_libro(archivo_excel))
+            return _leer_parametros_excel(archivo_excel, libro), cargar_nombres_centrales(libro=libro)
+    
+    huella = _huella_archivo(archivo_excel)
+    ruta_cache = _ruta_cache(archivo_excel)
+    
+    try:
+        parametros, nombres = _leer_cache(ruta_cache, huella)
+    except Exception as e:
+        print(f"  ⚠ Caché de parámetros ilegible ({e}), se regenerará")
+        parametros, nombres = None, None
+    
+    if parametros is not None and (nombres is not None or not con_nombres):
+        print(f"✓ Parámetros cargados desde caché '{ruta_cache.name}'")
+        return parametros, nombres
+    
+    parametros, nombres_leidos = _cargar_con_cache(archivo_excel, False, libro, con_nombres)
+    nombres = nombres_leidos if con_nombres else nombres
+    
+    try:
+        _guardar_cache(ruta_cache, huella, parametros, nombres)
+        print(f"✓ Caché de parámetros actualizado: '{ruta_cache.name}'")
+    except OSError as e:
+        print(f"  ⚠ No se pudo escribir el caché de parámetros: {e}")
+    
+    return parametros, nombres
+
+def cargar_parametros_excel(archivo_excel="Parametros_Nuevos.xlsx", usar_cache=True, libro=None):
     """
     Carga todos los parámetros desde el archivo Excel para modelo de 5 temporadas
     
+    Si usar_cache es True, se mantiene un caché compilado junto al libro
+    (<nombre>.cache.npz) indexado por el hash del contenido del Excel y la
+    versión del cargador. Si el caché es válido se devuelve directamente;
+    si no existe o está desactualizado, se lee el Excel y se regenera.
+    
+    Args:
+        archivo_excel: Ruta al libro de parámetros
+        usar_cache: Usar (y regenerar si hace falta) el caché compilado
+        libro: pd.ExcelFile ya abierto del mismo archivo; evita reabrirlo si hay que leerlo
+    
     Returns:
-        dict: Diccionario con todos los parámetros del modelo
+        ParametrosLaja: Parámetros del modelo (arreglos NumPy con vista tipo diccionario)
+    """
+    return _cargar_con_cache(archivo_excel, usar_cache, libro, con_nombres=False)[0]
+
+def cargar_parametros_y_nombres(archivo_excel="Parametros_Nuevos.xlsx", usar_cache=True):
+    """
+    Carga parámetros y nombres de centrales
+    
+    Los nombres se guardan en el mismo caché que los parámetros, así que con
+    el caché válido no se abre el libro; si no, se abre una sola vez para
+    ambas lecturas.
+    
+    Returns:
+        tuple: (parametros, nombres_centrales)
+    """
+    return _cargar_con_cache(archivo_excel, usar_cache, None, con_nombres=True)
+
+def _leer_parametros_excel(archivo_excel, libro=None):
+    """
+    Lee todos los parámetros directamente desde el archivo Excel (sin caché)
+    
+    Todas las hojas se obtienen en una sola pasada sobre el libro abierto.
+    
+    Returns:
+        ParametrosLaja: Parámetros del modelo
     """
     print("\n" + "="*60)
     print("CARGANDO PARÁMETROS DESDE EXCEL (5 TEMPORADAS)")
     print("="*60 + "\n")
     
-    parametros = {}
+    if libro is None:
+        with abrir_libro(archivo_excel) as libro:
+            hojas = leer_hojas_parametros(libro)
+    else:
+        hojas = leer_hojas_parametros(libro)
+    
+    escalares = {}
+    arreglos = {}
+    mascaras = {}
     
     # 1. GENERALES (V_30Nov_1, V_0, V_MIN, V_MAX, V_F, psi, nu)
     print("Cargando parámetros generales...")
-    df_generales = pd.read_excel(archivo_excel, sheet_name='Generales')
+    df_generales = hojas['Generales']
     
-    # Leer valores de la primera columna como índice
-    for _, row in df_generales.iterrows():
-        param = str(row.iloc[0])
+    # Leer valores de la primera columna como índice (pocas filas, reglas por nombre)
+    for param, valor in zip(df_generales.iloc[:, 0].astype(str), df_generales.iloc[:, 1]):
         if 'V_30Nov' in param or 'V_30_Nov' in param:
-            parametros['V_30Nov_1'] = float(row.iloc[1])
+            escalares['V_30Nov_1'] = float(valor)
         elif 'V_0' in param or 'V_inicial' in param or 'Volumen inicial' in param:
-            parametros['V_0'] = float(row.iloc[1])
+            escalares['V_0'] = float(valor)
         elif 'V_MAX' in param:
-            parametros['V_MAX'] = float(row.iloc[1])
+            escalares['V_MAX'] = float(valor)
         elif 'V_MIN' in param or 'V_min' in param:
-            parametros['V_MIN'] = float(row.iloc[1])
+            escalares['V_MIN'] = float(valor)
         elif 'V_F' in param or 'V_final' in param:
-            parametros['V_F'] = float(row.iloc[1])
+            escalares['V_F'] = float(valor)
         elif 'psi' in param:
-            parametros['psi'] = float(row.iloc[1])  # [GWh]
+            escalares['psi'] = float(valor)  # [GWh]
         elif 'nu' in param or 'phi' in param:
-            parametros['nu'] = float(row.iloc[1])  # [GWh] - nu en LaTeX
+            escalares['nu'] = float(valor)  # [GWh] - nu en LaTeX
         elif 'M' in param and 'MAX' not in param and 'MIN' not in param and 'V_' not in param:
-            parametros['M'] = float(row.iloc[1])
+            escalares['M'] = float(valor)
     
-    print(f"  V_30Nov_1 = {parametros.get('V_30Nov_1', 'N/A')} hm³")
-    print(f"  V_0 = {parametros.get('V_0', 'N/A')} hm³")
-    print(f"  V_MIN = {parametros.get('V_MIN', 'N/A')} hm³")
-    print(f"  V_MAX = {parametros.get('V_MAX', 'N/A')} hm³")
-    print(f"  V_F = {parametros.get('V_F', 'N/A')} hm³")
-    print(f"  psi (incumplimiento) = {parametros.get('psi', 'N/A')} GWh")
-    print(f"  nu (umbral V_MIN/V_MAX) = {parametros.get('nu', 'N/A')} GWh")
-    print(f"  M (Big-M) = {parametros.get('M', 'N/A')}")
+    print(f"  V_30Nov_1 = {escalares.get('V_30Nov_1', 'N/A')} hm³")
+    print(f"  V_0 = {escalares.get('V_0', 'N/A')} hm³")
+    print(f"  V_MIN = {escalares.get('V_MIN', 'N/A')} hm³")
+    print(f"  V_MAX = {escalares.get('V_MAX', 'N/A')} hm³")
+    print(f"  V_F = {escalares.get('V_F', 'N/A')} hm³")
+    print(f"  psi (incumplimiento) = {escalares.get('psi', 'N/A')} GWh")
+    print(f"  nu (umbral V_MIN/V_MAX) = {escalares.get('nu', 'N/A')} GWh")
+    print(f"  M (Big-M) = {escalares.get('M', 'N/A')}")
     
     # 2. f_k (Filtraciones por zona) - NOMBRE ACTUALIZADO
+    # Buscar columnas: 'k' y 'f' (no 'f_k'); se mantiene FC internamente para compatibilidad
     print("\nCargando filtraciones f_k...")
-    df_fk = pd.read_excel(archivo_excel, sheet_name='f_k')
-    parametros['FC'] = {}  # Se mantiene FC internamente para compatibilidad
-    
-    # Buscar columnas: 'k' y 'f' (no 'f_k')
-    if 'k' in df_fk.columns and 'f' in df_fk.columns:
-        for _, row in df_fk.iterrows():
-            k = int(row['k'])
-            parametros['FC'][k] = float(row['f'])
-    elif 'k' in df_fk.columns and 'f_k' in df_fk.columns:
-        for _, row in df_fk.iterrows():
-            k = int(row['k'])
-            parametros['FC'][k] = float(row['f_k'])
-    elif df_fk.shape[1] >= 2:
-        for _, row in df_fk.iterrows():
-            if pd.notna(row.iloc[0]):
-                k = int(row.iloc[0])
-                parametros['FC'][k] = float(row.iloc[1])
-    
-    print(f"  Cargadas {len(parametros['FC'])} zonas")
-    print(f"  Rango zonas: {min(parametros['FC'].keys())} - {max(parametros['FC'].keys())}")
+    k_fc, valores_fc = _tabla_indice_valor(hojas['f_k'], 'k', ['f', 'f_k'])
+    arreglos['FC'], mascaras['FC'] = _arreglo_indexado(k_fc[:, None], valores_fc)
+    
+    print(f"  Cargadas {len(np.unique(k_fc))} zonas")
+    print(f"  Rango zonas: {k_fc.min()} - {k_fc.max()}")
     
     # 3. v_k (Volumen por zona) - NOMBRE ACTUALIZADO
+    # Buscar columnas: 'k' y 'v' (no 'v_k'); se mantiene VC internamente para compatibilidad
     print("\nCargando volúmenes v_k...")
-    df_vk = pd.read_excel(archivo_excel, sheet_name='v_k')
-    parametros['VC'] = {}  # Se mantiene VC internamente para compatibilidad
-    
-    # Buscar columnas: 'k' y 'v' (no 'v_k')
-    if 'k' in df_vk.columns and 'v' in df_vk.columns:
-        for _, row in df_vk.iterrows():
-            k = int(row['k'])
-            parametros['VC'][k] = float(row['v'])
-    elif 'k' in df_vk.columns and 'v_k' in df_vk.columns:
-        for _, row in df_vk.iterrows():
-            k = int(row['k'])
-            parametros['VC'][k] = float(row['v_k'])
-    elif df_vk.shape[1] >= 2:
-        for _, row in df_vk.iterrows():
-            if pd.notna(row.iloc[0]):
-                k = int(row.iloc[0])
-                parametros['VC'][k] = float(row.iloc[1])
-    
-    print(f"  Cargados {len(parametros['VC'])} volúmenes")
-    print(f"  Rango: {min(parametros['VC'].values()):.2f} - {max(parametros['VC'].values()):.2f} hm³")
+    k_vc, valores_vc = _tabla_indice_valor(hojas['v_k'], 'k', ['v', 'v_k'])
+    arreglos['VC'], mascaras['VC'] = _arreglo_indexado(k_vc[:, None], valores_vc)
+    
+    print(f"  Cargados {len(np.unique(k_vc))} volúmenes")
+    print(f"  Rango: {valores_vc.min():.2f} - {valores_vc.max():.2f} hm³")
     
     # 4. vr_k y vg_k (Volumen por uso y zona) - NOMBRES ACTUALIZADOS
+    # VUC[(1, k)] = vr_k (riego, columna 'VR'), VUC[(2, k)] = vg_k (generación, columna 'VG')
     print("\nCargando volúmenes por uso vr_k y vg_k...")
-    df_vrk = pd.read_excel(archivo_excel, sheet_name='vr_k')
-    df_vgk = pd.read_excel(archivo_excel, sheet_name='vg_k')
-    parametros['VUC'] = {}
-    
-    # vr_k (Riego, u=1) - Buscar columnas: 'k' y 'VR' (no 'vr_k')
-    if 'k' in df_vrk.columns and 'VR' in df_vrk.columns:
-        for _, row in df_vrk.iterrows():
-            k = int(row['k'])
-            parametros['VUC'][(1, k)] = float(row['VR'])
-    elif 'k' in df_vrk.columns and 'vr_k' in df_vrk.columns:
-        for _, row in df_vrk.iterrows():
-            k = int(row['k'])
-            parametros['VUC'][(1, k)] = float(row['vr_k'])
-    elif df_vrk.shape[1] >= 2:
-        for _, row in df_vrk.iterrows():
-            if pd.notna(row.iloc[0]):
-                k = int(row.iloc[0])
-                parametros['VUC'][(1, k)] = float(row.iloc[1])
-    
-    # vg_k (Generación, u=2) - Buscar columnas: 'k' y 'VG' (no 'vg_k')
-    if 'k' in df_vgk.columns and 'VG' in df_vgk.columns:
-        for _, row in df_vgk.iterrows():
-            k = int(row['k'])
-            parametros['VUC'][(2, k)] = float(row['VG'])
-    elif 'k' in df_vgk.columns and 'vg_k' in df_vgk.columns:
-        for _, row in df_vgk.iterrows():
-            k = int(row['k'])
-            parametros['VUC'][(2, k)] = float(row['vg_k'])
-    elif df_vgk.shape[1] >= 2:
-        for _, row in df_vgk.iterrows():
-            if pd.notna(row.iloc[0]):
-                k = int(row.iloc[0])
-                parametros['VUC'][(2, k)] = float(row.iloc[1])
-    
-    print(f"  Cargados {len(parametros['VUC'])} volúmenes de uso")
+    k_vr, valores_vr = _tabla_indice_valor(hojas['vr_k'], 'k', ['VR', 'vr_k'])
+    k_vg, valores_vg = _tabla_indice_valor(hojas['vg_k'], 'k', ['VG', 'vg_k'])
+    posiciones_vuc = np.concatenate([
+        np.column_stack([np.full(len(k_vr), 1), k_vr]),
+        np.column_stack([np.full(len(k_vg), 2), k_vg]),
+    ]).astype(np.int64)
+    arreglos['VUC'], mascaras['VUC'] = _arreglo_indexado(posiciones_vuc, np.concatenate([valores_vr, valores_vg]))
+    
+    print(f"  Cargados {_contar_presentes(arreglos['VUC'], mascaras['VUC'])} volúmenes de uso")
     
     # 5. QA_a,w,t (Afluentes por semana y temporada - 6 afluentes)
     print("\nCargando afluentes QA_a,w,t...")
-    parametros['QA'] = {}
     
     # Nombres de afluentes
     afluentes_nombres = {
@@ -179,198 +307,325 @@ def cargar_parametros_excel(archivo_excel="Parametros_Nuevos.xlsx"):
     
     # Leer datos desde hoja única QA_a,w,t
     try:
-        sheet_name = 'QA_a,w,t'
-        df_qa = pd.read_excel(archivo_excel, sheet_name=sheet_name, header=None)
+        sheet_name = HOJA_AFLUENTES
+        df_qa = hojas[sheet_name]
         print(f"  Leyendo desde hoja '{sheet_name}'...")
         
         # Estructura: 
-        # Fila 0-1: encabezados
+        # Fila 0-1: encabezados (fila 1: número de semana en columnas 2..)
         # Columna 0: temporada (t)
         # Columna 1: nombre afluente
         # Columnas 2-49: semanas 1-48
         # Filas: 6 afluentes por temporada (ELTORO, ABANICO, ANTUCO, TUCAPEL, CANECOL, LAJA_I)
+        arreglos['QA'], mascaras['QA'] = _afluentes_desde_hoja(df_qa)
         
-        # Mapeo de nombres de afluentes a índices
-        afluentes_map = {
-            'ELTORO': 1,
-            'ABANICO': 2,
-            'ANTUCO': 3,
-            'TUCAPEL': 4,
-            'CANECOL': 5,
-            'LAJA_I': 6  # Sexto afluente
-        }
-        
-        # Leer desde fila 2 en adelante (saltando encabezados)
-        for row_idx in range(2, df_qa.shape[0]):
-            try:
-                # Leer temporada y nombre del afluente
-                t = int(df_qa.iloc[row_idx, 0])
-                nombre_afluente = str(df_qa.iloc[row_idx, 1]).strip().upper()
-                
-                # Obtener índice del afluente
-                if nombre_afluente in afluentes_map:
-                    a = afluentes_map[nombre_afluente]
-                    
-                    # Cargar todos los afluentes (1-6)
-                    # Leer las 48 semanas (columnas 2-49)
-                    for w in range(1, 49):
-                        col_idx = w + 1  # Columna 2 = semana 1, ..., columna 49 = semana 48
-                        try:
-                            valor = df_qa.iloc[row_idx, col_idx]
-                            parametros['QA'][(a, w, t)] = float(valor) if pd.notna(valor) else 0.0
-                        except:
-                            parametros['QA'][(a, w, t)] = 0.0
-            except Exception as e:
-                continue
-        
-        # Contar cuántas temporadas se cargaron
-        temporadas_cargadas = set()
-        afluentes_cargados = set()
-        for (a, w, t) in parametros['QA'].keys():
-            temporadas_cargadas.add(t)
-            afluentes_cargados.add(a)
-        
-        for t in sorted(temporadas_cargadas):
+        # Contar cuántas temporadas y afluentes se cargaron
+        presentes = mascaras['QA'] if mascaras['QA'] is not None else np.ones(arreglos['QA'].shape, dtype=bool)
+        cargados = presentes.any(axis=1)  # (a, t)
+        for t in np.flatnonzero(cargados.any(axis=0)) + 1:
             print(f"  ✓ Cargada temporada {t}")
         
         # Mostrar afluentes cargados
-        afluentes_nombres_map = {1: 'ELTORO', 2: 'ABANICO', 3: 'ANTUCO', 4: 'TUCAPEL', 5: 'CANECOL', 6: 'LAJA_I'}
+        afluentes_cargados = np.flatnonzero(cargados.any(axis=1)) + 1
         print(f"  ✓ Afluentes cargados ({len(afluentes_cargados)}): ", end="")
-        print(", ".join([f"{a}:{afluentes_nombres_map[a]}" for a in sorted(afluentes_cargados)]))
+        print(", ".join([f"{a}:{afluentes_nombres.get(a, '?')}" for a in afluentes_cargados]))
             
     except Exception as e:
         print(f"  ⚠ Error cargando hoja 'QA_a,w,t': {e}")
-        # Si falla, llenar con ceros
-        for t in range(1, 7):
-            for a in range(1, 7):  # Ahora incluye afluente 6
-                for w in range(1, 49):
-                    parametros['QA'][(a, w, t)] = 0.0
+        # Si falla, llenar con ceros (6 afluentes, 48 semanas, 6 temporadas)
+        arreglos['QA'], mascaras['QA'] = np.zeros((6, 48, 6)), None
     
-    print(f"  Total cargados: {len(parametros['QA'])} valores de afluentes")
-    print(f"  Afluentes: 1-6, Semanas: 1-48, Temporadas: 1-6")
+    QA = arreglos['QA']
+    print(f"  Total cargados: {_contar_presentes(QA, mascaras['QA'])} valores de afluentes")
+    print(f"  Afluentes: 1-{QA.shape[0]}, Semanas: 1-{QA.shape[1]}, Temporadas: 1-{QA.shape[2]}")
     
     # Mostrar ejemplos
-    print(f"  Ejemplo QA[a=1,w=1,t=1] = {parametros['QA'][(1,1,1)]:.2f} m³/s")
-    print(f"  Ejemplo QA[a=2,w=1,t=1] = {parametros['QA'][(2,1,1)]:.2f} m³/s")
-    if (6, 1, 1) in parametros['QA']:
-        print(f"  Ejemplo QA[a=6,w=1,t=1] (LAJA_I) = {parametros['QA'][(6,1,1)]:.2f} m³/s")
+    print(f"  Ejemplo QA[a=1,w=1,t=1] = {QA[0, 0, 0]:.2f} m³/s")
+    print(f"  Ejemplo QA[a=2,w=1,t=1] = {QA[1, 0, 0]:.2f} m³/s")
+    if QA.shape[0] >= 6:
+        print(f"  Ejemplo QA[a=6,w=1,t=1] (LAJA_I) = {QA[5, 0, 0]:.2f} m³/s")
     
     # 6. QD_d,j,w (Demandas de riego - sin temporada, se repite cada año)
-    print("\nCargando demandas de riego QD_d,j,w...")
-    df_qd = pd.read_excel(archivo_excel, sheet_name='QD_d,j,w')
-    parametros['QD'] = {}
-    
     # Estructura: j | d | 1 | 2 | 3 | ... | 48
-    for _, row in df_qd.iterrows():
-        j = int(row['j'])
-        d = int(row['d'])
-        for w in range(1, 49):  # 48 semanas
-            # Intentar leer el valor
-            try:
-                if w in df_qd.columns:
-                    valor = float(row[w])
-                elif str(w) in df_qd.columns:
-                    valor = float(row[str(w)])
-                else:
-                    valor = 0.0
-                parametros['QD'][(d, j, w)] = valor
-            except:
-                parametros['QD'][(d, j, w)] = 0.0
-    
-    print(f"  Cargados {len(parametros['QD'])} valores de demanda")
+    print("\nCargando demandas de riego QD_d,j,w...")
+    df_qd = hojas['QD_d,j,w']
+    columnas_semana = [w if w in df_qd.columns else str(w) for w in range(1, 49)]
+    valores_qd = df_qd.reindex(columns=columnas_semana).apply(pd.to_numeric, errors='coerce')
+    valores_qd = valores_qd.fillna(0.0).to_numpy(dtype=np.float64)  # (filas, 48)
+    d_qd = df_qd['d'].to_numpy(dtype=np.int64)
+    j_qd = df_qd['j'].to_numpy(dtype=np.int64)
+    
+    n_filas, n_semanas = valores_qd.shape
+    posiciones_qd = np.column_stack([
+        np.repeat(d_qd, n_semanas),
+        np.repeat(j_qd, n_semanas),
+        np.tile(np.arange(1, n_semanas + 1), n_filas),
+    ])
+    arreglos['QD'], mascaras['QD'] = _arreglo_indexado(posiciones_qd, valores_qd.ravel())
+    
+    print(f"  Cargados {_contar_presentes(arreglos['QD'], mascaras['QD'])} valores de demanda")
     
     # Mostrar ejemplos
-    if (1, 1, 1) in parametros['QD']:
-        print(f"    QD[d=1,j=1,w=1] = {parametros['QD'][(1,1,1)]:.2f} m³/s")
-    if (1, 4, 1) in parametros['QD']:
-        print(f"    QD[d=1,j=4,w=1] (Abanico) = {parametros['QD'][(1,4,1)]:.2f} m³/s")
+    vista_qd = ParametrosLaja({}, {'QD': arreglos['QD']}, {'QD': mascaras['QD']})['QD']
+    if (1, 1, 1) in vista_qd:
+        print(f"    QD[d=1,j=1,w=1] = {vista_qd[(1,1,1)]:.2f} m³/s")
+    if (1, 4, 1) in vista_qd:
+        print(f"    QD[d=1,j=4,w=1] (Abanico) = {vista_qd[(1,4,1)]:.2f} m³/s")
     
     # 7. Gamma_i (Caudal máximo por central)
     print("\nCargando caudales máximos Gamma_i...")
-    df_gamma = pd.read_excel(archivo_excel, sheet_name='Gamma_i')
-    parametros['gamma'] = {}
-    
-    if 'i' in df_gamma.columns and 'Gamma' in df_gamma.columns:
-        for _, row in df_gamma.iterrows():
-            i = int(row['i'])
-            parametros['gamma'][i] = float(row['Gamma'])
-    elif df_gamma.shape[1] >= 2:
-        for _, row in df_gamma.iterrows():
-            if pd.notna(row.iloc[0]):
-                i = int(row.iloc[0])
-                parametros['gamma'][i] = float(row.iloc[1])
-    
-    print(f"  Cargados {len(parametros['gamma'])} caudales máximos")
-    
-    # 8. Rho_i (Rendimiento por central - Potencia específica)
+    i_gamma, valores_gamma = _tabla_indice_valor(hojas['Gamma_i'], 'i', ['Gamma'])
+    arreglos['gamma'], mascaras['gamma'] = _arreglo_indexado(i_gamma[:, None], valores_gamma)
+    
+    print(f"  Cargados {len(np.unique(i_gamma))} caudales máximos")
+    
+    # 8. Rho_i (Rendimiento por central - Potencia específica) [MW/(m³/s)]
     print("\nCargando rendimientos Rho_i...")
-    df_rho = pd.read_excel(archivo_excel, sheet_name='Rho_i')
-    parametros['rho'] = {}
-    
-    if 'i' in df_rho.columns and 'Rho' in df_rho.columns:
-        for _, row in df_rho.iterrows():
-            i = int(row['i'])
-            parametros['rho'][i] = float(row['Rho'])  # Unidades: MW/(m³/s)
-    elif df_rho.shape[1] >= 2:
-        for _, row in df_rho.iterrows():
-            if pd.notna(row.iloc[0]):
-                i = int(row.iloc[0])
-                parametros['rho'][i] = float(row.iloc[1])  # Unidades: MW/(m³/s)
+    i_rho, valores_rho = _tabla_indice_valor(hojas['Rho_i'], 'i', ['Rho'])
     
     # Verificar que centrales de retiro tengan rho=0
-    for i_retiro in [4, 12, 14]:
-        if i_retiro not in parametros['rho']:
-            parametros['rho'][i_retiro] = 0.0
-        elif parametros['rho'][i_retiro] > 0:
-            print(f"  ⚠ Advertencia: Central {i_retiro} es de retiro pero tiene rho={parametros['rho'][i_retiro]}")
+    centrales_retiro = np.array([4, 12, 14])
+    faltantes = centrales_retiro[~np.isin(centrales_retiro, i_rho)]
+    i_rho = np.concatenate([i_rho, faltantes])
+    valores_rho = np.concatenate([valores_rho, np.zeros(len(faltantes))])
+    arreglos['rho'], mascaras['rho'] = _arreglo_indexado(i_rho[:, None], valores_rho)
     
-    print(f"  Cargados {len(parametros['rho'])} rendimientos")
+    for i_retiro in centrales_retiro:
+        if arreglos['rho'][i_retiro - 1] > 0:
+            print(f"  ⚠ Advertencia: Central {i_retiro} es de retiro pero tiene rho={arreglos['rho'][i_retiro - 1]}")
     
-    # 9. Pi_i (Potencia máxima)
+    print(f"  Cargados {len(np.unique(i_rho))} rendimientos")
+    
+    # 9. Pi_i (Potencia máxima) = Gamma_i * Rho_i para las 16 centrales
     print("\nConfigurando potencias máximas Pi_i...")
-    parametros['pi'] = {}
-    for i in range(1, 17):
-        if i in parametros['gamma'] and i in parametros['rho']:
-            parametros['pi'][i] = parametros['gamma'][i] * parametros['rho'][i]
-        else:
-            parametros['pi'][i] = 0.0
+    centrales = np.arange(16)
+    con_gamma = centrales < len(arreglos['gamma'])
+    con_rho = centrales < len(arreglos['rho'])
+    con_gamma[con_gamma] = mascaras['gamma'][centrales[con_gamma]] if mascaras['gamma'] is not None else True
+    con_rho[con_rho] = mascaras['rho'][centrales[con_rho]] if mascaras['rho'] is not None else True
+    ambos = con_gamma & con_rho
+    arreglos['pi'] = np.zeros(16)
+    arreglos['pi'][ambos] = arreglos['gamma'][centrales[ambos]] * arreglos['rho'][centrales[ambos]]
     
-    print(f"  Calculadas {len(parametros['pi'])} potencias máximas")
+    print(f"  Calculadas {len(arreglos['pi'])} potencias máximas")
     
     # 10. FS_w (Factor de segundos por semana)
+    # Estructura: w | FS (segundos)
     print("\nCargando factor de segundos FS_w...")
-    df_fs = pd.read_excel(archivo_excel, sheet_name='FS_w')
-    parametros['FS'] = {}
+    w_fs, valores_fs = _tabla_indice_valor(hojas['FS_w'], 'w', ['FS'])
+    arreglos['FS'], mascaras['FS'] = _arreglo_indexado(w_fs[:, None], valores_fs)
     
-    # Estructura: w | FS (segundos)
-    if 'w' in df_fs.columns and 'FS' in df_fs.columns:
-        for _, row in df_fs.iterrows():
-            w = int(row['w'])
-            parametros['FS'][w] = float(row['FS'])
-    elif df_fs.shape[1] >= 2:
-        for _, row in df_fs.iterrows():
-            if pd.notna(row.iloc[0]):
-                w = int(row.iloc[0])
-                parametros['FS'][w] = float(row.iloc[1])
-    
-    print(f"  Cargados {len(parametros['FS'])} factores de segundos")
+    print(f"  Cargados {len(np.unique(w_fs))} factores de segundos")
     
     # Contar semanas de 7 y 8 días
-    semanas_7dias = sum(1 for v in parametros['FS'].values() if v == 604800)
-    semanas_8dias = sum(1 for v in parametros['FS'].values() if v == 691200)
-    print(f"    Semanas de 7 días: {semanas_7dias}")
-    print(f"    Semanas de 8 días: {semanas_8dias}")
+    FS = arreglos['FS'] if mascaras['FS'] is None else arreglos['FS'][mascaras['FS']]
+    print(f"    Semanas de 7 días: {int(np.sum(FS == 604800))}")
+    print(f"    Semanas de 8 días: {int(np.sum(FS == 691200))}")
     
     print("\n" + "="*60)
     print("✓ PARÁMETROS CARGADOS EXITOSAMENTE")
     print("="*60 + "\n")
     
-    return parametros
+    return ParametrosLaja(escalares, arreglos, mascaras)
+
+def _tabla_indice_valor(df, col_indice, cols_valor):
+    """
+    Extrae en forma vectorizada los pares (índice, valor) de una hoja de dos columnas
+    
+    Usa las columnas con nombre (col_indice, uno de cols_valor) si existen; si no,
+    las dos primeras columnas. Se descartan las filas sin índice.
+    
+    Returns:
+        tuple: (indices int64, valores float64)
+    """
+    for col_valor in cols_valor:
+        if col_indice in df.columns and col_valor in df.columns:
+            tabla = df[[col_indice, col_valor]]
+            break
+    else:
+        if df.shape[1] < 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        tabla = df.iloc[:, :2]
+    
+    tabla = tabla[tabla.iloc[:, 0].notna()]
+    indices = pd.to_numeric(tabla.iloc[:, 0]).to_numpy(dtype=np.float64).astype(np.int64)
+    valores = pd.to_numeric(tabla.iloc[:, 1]).to_numpy(dtype=np.float64)
+    return indices, valores
+
+def _arreglo_indexado(posiciones, valores):
+    """
+    Vuelca valores con índices 1-indexados (n, ejes) en un arreglo denso
+    
+    Returns:
+        tuple: (arreglo, mascara de posiciones con dato o None si están todas)
+    """
+    posiciones = np.asarray(posiciones, dtype=np.int64) - 1
+    if len(posiciones) == 0:
+        return np.zeros((0,) * posiciones.shape[1]), None
+    forma = tuple(posiciones.max(axis=0) + 1)
+    arreglo = np.zeros(forma, dtype=np.float64)
+    mascara = np.zeros(forma, dtype=bool)
+    arreglo[tuple(posiciones.T)] = valores
+    mascara[tuple(posiciones.T)] = True
+    return arreglo, (None if mascara.all() else mascara)
+
+def _contar_presentes(arreglo, mascara):
+    """Número de valores con dato (todas las posiciones si no hay máscara)"""
+    return int(mascara.sum()) if mascara is not None else arreglo.size
+
+def _afluentes_desde_hoja(df_qa):
+    """
+    Convierte la hoja QA_a,w,t (sin encabezado) en un arreglo (a, w, t)
+    
+    El número de semanas se toma de la segunda fila de encabezado, por lo que
+    una hoja más ancha (más semanas o resolución diaria) o con más temporadas
+    se lee con las mismas operaciones por columna.
+    
+    Returns:
+        tuple: (arreglo QA (6, W, T), mascara de (a, t) presentes o None)
+    """
+    # Mapeo de nombres de afluentes a índices
+    afluentes_map = {
+        'ELTORO': 1,
+        'ABANICO': 2,
+        'ANTUCO': 3,
+        'TUCAPEL': 4,
+        'CANECOL': 5,
+        'LAJA_I': 6  # Sexto afluente
+    }
+    
+    # Semanas: columnas 2.. cuyo encabezado (fila 1) es numérico
+    semanas = pd.to_numeric(df_qa.iloc[1, 2:], errors='coerce')
+    n_semanas = int(semanas.max()) if semanas.notna().any() else 48
+    
+    # Leer desde fila 2 en adelante (saltando encabezados)
+    datos = df_qa.iloc[2:]
+    temporadas = pd.to_numeric(datos.iloc[:, 0], errors='coerce')
+    afluentes = datos.iloc[:, 1].astype(str).str.strip().str.upper().map(afluentes_map)
+    validas = (temporadas.notna() & afluentes.notna()).to_numpy()
+    
+    t = temporadas.to_numpy(dtype=np.float64)[validas].astype(np.int64)
+    a = afluentes.to_numpy(dtype=np.float64)[validas].astype(np.int64)
+    
+    # Columnas 2..(n_semanas+1) = semanas 1..n_semanas; celdas vacías o no numéricas = 0
+    bloque = datos.iloc[validas, 2:2 + n_semanas].reindex(columns=range(2, 2 + n_semanas))
+    try:
+        valores = bloque.to_numpy(dtype=np.float64)  # Conversión de todo el bloque de una vez
+    except (TypeError, ValueError):
+        valores = bloque.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    valores = np.nan_to_num(valores, nan=0.0)
+    
+    forma = (len(afluentes_map), n_semanas, int(t.max()) if len(t) else 0)
+    QA = np.zeros(forma, dtype=np.float64)
+    presentes = np.zeros(forma, dtype=bool)
+    QA[a - 1, :, t - 1] = valores
+    presentes[a - 1, :, t - 1] = True
+    return QA, (None if presentes.all() else presentes)
+
+def afluentes_desde_escenario(df_escenario, n_semanas=48, n_temporadas=None):
+    """
+    Convierte una hoja de escenario Monte Carlo en un arreglo QA (a, w, t)
+    
+    Acepta los tres formatos de columnas de semana que generan los scripts de
+    Monte Carlo: S1..S48, Semana_1..Semana_48 o enteros 1..48. Las filas se
+    identifican por las columnas 'Afluente' y 'Temporada'.
+    
+    Returns:
+        np.ndarray: QA de forma (6, n_semanas, T), con ceros donde no hay fila
+    """
+    columnas = []
+    for w in range(1, n_semanas + 1):
+        for etiqueta in (f'S{w}', f'Semana_{w}', w, str(w)):
+            if etiqueta in df_escenario.columns:
+                columnas.append(etiqueta)
+                break
+        else:
+            columnas.append(None)  # Semana ausente: se deja en 0
+    
+    a = df_escenario['Afluente'].to_numpy(dtype=np.int64)
+    t = df_escenario['Temporada'].to_numpy(dtype=np.int64)
+    valores = df_escenario.reindex(columns=columnas).to_numpy(dtype=np.float64)
+    valores = np.nan_to_num(valores, nan=0.0)
+    
+    if n_temporadas is None:
+        n_temporadas = int(t.max()) if len(t) else 0
+    QA = np.zeros((6, n_semanas, n_temporadas), dtype=np.float64)
+    QA[a - 1, :, t - 1] = valores
+    return QA
+
+def cargar_escenarios_afluentes(archivo_escenarios, usar_cache=True, memmap=False):
+    """
+    Lee todas las hojas Escenario_N de todos_escenarios.xlsx en un solo tensor
+    
+    El libro se abre una vez y cada hoja se convierte con afluentes_desde_escenario.
+    Con usar_cache=True el tensor se guarda junto al libro como
+    <nombre>.<huella>.afluentes.npy (misma huella de contenido que el caché de
+    parámetros), y las siguientes llamadas lo leen sin abrir el Excel. Con
+    memmap=True el tensor se devuelve como np.memmap de solo lectura, de modo
+    que cortar un escenario no carga los demás en memoria.
+    
+    Args:
+        archivo_escenarios: Ruta a todos_escenarios.xlsx
+        usar_cache: Usar (y regenerar si hace falta) el .npy compilado
+        memmap: Devolver el tensor mapeado en memoria (requiere usar_cache)
+    
+    Returns:
+        tuple: (tensor (S, 6, 48, T) float64, lista de números de escenario N por índice s)
+    """
+    ruta = Path(archivo_escenarios)
+    if memmap and not usar_cache:
+        raise ValueError("memmap=True requiere usar_cache=True (el mapeo se hace sobre el .npy compilado)")
+    
+    huella = _huella_archivo(ruta)
+    ruta_tensor = ruta.with_name(f"{ruta.stem}.{huella[:16]}.afluentes.npy")
+    ruta_numeros = ruta.with_name(f"{ruta.stem}.{huella[:16]}.escenarios.npy")
+    
+    if usar_cache and ruta_tensor.exists() and ruta_numeros.exists():
+        tensor = np.load(ruta_tensor, mmap_mode='r' if memmap else None, allow_pickle=False)
+        numeros = np.load(ruta_numeros, allow_pickle=False).tolist()
+        print(f"✓ {len(numeros)} escenarios de afluentes cargados desde caché '{ruta_tensor.name}'")
+        return tensor, numeros
+    
+    print(f"Leyendo escenarios de afluentes desde '{ruta.name}'...")
+    with pd.ExcelFile(ruta, engine='openpyxl') as libro:
+        hojas = {}
+        for nombre in libro.sheet_names:
+            prefijo, _, numero = nombre.partition('_')
+            if prefijo == 'Escenario' and numero.isdigit():
+                hojas[int(numero)] = nombre
+        numeros = sorted(hojas)
+        dfs = pd.read_excel(libro, sheet_name=[hojas[n] for n in numeros])
+    
+    n_temporadas = max(int(df['Temporada'].max()) for df in dfs.values())
+    tensor = np.stack([
+        afluentes_desde_escenario(dfs[hojas[n]], n_temporadas=n_temporadas) for n in numeros
+    ])
+    print(f"  ✓ Tensor de afluentes {tensor.shape} (escenarios, afluentes, semanas, temporadas)")
+    
+    if usar_cache:
+        try:
+            for antiguo in ruta.parent.glob(f"{ruta.stem}.*.afluentes.npy"):
+                antiguo.unlink()
+            for antiguo in ruta.parent.glob(f"{ruta.stem}.*.escenarios.npy"):
+                antiguo.unlink()
+            np.save(ruta_numeros, np.array(numeros, dtype=np.int64))
+            np.save(ruta_tensor, tensor)
+        except OSError as e:
+            print(f"  ⚠ No se pudo escribir el caché de escenarios: {e}")
+        else:
+            if memmap:
+                tensor = np.load(ruta_tensor, mmap_mode='r', allow_pickle=False)
+    
+    return tensor, numeros
 
 def mostrar_resumen(parametros):
     """
     Muestra un resumen de los parámetros cargados
+    
+    Acepta ParametrosLaja o el diccionario clásico con claves tupla.
     """
+    parametros = ParametrosLaja.desde_dict(parametros)
+    
     print("\n" + "="*60)
     print("RESUMEN DE PARÁMETROS - 5 TEMPORADAS")
     print("="*60)
@@ -399,14 +654,17 @@ def mostrar_resumen(parametros):
     print(f"  - Semanas por temporada: 48")
     print(f"  - Temporadas: 6")
     
-    # Promedios por afluente y temporada
+    # Promedios por afluente y temporada (cortes completos del arreglo (a, w, t))
     afluentes_nombres = ['El Toro', 'Abanico', 'Antuco', 'Tucapel', 'Canecol', 'Laja I']
-    for t in range(1, 7):
+    QA = parametros.QA
+    presentes = parametros.presentes('QA')
+    suma = np.where(presentes, QA, 0.0).sum(axis=1)
+    conteo = presentes.sum(axis=1)
+    for t in range(1, min(6, QA.shape[2]) + 1):
         print(f"\n  Temporada {t}:")
-        for a in range(1, 7):  # Ahora incluye el afluente 6
-            valores = [parametros['QA'][(a, w, t)] for w in range(1, 49) if (a, w, t) in parametros['QA']]
-            if valores:
-                print(f"    - {afluentes_nombres[a-1]}: promedio {np.mean(valores):.2f} m³/s")
+        for a in range(1, min(6, QA.shape[0]) + 1):  # Ahora incluye el afluente 6
+            if conteo[a-1, t-1] > 0:
+                print(f"    - {afluentes_nombres[a-1]}: promedio {suma[a-1, t-1] / conteo[a-1, t-1]:.2f} m³/s")
     
     print(f"\n🚰 Demandas de riego (QD):")
     print(f"  - Total registros: {len(parametros['QD'])}")
@@ -0,0 +1,183 @@
+"""
+Comparación de la lógica de vol_min/vol_max y de las penalizaciones por convenio
+(ver ModeloLajaLatex.calcular_bigm y el argumento bigm del constructor)
+
+Construye el caso con bigm='global', 'optimalidad' e 'indicador' y reporta, para cada uno:
+    - cota de la relajación LP (no aplica a 'indicador': relax() descarta las indicadoras)
+    - cota al terminar el nodo raíz (con cortes y heurísticas de Gurobi)
+    - tiempo hasta el gap objetivo y objetivo final
+
+El modo se fija al construir el modelo (ver ModeloLajaLatex.optimizar), así
+que cada modo es un modelo distinto. Con n_temporadas y solver='highs' se
+puede medir sin una licencia completa de Gurobi, como en
+comparar_formulaciones_pwl.py: HiGHS no admite 'indicador' y no informa la
+cota del nodo raíz.
+
+Uso:
+    python comparar_bigm.py [time_limit] [archivo_parametros] [gap_objetivo] [n_temporadas] [solver]
+
+Resultados registrados en comparaciones/bigm.csv. Ahí 'indicador' no tiene
+medición: HiGHS no lo admite y la licencia limitada de Gurobi no alcanza ni
+para una temporada, así que falta correrlo con una licencia completa.
+"""
+
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import gurobipy as gp
+import pandas as pd
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from comparar_formulaciones_pwl import resolver_highs
+from modelo_laja_latex import ModeloLajaLatex
+
+
+MODOS_BIGM = ('global', 'optimalidad', 'indicador')
+
+
+def cotas_raiz(modelo, time_limit):
+    """
+    Cota de la relajación LP y cota del nodo raíz de un modelo construido
+
+    Returns:
+        dict: 'cota_lp', 'cota_raiz' y 'estado' (mensaje de error si Gurobi falla)
+    """
+    resultado = {'cota_lp': None, 'cota_raiz': None, 'estado': 'ok'}
+    try:
+        if modelo.model.NumGenConstrs == 0:
+            relajado = modelo.model.relax()
+            relajado.Params.OutputFlag = 0
+            relajado.Params.TimeLimit = time_limit
+            relajado.optimize()
+            if relajado.SolCount > 0:
+                resultado['cota_lp'] = relajado.ObjVal
+
+        model = modelo.model
+        model.Params.TimeLimit = time_limit
+        model.Params.NodeLimit = 1  # Solo el nodo raíz
+        model.optimize()
+        resultado['cota_raiz'] = model.ObjBound
+        model.resetParams()
+    except gp.GurobiError as e:
+        resultado['estado'] = f"error: {e}"
+    return resultado
+
+
+def tiempo_a_gap(modelo, time_limit, gap_objetivo):
+    """
+    Resuelve hasta el gap objetivo
+
+    Returns:
+        dict: 'tiempo_s', 'objetivo', 'gap' y 'estado'
+    """
+    resultado = {'tiempo_s': None, 'objetivo': None, 'gap': None, 'estado': 'ok'}
+    model = modelo.model
+    model.reset()  # Sin reanudar desde una corrida anterior (p. ej. la del nodo raíz)
+    model.Params.OutputFlag = 0
+    model.Params.TimeLimit = time_limit
+    model.Params.MIPGap = gap_objetivo
+    try:
+        model.optimize()
+    except gp.GurobiError as e:
+        resultado['estado'] = f"error: {e}"
+        return resultado
+    resultado['tiempo_s'] = model.Runtime
+    if model.SolCount > 0:
+        resultado['objetivo'] = model.ObjVal
+        resultado['gap'] = model.MIPGap
+    return resultado
+
+
+def medir_highs(modelo, time_limit, gap_objetivo):
+    """
+    Cota LP y tiempo hasta el gap objetivo con HiGHS (ver comparar_formulaciones_pwl.resolver_highs)
+
+    Con bigm='indicador' no hay medición: el estado lo indica y las cotas y
+    tiempos quedan vacíos.
+
+    Returns:
+        tuple: (cotas, solucion) con las claves de cotas_raiz y tiempo_a_gap
+    """
+    r = resolver_highs(modelo.model, time_limit, gap_objetivo)
+    if 'cota_lp' not in r:  # Restricciones indicadoras: no hay resultado, no es un error del modo
+        return ({'cota_lp': None, 'cota_raiz': None,
+                 'estado': "sin medir: HiGHS no admite restricciones indicadoras (requiere Gurobi)"},
+                {'tiempo_s': None, 'objetivo': None, 'gap': None, 'estado': 'ok'})
+    estado = 'ok' if r['estado'] == 0 else f"highs: estado {r['estado']}"
+    return ({'cota_lp': r['cota_lp'], 'cota_raiz': None, 'estado': 'ok'},
+            {'tiempo_s': r['tiempo_total_s'], 'objetivo': r['objetivo'], 'gap': r['gap_final'], 'estado': estado})
+
+
+def comparar(time_limit=300, archivo_excel="Parametros_Nuevos.xlsx", gap_objetivo=0.01,
+             carpeta_salida="resultados", n_temporadas=None, solver='gurobi'):
+    """Compara cotas y tiempos de resolución de cada modo y guarda un CSV"""
+    print("\n" + "="*70)
+    print("BIG-M GLOBAL VS OPTIMALIDAD VS RESTRICCIONES INDICADORAS")
+    print("="*70)
+    print(f"  Temporadas: {n_temporadas or 'todas'}, solver: {solver}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        parametros = cargar_parametros_excel(archivo_excel)
+
+    filas = []
+    for bigm in MODOS_BIGM:
+        modelo = ModeloLajaLatex(bigm=bigm)
+        modelo.model.Params.OutputFlag = 0
+        QA = None
+        if n_temporadas is not None:
+            modelo.T = modelo.T[:n_temporadas]
+            QA = parametros.QA[:, :, :n_temporadas]
+        with contextlib.redirect_stdout(io.StringIO()):
+            modelo.cargar_parametros(parametros, QA=QA)
+            modelo.construir_modelo()
+        fila = {'bigm': bigm, 'temporadas': n_temporadas, 'solver': solver, 'M_vol_min': modelo.M_vol_min,
+                'M_vol_max': modelo.M_vol_max, 'M_deficit_max': float(modelo.M_deficit.max())}
+        if solver == 'highs':
+            cotas, solucion = medir_highs(modelo, time_limit, gap_objetivo)
+        else:
+            cotas, solucion = cotas_raiz(modelo, time_limit), tiempo_a_gap(modelo, time_limit, gap_objetivo)
+        fila.update(cotas)
+        if fila['estado'] == 'ok':
+            fila['estado'] = solucion.pop('estado')
+        else:
+            solucion.pop('estado')
+        fila.update(solucion)
+        filas.append(fila)
+
+        cota_lp = f"{fila['cota_lp']:,.2f}" if fila['cota_lp'] is not None else "-"
+        cota_raiz = f"{fila['cota_raiz']:,.2f}" if fila['cota_raiz'] is not None else "-"
+        tiempo = f"{fila['tiempo_s']:.1f} s" if fila['tiempo_s'] is not None else "-"
+        print(f"  {bigm:<9} cota LP {cota_lp:>14}   cota raíz {cota_raiz:>14}   tiempo {tiempo:>9}")
+        if fila['estado'] != 'ok':
+            print(f"    ⚠ {fila['estado']}")
+
+    # Maximización: una cota más baja es más ajustada
+    base = filas[0]
+    for fila in filas[1:]:
+        for clave in ('cota_lp', 'cota_raiz'):
+            if base[clave] is not None and fila[clave] is not None:
+                mejora = base[clave] - fila[clave]
+                print(f"  Mejora de {clave} ({fila['bigm']} vs global): {mejora:,.2f} "
+                      f"({mejora / max(abs(base[clave]), 1e-10):.2%})")
+    resueltos = [f for f in filas if f['tiempo_s'] is not None and f['gap'] is not None and f['gap'] <= gap_objetivo]
+    if resueltos:
+        mas_rapido = min(resueltos, key=lambda f: f['tiempo_s'])
+        print(f"  ✓ Más rápido hasta gap {gap_objetivo:.2%}: {mas_rapido['bigm']} ({mas_rapido['tiempo_s']:.1f} s)")
+
+    Path(carpeta_salida).mkdir(exist_ok=True)
+    ruta = Path(carpeta_salida) / "comparacion_bigm.csv"
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    print(f"\n✓ Comparación guardada en: {ruta}")
+    print("="*70 + "\n")
+    return filas
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    archivo = sys.argv[2] if len(sys.argv) > 2 else "Parametros_Nuevos.xlsx"
+    gap_objetivo = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+    n_temporadas = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    solver = sys.argv[5] if len(sys.argv) > 5 else 'gurobi'
+    comparar(time_limit, archivo, gap_objetivo, n_temporadas=n_temporadas, solver=solver)
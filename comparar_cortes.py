@@ -0,0 +1,150 @@
+"""
+Comparación de las desigualdades válidas de cortes_validos.py
+(ver ModeloLajaLatex.agregar_cortes)
+
+Para cada caso estándar (comparar_formulaciones_pwl.casos_estandar) construye el
+modelo sin cortes, con cada familia por separado y con todas, y reporta:
+    - cota de la relajación LP (solo modo 'estatico' y sin restricciones indicadoras)
+    - cota e incumbente al terminar el nodo raíz y su gap
+    - mejora respecto del modelo sin cortes, por separado para la cota LP, la
+      cota raíz (efecto de los cortes en la relajación) y el incumbente raíz
+      (depende de las heurísticas, no de la formulación), además de la del gap
+
+Por omisión usa bigm='global': con bigm='optimalidad' las filas de convenio ya
+usan M = QD y deficit_eta no genera cortes. En modo 'usuario' solo se miden
+las familias de FAMILIAS_USUARIO. Con n_temporadas y solver='highs' (solo modo
+'estatico') se mide sin una licencia completa de Gurobi, como en
+comparar_formulaciones_pwl.py; la cota raíz es la de HiGHS con límite de un nodo.
+
+Uso:
+    python comparar_cortes.py [time_limit] [modo] [bigm] [n_temporadas] [solver]
+
+Resultados registrados en comparaciones/cortes_estatico.csv (HiGHS, 6 temporadas,
+bigm='global'). Solo enlace_semanas mueve la cota LP (1.5 a 2.1 GWh según el
+caso). Los cambios de la cota raíz quedan dentro de la variación entre corridas
+de HiGHS, y los del gap raíz se deben casi por completo al incumbente.
+"""
+
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import gurobipy as gp
+import pandas as pd
+
+from comparar_formulaciones_pwl import casos_estandar, resolver_highs
+from cortes_validos import FAMILIAS_CORTES, FAMILIAS_USUARIO
+from modelo_laja_latex import ModeloLajaLatex
+
+
+def configuraciones(modo='estatico'):
+    """Nombre -> familias de cortes: ninguna, cada una por separado y todas (las admitidas por el modo)"""
+    familias = FAMILIAS_CORTES if modo == 'estatico' else FAMILIAS_USUARIO
+    return {'sin_cortes': (), **{f: (f,) for f in familias}, 'todas': familias}
+
+
+def medir_raiz(modelo, time_limit):
+    """
+    Cota LP, cota raíz e incumbente raíz de un modelo construido (con sus callbacks)
+
+    Returns:
+        dict: 'cota_lp', 'cota_raiz', 'incumbente_raiz', 'gap_raiz' y 'estado'
+    """
+    resultado = {'cota_lp': None, 'cota_raiz': None, 'incumbente_raiz': None, 'gap_raiz': None, 'estado': 'ok'}
+    model = modelo.model
+    try:
+        if model.NumGenConstrs == 0 and not modelo.callbacks:
+            relajado = model.relax()
+            relajado.Params.OutputFlag = 0
+            relajado.Params.TimeLimit = time_limit
+            relajado.optimize()
+            if relajado.SolCount > 0:
+                resultado['cota_lp'] = relajado.ObjVal
+
+        model.Params.TimeLimit = time_limit
+        model.Params.NodeLimit = 1  # Solo el nodo raíz
+        model.optimize(modelo._despachar_callbacks if modelo.callbacks else None)
+        resultado['cota_raiz'] = model.ObjBound
+        if model.SolCount > 0:
+            resultado['incumbente_raiz'] = model.ObjVal
+            resultado['gap_raiz'] = model.MIPGap
+        model.Params.NodeLimit = float('inf')
+    except gp.GurobiError as e:
+        resultado['estado'] = f"error: {e}"
+    return resultado
+
+
+def medir_raiz_highs(modelo, time_limit):
+    """Como medir_raiz, con HiGHS limitado al nodo raíz (ver comparar_formulaciones_pwl.resolver_highs)"""
+    r = resolver_highs(modelo.model, time_limit, 0.0, nodos=1)
+    resultado = {'cota_lp': r.get('cota_lp'), 'cota_raiz': r.get('cota'), 'incumbente_raiz': r.get('objetivo'),
+                 'gap_raiz': None, 'estado': 'ok' if 'cota_lp' in r else f"error: {r['estado']}"}
+    if resultado['cota_raiz'] is not None and resultado['incumbente_raiz'] is not None:
+        incumbente = resultado['incumbente_raiz']
+        resultado['gap_raiz'] = abs(resultado['cota_raiz'] - incumbente) / max(abs(incumbente), 1e-10)
+    return resultado
+
+
+def comparar(time_limit=300, modo='estatico', bigm='global', carpeta_salida="resultados", n_temporadas=None,
+             solver='gurobi'):
+    """Mide cada configuración de cortes sobre cada caso estándar y guarda un CSV"""
+    print("\n" + "="*70)
+    print("DESIGUALDADES VÁLIDAS: GAP EN EL NODO RAÍZ")
+    print("="*70)
+    print(f"  Modo: {modo}, bigm: {bigm}, límite de tiempo: {time_limit} s por corrida")
+    print(f"  Temporadas: {n_temporadas or 'todas'}, solver: {solver}")
+    if solver == 'highs' and modo != 'estatico':
+        raise ValueError("Con solver='highs' solo se puede medir el modo 'estatico'")
+
+    filas = []
+    for caso, (parametros, QA) in casos_estandar(n_temporadas).items():
+        print(f"\nCaso: {caso}")
+        base = None
+        if n_temporadas is not None:
+            QA = (parametros.QA if QA is None else QA)[:, :, :n_temporadas]
+        for nombre, familias in configuraciones(modo).items():
+            modelo = ModeloLajaLatex(bigm=bigm)
+            modelo.model.Params.OutputFlag = 0
+            if n_temporadas is not None:
+                modelo.T = modelo.T[:n_temporadas]
+            with contextlib.redirect_stdout(io.StringIO()):
+                modelo.cargar_parametros(parametros, QA=QA)
+                modelo.construir_modelo()
+                n_cortes = modelo.agregar_cortes(familias, modo) if familias else 0
+            medir = medir_raiz_highs if solver == 'highs' else medir_raiz
+            fila = {'caso': caso, 'cortes': nombre, 'n_cortes': n_cortes, **medir(modelo, time_limit)}
+            if modelo.callbacks:
+                fila['cortes_usuario_agregados'] = modelo.callbacks[-1].agregados
+            if base is None:
+                base = fila
+            # Maximización: mejora la cota que baja y el incumbente que sube
+            for clave, signo in (('cota_lp', 1), ('cota_raiz', 1), ('incumbente_raiz', -1), ('gap_raiz', 1)):
+                if base[clave] is not None and fila[clave] is not None:
+                    fila[f'mejora_{clave}'] = signo * (base[clave] - fila[clave])
+            filas.append(fila)
+
+            cota = f"{fila['cota_raiz']:,.2f}" if fila['cota_raiz'] is not None else "-"
+            gap = f"{fila['gap_raiz']:.2%}" if fila['gap_raiz'] is not None else "-"
+            mejora_cota = f"{fila['mejora_cota_raiz']:+,.2f}" if fila.get('mejora_cota_raiz') is not None else "-"
+            mejora = f"{fila['mejora_gap_raiz']:+.2%}" if fila.get('mejora_gap_raiz') is not None else "-"
+            print(f"  {nombre:<15} cortes {n_cortes:7,}   cota raíz {cota:>12} ({mejora_cota:>8})   "
+                  f"gap raíz {gap:>8}   mejora {mejora:>8}")
+            if fila['estado'] != 'ok':
+                print(f"    ⚠ {fila['estado']}")
+
+    Path(carpeta_salida).mkdir(exist_ok=True)
+    ruta = Path(carpeta_salida) / f"comparacion_cortes_{modo}.csv"
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    print(f"\n✓ Comparación guardada en: {ruta}")
+    print("="*70 + "\n")
+    return filas
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    modo = sys.argv[2] if len(sys.argv) > 2 else 'estatico'
+    bigm = sys.argv[3] if len(sys.argv) > 3 else 'global'
+    n_temporadas = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    solver = sys.argv[5] if len(sys.argv) > 5 else 'gurobi'
+    comparar(time_limit, modo, bigm, n_temporadas=n_temporadas, solver=solver)
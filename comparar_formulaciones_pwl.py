@@ -0,0 +1,225 @@
+"""
+Comparación de las formulaciones de las curvas lineales por tramos
+(filtraciones V -> qf y 30 Nov V_30Nov -> VR_0, VG_0)
+
+Para cada caso estándar y cada formulación de FORMULACIONES_PWL mide:
+    - tiempo de construcción del modelo
+    - binarias, restricciones SOS y restricciones generales PWL
+    - cota en el nodo raíz (la mejor cota al terminar el nodo 0)
+    - tiempo hasta alcanzar el gap objetivo
+
+Con n_temporadas se recorta el horizonte a las primeras temporadas (para
+instancias que quepan en una licencia limitada). solver='highs' resuelve con
+scipy.optimize.milp (HiGHS) en lugar de Gurobi: solo admite las formulaciones
+sin SOS ni restricciones generales, y la cota raíz es la de la relajación LP
+(HiGHS no informa la cota al cerrar el nodo 0).
+
+Uso:
+    python comparar_formulaciones_pwl.py [time_limit] [gap_objetivo] [n_temporadas] [solver]
+
+Resultados registrados en comparaciones/formulaciones_pwl.csv (HiGHS con 1 y
+2 temporadas; sos2 y gurobi quedan sin medir porque HiGHS no las admite y la
+licencia limitada de Gurobi no alcanza ni para una temporada).
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from cargar_datos_5temporadas import cargar_escenarios_afluentes, cargar_parametros_excel
+from formulaciones_pwl import FORMULACIONES_PWL
+from modelo_laja_latex import ModeloLajaLatex
+
+
+RAIZ = Path(__file__).resolve().parent
+
+
+def casos_estandar(n_temporadas=None):
+    """
+    Casos estándar de comparación: nombre -> (parámetros, QA o None)
+
+    Parametros_Nuevos.xlsx de la raíz y, si existe todos_escenarios.xlsx, los
+    escenarios de Monte Carlo seco, mediano y húmedo (menor, mediano y mayor
+    afluente total al lago en las primeras n_temporadas) sobre los mismos
+    parámetros. Caso_Base y el escenario promedio tienen los mismos afluentes
+    que la raíz, por eso no se usan.
+    """
+    casos = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = cargar_parametros_excel(str(RAIZ / 'Parametros_Nuevos.xlsx'))
+    casos['parametros_nuevos'] = (base, None)
+
+    sys.path.insert(0, str(RAIZ / 'Simulacion_MonteCarlo'))
+    from aplicar_escenario_montecarlo import TODOS_ESCENARIOS_FILE
+    if TODOS_ESCENARIOS_FILE.exists():
+        with contextlib.redirect_stdout(io.StringIO()):
+            tensor, numeros = cargar_escenarios_afluentes(TODOS_ESCENARIOS_FILE)
+        orden = np.argsort(tensor[:, 0, :, :n_temporadas].sum(axis=(1, 2)), kind='stable')
+        for nombre, s in (('seco', orden[0]), ('mediano', orden[len(orden) // 2]), ('humedo', orden[-1])):
+            casos[f'escenario_{numeros[s]}_{nombre}'] = (base, np.array(tensor[s]))
+    return casos
+
+
+def _seguimiento(model, where):
+    """Callback: cota al cerrar el nodo raíz y primer instante con gap <= objetivo"""
+    if where == GRB.Callback.MIPNODE and model.cbGet(GRB.Callback.MIPNODE_NODCNT) == 0:
+        model._cota_raiz = model.cbGet(GRB.Callback.MIPNODE_OBJBND)
+    elif where == GRB.Callback.MIP:
+        if model._cota_raiz is None or model.cbGet(GRB.Callback.MIP_NODCNT) == 0:
+            model._cota_raiz = model.cbGet(GRB.Callback.MIP_OBJBND)
+        mejor = model.cbGet(GRB.Callback.MIP_OBJBST)
+        cota = model.cbGet(GRB.Callback.MIP_OBJBND)
+        if model._tiempo_gap is None and abs(mejor) < GRB.INFINITY:
+            gap = abs(cota - mejor) / max(abs(mejor), 1e-10)
+            if gap <= model._gap_objetivo:
+                model._tiempo_gap = model.cbGet(GRB.Callback.RUNTIME)
+
+
+def resolver_highs(model, time_limit, gap_objetivo, nodos=None, con_solucion=False):
+    """
+    Resuelve un modelo de Gurobi (sin SOS ni restricciones generales) con HiGHS
+
+    Args:
+        nodos: Límite de nodos del branch and bound (1: solo el nodo raíz)
+        con_solucion: Agregar 'x', la solución en el orden de model.getVars()
+            (None si HiGHS no encontró una)
+
+    Returns:
+        dict: 'cota_lp' (relajación LP), 'cota' (cota dual al terminar),
+              'objetivo', 'gap_final', 'tiempo_gap_s', 'tiempo_total_s' y 'estado'
+    """
+    if model.NumSOS or model.NumGenConstrs:
+        return {'estado': "HiGHS no admite SOS ni restricciones generales"}
+    model.update()
+    variables, restricciones = model.getVars(), model.getConstrs()
+    rhs = np.array(model.getAttr('RHS', restricciones))
+    sentido = np.array(model.getAttr('Sense', restricciones))
+    filas = LinearConstraint(model.getA(), np.where(sentido == '<', -np.inf, rhs), np.where(sentido == '>', np.inf, rhs))
+    lb = np.array(model.getAttr('LB', variables))
+    ub = np.array(model.getAttr('UB', variables))
+    cotas = Bounds(np.where(lb <= -GRB.INFINITY, -np.inf, lb), np.where(ub >= GRB.INFINITY, np.inf, ub))
+    costos = model.ModelSense * np.array(model.getAttr('Obj', variables))
+    enteras = (np.array(model.getAttr('VType', variables)) != GRB.CONTINUOUS).astype(int)
+
+    def objetivo(r):
+        return model.ModelSense * r.fun + model.ObjCon if r.x is not None else None
+
+    relajacion = milp(costos, constraints=filas, bounds=cotas, options={'time_limit': time_limit})
+    inicio = time.perf_counter()
+    opciones = {'time_limit': time_limit, 'mip_rel_gap': gap_objetivo}
+    if nodos is not None:
+        opciones['node_limit'] = nodos
+    r = milp(costos, constraints=filas, bounds=cotas, integrality=enteras, options=opciones)
+    tiempo = time.perf_counter() - inicio
+    resultado = {
+        'cota_lp': objetivo(relajacion),
+        'cota': model.ModelSense * r.mip_dual_bound + model.ObjCon if getattr(r, 'mip_dual_bound', None) is not None else None,
+        'objetivo': objetivo(r),
+        'gap_final': getattr(r, 'mip_gap', None),
+        'tiempo_gap_s': tiempo if r.status == 0 else None,
+        'tiempo_total_s': tiempo,
+        'estado': r.status,  # Código de scipy.optimize.milp (0: óptimo dentro del gap, 1: límite de tiempo)
+    }
+    if con_solucion:
+        resultado['x'] = r.x
+    return resultado
+
+
+def medir_formulacion(parametros, QA, formulacion, time_limit, gap_objetivo, n_temporadas=None, solver='gurobi'):
+    """Construye y resuelve un caso con una formulación y retorna sus métricas"""
+    modelo = ModeloLajaLatex(formulacion_pwl=formulacion)
+    modelo.model.Params.OutputFlag = 0
+    if n_temporadas is not None:
+        modelo.T = modelo.T[:n_temporadas]
+        QA = (parametros.QA if QA is None else QA)[:, :, :n_temporadas]
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.cargar_parametros(parametros, QA=QA)
+        inicio = time.perf_counter()
+        modelo.construir_modelo()
+    fila = {
+        'formulacion': formulacion,
+        'construccion_s': time.perf_counter() - inicio,
+        'variables': modelo.model.NumVars,
+        'binarias': modelo.model.NumBinVars,
+        'restricciones': modelo.model.NumConstrs,
+        'sos': modelo.model.NumSOS,
+        'pwl_generales': modelo.model.NumGenConstrs,
+        'cota_raiz': None,
+        'objetivo': None,
+        'gap_final': None,
+        'tiempo_gap_s': None,
+        'tiempo_total_s': None,
+        'estado': None,
+    }
+
+    model = modelo.model
+    if solver == 'highs':
+        resultado = resolver_highs(model, time_limit, gap_objetivo)
+        fila['cota_raiz'] = resultado.pop('cota_lp', None)
+        fila.update(resultado)
+        return fila
+    model.Params.TimeLimit = time_limit
+    model.Params.MIPGap = gap_objetivo
+    model._cota_raiz = None
+    model._tiempo_gap = None
+    model._gap_objetivo = gap_objetivo
+    try:
+        model.optimize(_seguimiento)
+    except gp.GurobiError as e:
+        fila['estado'] = f"error: {e}"
+        return fila
+
+    fila['estado'] = model.Status
+    fila['cota_raiz'] = model._cota_raiz
+    fila['tiempo_gap_s'] = model._tiempo_gap
+    fila['tiempo_total_s'] = model.Runtime
+    if model.SolCount > 0:
+        fila['objetivo'] = model.ObjVal
+        fila['gap_final'] = model.MIPGap
+    return fila
+
+
+def comparar(time_limit=600, gap_objetivo=0.01, carpeta_salida="resultados", n_temporadas=None, solver='gurobi'):
+    """Corre todas las formulaciones sobre todos los casos estándar y guarda un CSV"""
+    print("\n" + "="*70)
+    print("COMPARACIÓN DE FORMULACIONES PWL")
+    print("="*70)
+    print(f"  Límite de tiempo: {time_limit} s por corrida, gap objetivo: {gap_objetivo:.2%}")
+    print(f"  Temporadas: {n_temporadas or 'todas'}, solver: {solver}")
+
+    filas = []
+    for caso, (parametros, QA) in casos_estandar(n_temporadas).items():
+        print(f"\nCaso: {caso}")
+        for formulacion in FORMULACIONES_PWL:
+            fila = medir_formulacion(parametros, QA, formulacion, time_limit, gap_objetivo, n_temporadas, solver)
+            fila = {'caso': caso, 'temporadas': n_temporadas, 'solver': solver, 'gap_objetivo': gap_objetivo, **fila}
+            filas.append(fila)
+            cota = f"{fila['cota_raiz']:.4g}" if fila['cota_raiz'] is not None else "-"
+            t_gap = f"{fila['tiempo_gap_s']:.1f} s" if fila['tiempo_gap_s'] is not None else "-"
+            print(f"  {formulacion:<12} construcción {fila['construccion_s']:6.2f} s  "
+                  f"binarias {fila['binarias']:6,}  cota raíz {cota:>10}  tiempo a gap {t_gap:>9}")
+            if isinstance(fila['estado'], str):
+                print(f"    ⚠ {fila['estado']}")
+
+    Path(carpeta_salida).mkdir(exist_ok=True)
+    ruta = Path(carpeta_salida) / "comparacion_formulaciones_pwl.csv"
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    print(f"\n✓ Comparación guardada en: {ruta}")
+    print("="*70 + "\n")
+    return filas
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 600
+    gap_objetivo = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    n_temporadas = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    solver = sys.argv[4] if len(sys.argv) > 4 else 'gurobi'
+    comparar(time_limit, gap_objetivo, n_temporadas=n_temporadas, solver=solver)
@@ -0,0 +1,157 @@
+"""
+Desigualdades válidas para las zonas de las curvas y la lógica de convenio
+(ver ModeloLajaLatex.agregar_cortes)
+
+Familias disponibles:
+    orden_zonas     φ[k] ≤ φ[k-1] en las zonas de filtraciones y del 30 Nov
+    enlace_semanas  φ[k,w,t] ≤ φ[k',w-1,t]: el volumen no sube más de
+                    (QA[1] - mín f)·FS/10^6 en una semana, así que si V[w]
+                    completa la zona k, V[w-1] ya completaba la zona k'
+    deficit_eta     def ≤ QD·η (± α en primeros regantes) donde la fila de
+                    convenio usa un M mayor que QD (bigm='global') o es una
+                    restricción indicadora (bigm='indicador')
+
+Cada corte es (nombre, terminos, rhs) con Σ coef·var ≤ rhs. Se agregan como
+restricciones del modelo (modo 'estatico') o como cortes de usuario que un
+callback separa en cada nodo (modo 'usuario', SeparadorCortes).
+
+enlace_semanas y deficit_eta pueden cortar soluciones factibles, pero no todas
+las óptimas: en un empate V = v_{k+1} basta φ = 1, y def ≤ QD se cumple en el
+óptimo (mismo argumento que ModeloLajaLatex.calcular_bigm). Gurobi exige que
+un corte de usuario no excluya ninguna solución entera factible, por eso solo
+las familias de FAMILIAS_USUARIO admiten el modo 'usuario'; las demás se
+agregan como restricciones del modelo.
+
+deficit_eta solo genera cortes con bigm='global' o 'indicador': con
+bigm='optimalidad' la fila de convenio ya usa M = QD.
+"""
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import scipy.sparse as sp
+
+
+FAMILIAS_CORTES = ('orden_zonas', 'enlace_semanas', 'deficit_eta')
+FAMILIAS_USUARIO = ('orden_zonas',)  # Válidas para toda solución entera factible
+MODOS_CORTES = ('estatico', 'usuario')
+
+
+def cortes_orden_zonas(modelo):
+    """φ[k,w,t] - φ[k-1,w,t] ≤ 0 y φ_30[k,t] - φ_30[k-1,t] ≤ 0 (k ≥ 2)"""
+    cortes = []
+    for (k, w, t), phi in modelo.phi_var.items():
+        if k > modelo.K[0]:
+            cortes.append((f"corte_orden_{k}_{w}_{t}", [(1.0, phi), (-1.0, modelo.phi_var[k-1, w, t])], 0.0))
+    for (k, t), phi in modelo.phi_30.items():
+        if k > modelo.K[0]:
+            cortes.append((f"corte_orden30_{k}_{t}", [(1.0, phi), (-1.0, modelo.phi_30[k-1, t])], 0.0))
+    return cortes
+
+
+def cortes_enlace_semanas(modelo, tolerancia=1e-6):
+    """φ[k,w,t] - φ[k',w-1,t] ≤ 0 con k' la mayor zona completa en V[w] - Δ_max"""
+    if not modelo.phi_var:
+        return []
+    nW, nT = len(modelo.W), len(modelo.T)
+    zonas = modelo.K[:-1]
+    umbrales = np.array([modelo.v_k[k + 1] for k in zonas])
+    f_min = min(modelo.f_k[k] for k in modelo.K)
+    QA = modelo.parametros.QA[0, :nW, :nT]
+    cortes = []
+    for it, t in enumerate(modelo.T):
+        for iw, w in enumerate(modelo.W):
+            if iw == 0 and it == 0:
+                continue  # V[0] = V_0 es dato (ver fijar_por_alcance)
+            anterior = (w - 1, t) if iw > 0 else (modelo.W[-1], modelo.T[it - 1])
+            subida = (QA[iw, it] - f_min) * modelo.FS[w] / 1000000
+            for k, umbral in zip(zonas, umbrales):
+                # V[w] ≥ v_{k+1} → V[w-1] ≥ v_{k+1} - subida
+                completas = np.nonzero(umbrales <= umbral - subida - tolerancia)[0]
+                if len(completas) == 0:
+                    continue
+                k_prev = zonas[completas[-1]]
+                cortes.append((f"corte_enlace_{k}_{w}_{t}",
+                               [(1.0, modelo.phi_var[k, w, t]), (-1.0, modelo.phi_var[(k_prev,) + anterior])], 0.0))
+    return cortes
+
+
+def cortes_deficit_eta(modelo, tolerancia=1e-9):
+    """def - QD·η (∓ QD·α) ≤ rhs en las filas de convenio con M > QD o indicadoras"""
+    QD = np.asarray(modelo.parametros.QD, dtype=np.float64)
+    cortes = []
+    for (d, j, w, t) in sorted(modelo.demanda_activa):
+        qd = QD[d-1, j-1, w-1]
+        if modelo.bigm != 'indicador' and modelo.M_deficit[d-1, j-1, w-1] <= qd + tolerancia:
+            continue  # La fila big-M ya usa M = QD
+        terminos = [(1.0, modelo.deficit[d, j, w, t]), (-qd, modelo.eta[d, j, w, t])]
+        rhs = 0.0
+        if d == 1 and j == 4:  # Abanico: def ≤ QD·(1 + η - α)
+            terminos.append((qd, modelo.alpha[w, t]))
+            rhs = qd
+        elif d == 1 and j != 3:  # RieZaCo y RieTucapel: def ≤ QD·(η + α)
+            terminos.append((-qd, modelo.alpha[w, t]))
+        cortes.append((f"corte_deficit_{d}_{j}_{w}_{t}", terminos, rhs))
+    return cortes
+
+
+GENERADORES_CORTES = {
+    'orden_zonas': cortes_orden_zonas,
+    'enlace_semanas': cortes_enlace_semanas,
+    'deficit_eta': cortes_deficit_eta,
+}
+
+
+def generar_cortes(modelo, familias=FAMILIAS_CORTES):
+    """
+    Cortes de las familias pedidas para un ModeloLajaLatex construido
+
+    Returns:
+        dict: familia -> lista de (nombre, terminos, rhs)
+    """
+    for familia in familias:
+        if familia not in GENERADORES_CORTES:
+            raise ValueError(f"Familia de cortes no reconocida: '{familia}' (use {FAMILIAS_CORTES})")
+    return {familia: GENERADORES_CORTES[familia](modelo) for familia in familias}
+
+
+class SeparadorCortes:
+    """
+    Callback que agrega como cortes de usuario los cortes violados por la
+    relajación de cada nodo (requiere PreCrush = 1)
+
+    Uso:
+        separador = SeparadorCortes(cortes)
+        model.Params.PreCrush = 1
+        model.optimize(separador)
+    """
+
+    def __init__(self, cortes, tolerancia=1e-6, max_por_nodo=500):
+        self.cortes = list(cortes)
+        self.tolerancia = tolerancia
+        self.max_por_nodo = max_por_nodo
+        self.agregados = 0
+
+        columnas = {}
+        filas, cols, coefs = [], [], []
+        for fila, (_, terminos, _) in enumerate(self.cortes):
+            for coef, var in terminos:
+                filas.append(fila)
+                cols.append(columnas.setdefault(var, len(columnas)))
+                coefs.append(coef)
+        self.variables = list(columnas)
+        self.A = sp.csr_matrix((coefs, (filas, cols)), shape=(len(self.cortes), len(self.variables)))
+        self.rhs = np.array([rhs for _, _, rhs in self.cortes], dtype=np.float64)
+
+    def __call__(self, model, where):
+        if where != GRB.Callback.MIPNODE or not self.cortes:
+            return
+        if model.cbGet(GRB.Callback.MIPNODE_STATUS) != GRB.OPTIMAL:
+            return
+        x = np.array(model.cbGetNodeRel(self.variables))
+        violacion = self.A @ x - self.rhs
+        violados = np.nonzero(violacion > self.tolerancia)[0]
+        for fila in violados[np.argsort(-violacion[violados])][:self.max_por_nodo]:
+            _, terminos, rhs = self.cortes[fila]
+            model.cbCut(gp.LinExpr([c for c, _ in terminos], [v for _, v in terminos]), GRB.LESS_EQUAL, rhs)
+            self.agregados += 1
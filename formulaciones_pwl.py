@@ -0,0 +1,202 @@
+"""
+Formulaciones lineales por tramos (PWL) para las curvas del lago
+Curva de filtraciones V -> qf (puntos v_k, f_k) y curva del 30 Nov
+V_30Nov -> VR_0, VG_0 (puntos v_k, vr_k, vg_k)
+
+Formulaciones disponibles:
+    incremental  Zonas progresivas con binarias phi y deltas (formulación LaTeX original)
+    sos2         Pesos lambda de los K puntos con una restricción SOS2
+    logaritmica  Pesos lambda con ceil(log2(K-1)) binarias (codificación Gray, Vielma-Nemhauser)
+    gurobi       Restricción general addGenConstrPWL (Gurobi elige la formulación)
+
+Cuando la forma de la curva y el sentido del objetivo lo permiten
+(relajacion_exacta), la curva se formula como LP con los incrementos de la
+formulación incremental y sin binarias.
+"""
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+
+
+FORMULACIONES_PWL = ('incremental', 'sos2', 'logaritmica', 'gurobi')
+
+
+def bits_logaritmicos(n_puntos):
+    """Cantidad de binarias de la formulación logarítmica para una curva de n_puntos"""
+    return max(1, int(np.ceil(np.log2(n_puntos - 1))))
+
+
+def codigo_gray(n_tramos):
+    """
+    Código Gray reflejado de cada tramo
+
+    Returns:
+        np.ndarray (n_tramos, n_bits) de 0/1; tramos consecutivos difieren en un bit
+    """
+    n_bits = max(1, int(np.ceil(np.log2(n_tramos))))
+    codigos = np.arange(n_tramos) ^ (np.arange(n_tramos) >> 1)
+    return (codigos[:, None] >> np.arange(n_bits)[::-1]) & 1
+
+
+def conjuntos_logaritmicos(n_puntos):
+    """
+    Conjuntos de la formulación logarítmica de SOS2
+
+    Para cada bit l, el punto k pertenece a uno[l] si todos los tramos que lo
+    contienen (k-1 y k) tienen ese bit en 1, y a cero[l] si todos lo tienen en 0.
+    Con z_l binaria: Σ_{k∈uno[l]} λ_k ≤ z_l y Σ_{k∈cero[l]} λ_k ≤ 1 - z_l.
+
+    Returns:
+        tuple: (uno, cero), listas por bit con los puntos (0-indexados)
+    """
+    n_tramos = n_puntos - 1
+    gray = codigo_gray(n_tramos)
+    uno, cero = [], []
+    for l in range(gray.shape[1]):
+        uno_l, cero_l = [], []
+        for k in range(n_puntos):
+            bits = [gray[s, l] for s in (k - 1, k) if 0 <= s < n_tramos]
+            if all(b == 1 for b in bits):
+                uno_l.append(k)
+            elif all(b == 0 for b in bits):
+                cero_l.append(k)
+        uno.append(uno_l)
+        cero.append(cero_l)
+    return uno, cero
+
+
+def forma_curva(x_pts, y_pts, tolerancia=1e-9):
+    """
+    Forma de una curva lineal por tramos según la variación de sus pendientes
+
+    Returns:
+        str: 'lineal', 'convexa' (pendientes no decrecientes), 'concava'
+             (pendientes no crecientes) o 'general'
+    """
+    pendientes = np.diff(np.asarray(y_pts, dtype=np.float64)) / np.diff(np.asarray(x_pts, dtype=np.float64))
+    cambios = np.diff(pendientes)
+    escala = tolerancia * max(1.0, float(np.abs(pendientes).max(initial=0.0)))
+    crece = bool((cambios > escala).any())
+    decrece = bool((cambios < -escala).any())
+    if not crece and not decrece:
+        return 'lineal'
+    if not decrece:
+        return 'convexa'
+    if not crece:
+        return 'concava'
+    return 'general'
+
+
+def relajacion_exacta(x_pts, ys_pts, sentidos, tolerancia=1e-9):
+    """
+    Indica si las curvas y_j = f_j(x) se pueden formular sin binarias
+
+    Sin binarias de orden, los incrementos de las zonas se pueden llenar en
+    cualquier orden y cada y_j queda entre la envolvente convexa y la cóncava
+    de sus puntos. Si al optimizador nunca le conviene bajar y_j (sentido +1)
+    y f_j es cóncava, o nunca le conviene subirla (sentido -1) y f_j es
+    convexa, la relajación alcanza el óptimo sobre la curva. Una curva lineal
+    es exacta en cualquier sentido.
+
+    Args:
+        x_pts: Abscisas de los puntos
+        ys_pts: Ordenadas de los puntos, una secuencia por variable dependiente
+        sentidos: +1, -1 o 0 (desconocido) por variable dependiente
+
+    Returns:
+        bool
+    """
+    for y_pts, sentido in zip(ys_pts, sentidos):
+        forma = forma_curva(x_pts, y_pts, tolerancia)
+        if forma == 'lineal':
+            continue
+        if (sentido > 0 and forma == 'concava') or (sentido < 0 and forma == 'convexa'):
+            continue
+        return False
+    return True
+
+
+def agregar_curva(model, formulacion, x, ys, x_pts, ys_pts, nombre, lambdas=(), binarias=()):
+    """
+    Impone y_j = f_j(x) para una curva lineal por tramos definida por puntos
+
+    Args:
+        model: Modelo Gurobi
+        formulacion: 'sos2', 'logaritmica' o 'gurobi'
+        x: Variable independiente
+        ys: Variables dependientes (una por curva y_j)
+        x_pts: Abscisas de los puntos (estrictamente crecientes)
+        ys_pts: Ordenadas de los puntos, una secuencia por variable de ys
+        nombre: Sufijo para los nombres de las restricciones
+        lambdas: Pesos λ_k de cada punto (sos2 y logaritmica), en [0, 1]
+        binarias: Binarias z_l (solo logaritmica), bits_logaritmicos(len(x_pts)) de ellas
+    """
+    if formulacion == 'gurobi':
+        for j, (y, y_pts) in enumerate(zip(ys, ys_pts)):
+            model.addGenConstrPWL(x, y, list(x_pts), list(y_pts), name=f"pwl_{j}_{nombre}")
+        return
+
+    if formulacion not in ('sos2', 'logaritmica'):
+        raise ValueError(f"Formulación PWL no reconocida: '{formulacion}'")
+
+    lambdas = list(lambdas)
+    n_puntos = len(x_pts)
+    model.addConstr(gp.quicksum(lambdas) == 1, name=f"pwl_conv_{nombre}")
+    model.addConstr(x == gp.LinExpr(list(x_pts), lambdas), name=f"pwl_x_{nombre}")
+    for j, (y, y_pts) in enumerate(zip(ys, ys_pts)):
+        model.addConstr(y == gp.LinExpr(list(y_pts), lambdas), name=f"pwl_y{j}_{nombre}")
+
+    if formulacion == 'sos2':
+        model.addSOS(GRB.SOS_TYPE2, lambdas, list(range(1, n_puntos + 1)))
+        return
+
+    uno, cero = conjuntos_logaritmicos(n_puntos)
+    for l, z in enumerate(binarias):
+        model.addConstr(gp.quicksum(lambdas[k] for k in uno[l]) <= z, name=f"pwl_log1_{l}_{nombre}")
+        model.addConstr(gp.quicksum(lambdas[k] for k in cero[l]) <= 1 - z, name=f"pwl_log0_{l}_{nombre}")
+
+
+def zonas_desde_valor(valor, puntos, tolerancia=1e-6):
+    """
+    Reconstruye las zonas (phi) e incrementos (delta) de la formulación
+    incremental a partir del valor de la variable de la curva
+
+    Args:
+        valor: Valor (escalar o arreglo) sobre el eje de los puntos
+        puntos: Puntos de la curva en ese eje (K valores crecientes)
+
+    Returns:
+        tuple: (phi, delta) con un eje inicial de K-1 zonas
+    """
+    puntos = np.asarray(puntos, dtype=np.float64)
+    valor = np.asarray(valor, dtype=np.float64)
+    inicio = puntos[:-1].reshape((-1,) + (1,) * valor.ndim)
+    ancho = np.diff(puntos).reshape(inicio.shape)
+    delta = np.clip(valor - inicio, 0.0, ancho)
+    phi = (valor >= inicio + ancho - tolerancia).astype(np.float64)
+    return phi, delta
+
+
+def pesos_desde_valor(valor, puntos):
+    """
+    Reconstruye los pesos lambda y las binarias z de las formulaciones sos2 y
+    logaritmica a partir del valor de la variable independiente
+
+    Args:
+        valor: Valor (escalar o arreglo) sobre el eje de los puntos
+        puntos: Puntos de la curva en ese eje (K valores crecientes)
+
+    Returns:
+        tuple: (lambdas, z) con un eje inicial de K puntos y de
+               bits_logaritmicos(K) bits respectivamente
+    """
+    puntos = np.asarray(puntos, dtype=np.float64)
+    valor = np.clip(np.asarray(valor, dtype=np.float64), puntos[0], puntos[-1])
+    tramo = np.clip(np.searchsorted(puntos, valor, side='right') - 1, 0, len(puntos) - 2)
+    peso = (valor - puntos[tramo]) / (puntos[tramo + 1] - puntos[tramo])
+    lambdas = np.zeros((len(puntos),) + valor.shape)
+    np.put_along_axis(lambdas, tramo[None], (1.0 - peso)[None], axis=0)
+    np.put_along_axis(lambdas, (tramo + 1)[None], peso[None], axis=0)
+    z = np.moveaxis(codigo_gray(len(puntos) - 1)[tramo], -1, 0).astype(np.float64)
+    return lambdas, z
@@ -0,0 +1,228 @@
+"""
+Resolución por horizonte rodante de ModeloLajaLatex
+
+En lugar de resolver las 6 temporadas en un solo MIP, se resuelve una ventana
+de temporadas más una anticipación, se fijan las decisiones de las temporadas
+de la ventana y se avanza. Las temporadas solo se conectan por el volumen del
+lago, así que el estado que pasa de una ventana a la siguiente es:
+    V_0       = V[48, t]   (volumen al final de la última temporada fijada)
+    V_30Nov_1 = V[32, t]   (volumen al 30 Nov que define VR_0 y VG_0 de t+1)
+Cada subproblema es un ModeloLajaLatex con sus propias temporadas 1..n y los
+afluentes de esas temporadas. Solo la ventana que llega a la última temporada
+exige la condición terminal V ≥ V_F; en las demás vol_final queda en
+V ≥ V_MIN, porque el volumen final de la ventana no es el del horizonte y
+exigirle V_F sobrerrestringe el subproblema. Al final se arma el plan completo con los nombres de variables del
+modelo monolítico y se compara con su cota.
+
+Uso:
+    python horizonte_rodante.py [ventana] [anticipacion] [time_limit] [archivo_parametros]
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import pandas as pd
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from modelo_laja_latex import ModeloLajaLatex
+from parametros_laja import ParametrosLaja
+
+
+def separar_temporada(nombre):
+    """'qg[3,12,2]' -> ('qg', '3,12', 2): la temporada es siempre el último índice"""
+    base, indices = nombre[:-1].split('[', 1)
+    resto, _, t = indices.rpartition(',')
+    return base, resto, int(t)
+
+
+def renombrar_temporada(nombre, desplazamiento):
+    """Nombre de la misma variable con la temporada desplazada"""
+    base, resto, t = separar_temporada(nombre)
+    return f"{base}[{resto + ',' if resto else ''}{t + desplazamiento}]"
+
+
+def parametros_ventana(parametros, inicio, n_temporadas, V_0, V_30Nov_1, final=True):
+    """
+    Parámetros de un subproblema: temporadas inicio..inicio+n-1 renumeradas
+    desde 1 y estado inicial (V_0, V_30Nov_1)
+
+    Con final=False (la ventana no llega a la última temporada) V_F se
+    reemplaza por V_MIN: la condición terminal solo aplica al horizonte completo.
+    """
+    QA = parametros.QA[:, :, inicio - 1:inicio - 1 + n_temporadas]
+    ventana = parametros.con_afluentes(QA)
+    ventana['V_0'] = V_0
+    ventana['V_30Nov_1'] = V_30Nov_1
+    if not final:
+        ventana['V_F'] = ventana.get('V_MIN', 1400)
+    return ventana
+
+
+def valores_solucion(modelo):
+    """Nombre -> valor de la solución de un modelo resuelto"""
+    variables = modelo.model.getVars()
+    return dict(zip(modelo.model.getAttr('VarName', variables), modelo.model.getAttr('X', variables)))
+
+
+def resolver_horizonte_rodante(parametros, QA=None, ventana=1, anticipacion=1, time_limit=600,
+                               mip_gap=0.02, cota_monolitica=None, **opciones_modelo):
+    """
+    Resuelve el caso por horizonte rodante
+
+    Args:
+        parametros: Parámetros base (ParametrosLaja o dict)
+        QA: Afluentes opcionales que reemplazan a los de los parámetros
+        ventana: Temporadas que se fijan en cada paso
+        anticipacion: Temporadas adicionales que se resuelven pero no se fijan
+        time_limit, mip_gap: Límites de cada subproblema
+        cota_monolitica: Cota del modelo completo (p. ej. ObjBound de una
+            corrida anterior); si es None se usa su relajación LP
+        **opciones_modelo: Argumentos del constructor de ModeloLajaLatex
+
+    Returns:
+        dict: 'objetivo', 'cota', 'gap', 'tiempo_s', 'ventanas' (una fila por
+              paso), 'valores' (nombre en el modelo completo -> valor) y
+              'modelo' (el modelo completo, con el plan cargado como Start)
+    """
+    if ventana < 1 or anticipacion < 0:
+        raise ValueError("ventana debe ser ≥ 1 y anticipacion ≥ 0")
+    parametros = ParametrosLaja.desde_dict(parametros)
+    if QA is not None:
+        parametros = parametros.con_afluentes(QA)
+
+    completo = ModeloLajaLatex(**opciones_modelo)
+    completo.model.Params.OutputFlag = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        completo.cargar_parametros(parametros)
+    temporadas = completo.T
+    V_0, V_30Nov_1 = completo.V_0, completo.V_30Nov_1
+
+    inicio_total = time.perf_counter()
+    valores, ventanas = {}, []
+    objetivo = 0.0
+    inicio = temporadas[0]
+    while inicio <= temporadas[-1]:
+        fin_fijado = min(inicio + ventana - 1, temporadas[-1])
+        fin = min(fin_fijado + anticipacion, temporadas[-1])
+        n_fijadas = fin_fijado - inicio + 1
+
+        modelo = ModeloLajaLatex(**opciones_modelo)
+        modelo.T = list(range(1, fin - inicio + 2))
+        modelo.model.Params.OutputFlag = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            modelo.cargar_parametros(parametros_ventana(parametros, inicio, len(modelo.T), V_0, V_30Nov_1,
+                                                        final=fin == temporadas[-1]))
+            modelo.construir_modelo()
+            modelo.optimizar(time_limit=time_limit, mip_gap=mip_gap)
+        if modelo.model.SolCount == 0:
+            raise RuntimeError(f"Temporadas {inicio}-{fin}: sin solución (estado {modelo.model.Status})")
+
+        # Fijar las temporadas de la ventana; su aporte al objetivo es separable por temporada
+        solucion = valores_solucion(modelo)
+        variables = modelo.model.getVars()
+        coeficientes = dict(zip(modelo.model.getAttr('VarName', variables), modelo.model.getAttr('Obj', variables)))
+        aporte = 0.0
+        for nombre, valor in solucion.items():
+            if separar_temporada(nombre)[2] <= n_fijadas:
+                valores[renombrar_temporada(nombre, inicio - 1)] = valor
+                aporte += coeficientes[nombre] * valor
+        objetivo += aporte
+        V_0 = solucion[f"V[{modelo.W[-1]},{n_fijadas}]"]
+        V_30Nov_1 = solucion[f"V[32,{n_fijadas}]"]
+
+        ventanas.append({
+            'temporadas_fijadas': f"{inicio}-{fin_fijado}",
+            'temporadas_resueltas': f"{inicio}-{fin}",
+            'objetivo_fijado': aporte,
+            'gap_subproblema': modelo.model.MIPGap,
+            'tiempo_s': modelo.model.Runtime,
+            'V_final': V_0,
+        })
+        print(f"  Temporadas {inicio}-{fin} (fijadas {inicio}-{fin_fijado}): aporte {aporte:,.2f}, "
+              f"V final {V_0:,.1f} hm³, {modelo.model.Runtime:.1f} s")
+        inicio = fin_fijado + 1
+    tiempo = time.perf_counter() - inicio_total
+
+    # Modelo completo: cota y plan rodante como punto de partida
+    with contextlib.redirect_stdout(io.StringIO()):
+        completo.construir_modelo()
+    variables = completo.model.getVars()
+    nombres = completo.model.getAttr('VarName', variables)
+    x = np.array([valores.get(n, 0.0) for n in nombres])
+    completo.model.setAttr('Start', variables, x.tolist())
+    faltantes = sum(n not in valores for n in nombres)
+
+    A = completo.model.getA()
+    restricciones = completo.model.getConstrs()
+    actividad = A @ x
+    rhs = np.array(completo.model.getAttr('RHS', restricciones))
+    sentido = np.array(completo.model.getAttr('Sense', restricciones))
+    violacion = np.where(sentido == GRB.LESS_EQUAL, actividad - rhs,
+                         np.where(sentido == GRB.GREATER_EQUAL, rhs - actividad, np.abs(actividad - rhs)))
+
+    if cota_monolitica is None:
+        try:
+            relajado = completo.model.relax()
+            relajado.Params.OutputFlag = 0
+            relajado.optimize()
+            cota_monolitica = relajado.ObjVal if relajado.SolCount > 0 else None
+        except gp.GurobiError as e:
+            print(f"  ⚠ No se pudo calcular la cota del modelo completo: {e}")
+    gap = (cota_monolitica - objetivo) / max(abs(objetivo), 1e-10) if cota_monolitica is not None else None
+
+    return {
+        'objetivo': objetivo,
+        'cota': cota_monolitica,
+        'gap': gap,
+        'tiempo_s': tiempo,
+        'ventanas': ventanas,
+        'valores': valores,
+        'faltantes': faltantes,
+        'violacion_maxima': float(violacion.max(initial=0.0)),
+        'modelo': completo,
+    }
+
+
+def main(ventana=1, anticipacion=1, time_limit=600, archivo_excel="Parametros_Nuevos.xlsx",
+         carpeta_salida="resultados"):
+    """Corre el horizonte rodante sobre un archivo de parámetros y guarda el resumen por paso"""
+    print("\n" + "="*70)
+    print("HORIZONTE RODANTE")
+    print("="*70)
+    print(f"  Ventana: {ventana} temporada(s), anticipación: {anticipacion}, límite por paso: {time_limit} s")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        parametros = cargar_parametros_excel(archivo_excel)
+    resultado = resolver_horizonte_rodante(parametros, ventana=ventana, anticipacion=anticipacion,
+                                           time_limit=time_limit)
+
+    print(f"\nObjetivo del plan rodante: {resultado['objetivo']:,.2f} GWh")
+    if resultado['gap'] is not None:
+        print(f"Cota del modelo completo: {resultado['cota']:,.2f} GWh (gap {resultado['gap']:.2%})")
+    print(f"Tiempo total: {resultado['tiempo_s']:.1f} s")
+    if resultado['violacion_maxima'] > 1e-4 or resultado['faltantes']:
+        print(f"⚠ Plan armado: violación máxima {resultado['violacion_maxima']:.2e}, "
+              f"{resultado['faltantes']:,} variables sin valor")
+    else:
+        print("✓ El plan armado es factible en el modelo completo")
+
+    Path(carpeta_salida).mkdir(exist_ok=True)
+    ruta = Path(carpeta_salida) / "horizonte_rodante.csv"
+    pd.DataFrame(resultado['ventanas']).to_csv(ruta, index=False)
+    print(f"\n✓ Resumen guardado en: {ruta}")
+    print("="*70 + "\n")
+    return resultado
+
+
+if __name__ == "__main__":
+    ventana = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    anticipacion = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    time_limit = float(sys.argv[3]) if len(sys.argv) > 3 else 600
+    archivo = sys.argv[4] if len(sys.argv) > 4 else "Parametros_Nuevos.xlsx"
+    main(ventana, anticipacion, time_limit, archivo)
@@ -0,0 +1,257 @@
+"""
+Resolución en dos etapas sembrada por el Caso Base de filtración fija
+(ver ModeloLajaLatex.optimizar)
+
+    1. Caso_Base/modelo_laja_latex.py (qf = 47 m³/s, sin phi ni delta_f) con
+       los mismos parámetros; se resuelve mucho más rápido.
+    2. Reparación: en el modelo completo se fijan las decisiones de operación
+       (eta, alpha, beta y delta, ver inicio_resultados.FAMILIAS_DECISION) en
+       los valores del Caso Base, el resto de sus valores queda como Start y se
+       resuelve por un tiempo corto. Las zonas phi y los volúmenes se ajustan a
+       la filtración real.
+    3. Se restituyen las cotas y la solución reparada queda como MIP start del
+       modelo completo.
+
+Uso (compara contra una resolución en frío y guarda resultados/dos_etapas.csv):
+    python inicio_caso_base.py [time_limit] [archivo_parametros]
+"""
+
+import contextlib
+import importlib.util
+import io
+import sys
+import time
+from pathlib import Path
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import pandas as pd
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from inicio_resultados import FAMILIAS_DECISION
+from modelo_laja_latex import ModeloLajaLatex
+
+
+RUTA_CASO_BASE = Path(__file__).resolve().parent / "Caso_Base" / "modelo_laja_latex.py"
+
+_modulo_caso_base = None
+
+
+def modulo_caso_base():
+    """Módulo de Caso_Base/modelo_laja_latex.py (su clase se llama igual que la del modelo completo)"""
+    global _modulo_caso_base
+    if _modulo_caso_base is None:
+        spec = importlib.util.spec_from_file_location("caso_base_modelo_laja_latex", RUTA_CASO_BASE)
+        _modulo_caso_base = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_modulo_caso_base)
+    return _modulo_caso_base
+
+
+def resolver_caso_base(modelo, time_limit=300, mip_gap=0.01):
+    """
+    Etapa 1: resuelve el Caso Base con los parámetros de un ModeloLajaLatex
+    (el Caso Base tiene fijas las 6 temporadas, p. ej. vol_final usa V[48,6])
+
+    Returns:
+        tuple: (valores, objetivo, tiempo_s) con valores nombre -> valor, o
+               (None, None, tiempo_s) si no encontró solución
+    """
+    base = modulo_caso_base().ModeloLajaLatex()
+    if list(modelo.T) != base.T or list(modelo.W) != base.W:
+        print(f"  ⚠ El Caso Base solo admite {len(base.T)} temporadas de {len(base.W)} semanas")
+        return None, None, 0.0
+    base.model.Params.OutputFlag = modelo.model.Params.OutputFlag
+    base.model.Params.TimeLimit = time_limit
+    base.model.Params.MIPGap = mip_gap
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        base.cargar_parametros(modelo.parametros)
+        base.construir_modelo()
+    try:
+        base.model.optimize()
+    except gp.GurobiError as e:
+        print(f"  ⚠ Error de Gurobi en el Caso Base: {e}")
+        return None, None, time.perf_counter() - inicio
+    tiempo = time.perf_counter() - inicio
+    if base.model.SolCount == 0:
+        return None, None, tiempo
+    variables = base.model.getVars()
+    valores = dict(zip(base.model.getAttr('VarName', variables), base.model.getAttr('X', variables)))
+    return valores, base.model.ObjVal, tiempo
+
+
+def reparar_inicio(modelo, valores, time_limit=120, mip_gap=0.01):
+    """
+    Etapa 2: convierte la solución del Caso Base en un MIP start factible del
+    modelo completo
+
+    Args:
+        modelo: ModeloLajaLatex con construir_modelo() ya ejecutado
+        valores: Nombre -> valor de la solución del Caso Base
+        time_limit, mip_gap: Límites de la resolución con las decisiones fijas
+
+    Returns:
+        float: Objetivo del punto de partida cargado, o None si la reparación
+               no encontró solución (quedan solo las decisiones como Start
+               parcial para que Gurobi intente completarlas)
+    """
+    model = modelo.model
+    model.update()
+    variables = model.getVars()
+    nombres = model.getAttr('VarName', variables)
+    comunes = [(v, valores[n]) for v, n in zip(variables, nombres) if n in valores]
+    model.setAttr('Start', [v for v, _ in comunes], [x for _, x in comunes])
+
+    decisiones = [v for familia in FAMILIAS_DECISION for v in getattr(modelo, familia).values()
+                  if isinstance(v, gp.Var) and v.VarName in valores]
+    lb = np.array(model.getAttr('LB', decisiones))
+    ub = np.array(model.getAttr('UB', decisiones))
+    fijos = np.clip(np.round([valores[v.VarName] for v in decisiones]), lb, ub)
+    parametros = {'TimeLimit': model.Params.TimeLimit, 'MIPGap': model.Params.MIPGap}
+
+    solucion = None
+    try:
+        model.setAttr('LB', decisiones, fijos.tolist())
+        model.setAttr('UB', decisiones, fijos.tolist())
+        model.Params.TimeLimit = time_limit
+        model.Params.MIPGap = mip_gap
+        model.optimize()
+        if model.SolCount > 0:
+            solucion = (model.getAttr('X', variables), model.ObjVal)
+        else:
+            print(f"  ⚠ Reparación sin solución (estado {model.Status})")
+    except gp.GurobiError as e:
+        print(f"  ⚠ Error de Gurobi en la reparación: {e}")
+    finally:
+        model.setAttr('LB', decisiones, lb.tolist())
+        model.setAttr('UB', decisiones, ub.tolist())
+        model.Params.TimeLimit = parametros['TimeLimit']
+        model.Params.MIPGap = parametros['MIPGap']
+        model.reset()
+
+    if solucion is None:
+        model.setAttr('Start', variables, [GRB.UNDEFINED] * len(variables))
+        model.setAttr('Start', decisiones, fijos.tolist())
+        return None
+    model.setAttr('Start', variables, solucion[0])
+    return solucion[1]
+
+
+def cargar_inicio_caso_base(modelo, time_limit_base=300, time_limit_reparacion=120, mip_gap=0.01):
+    """
+    Etapas 1 y 2 sobre un ModeloLajaLatex construido; deja el MIP start cargado
+
+    Returns:
+        dict: 'objetivo_base', 'objetivo_inicio', 'tiempo_base_s' y 'tiempo_reparacion_s'
+    """
+    print("\n" + "="*70)
+    print("INICIO DESDE EL CASO BASE (qf FIJO)")
+    print("="*70)
+    valores, objetivo_base, tiempo_base = resolver_caso_base(modelo, time_limit_base, mip_gap)
+    resultado = {'objetivo_base': objetivo_base, 'objetivo_inicio': None,
+                 'tiempo_base_s': tiempo_base, 'tiempo_reparacion_s': 0.0}
+    if valores is None:
+        print(f"  ⚠ El Caso Base no encontró solución ({tiempo_base:.1f} s), se resuelve sin punto de partida")
+        print("="*70 + "\n")
+        return resultado
+    print(f"  Etapa 1 (Caso Base): objetivo {objetivo_base:,.2f} GWh ({tiempo_base:.1f} s)")
+
+    inicio = time.perf_counter()
+    resultado['objetivo_inicio'] = reparar_inicio(modelo, valores, time_limit_reparacion, mip_gap)
+    resultado['tiempo_reparacion_s'] = time.perf_counter() - inicio
+    if resultado['objetivo_inicio'] is not None:
+        print(f"  Etapa 2 (reparación): objetivo {resultado['objetivo_inicio']:,.2f} GWh "
+              f"({resultado['tiempo_reparacion_s']:.1f} s)")
+        print("✓ Punto de partida del Caso Base cargado")
+    else:
+        print("  ⚠ Solo las decisiones del Caso Base quedan como Start parcial")
+    print("="*70 + "\n")
+    return resultado
+
+
+class RegistroIncumbentes:
+    """Callback que anota (tiempo, objetivo) de cada nueva solución entera"""
+
+    def __init__(self):
+        self.incumbentes = []
+
+    def __call__(self, model, where):
+        if where == GRB.Callback.MIPSOL:
+            self.incumbentes.append((model.cbGet(GRB.Callback.RUNTIME), model.cbGet(GRB.Callback.MIPSOL_OBJ)))
+
+    def tiempo_hasta(self, objetivo, tolerancia=1e-6):
+        """Primer instante en que el incumbente alcanzó objetivo (maximización), o None"""
+        for tiempo, valor in self.incumbentes:
+            if valor >= objetivo - tolerancia * max(1.0, abs(objetivo)):
+                return tiempo
+        return None
+
+
+def comparar_con_frio(time_limit=3600, mip_gap=0.02, archivo_excel="Parametros_Nuevos.xlsx",
+                      carpeta_salida="resultados", **opciones_inicio):
+    """
+    Resuelve el caso en dos etapas y en frío con los mismos límites y reporta
+    el tiempo ahorrado
+    """
+    print("\n" + "="*70)
+    print("DOS ETAPAS (CASO BASE) VS RESOLUCIÓN EN FRÍO")
+    print("="*70)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parametros = cargar_parametros_excel(archivo_excel)
+
+    filas = []
+    for nombre in ('frio', 'dos_etapas'):
+        modelo = ModeloLajaLatex()
+        modelo.model.Params.OutputFlag = 0
+        registro = RegistroIncumbentes()
+        modelo.callbacks.append(registro)
+        with contextlib.redirect_stdout(io.StringIO()):
+            modelo.cargar_parametros(parametros)
+            modelo.construir_modelo()
+        inicio = time.perf_counter()
+        etapas = {}
+        if nombre == 'dos_etapas':
+            etapas = cargar_inicio_caso_base(modelo, **opciones_inicio)
+        with contextlib.redirect_stdout(io.StringIO()):
+            modelo.optimizar(time_limit=time_limit, mip_gap=mip_gap)
+        fila = {
+            'corrida': nombre,
+            'estado': modelo.model.Status,
+            'objetivo': modelo.model.ObjVal if modelo.model.SolCount > 0 else None,
+            'cota': modelo.model.ObjBound,
+            'gap': modelo.model.MIPGap if modelo.model.SolCount > 0 else None,
+            'tiempo_mip_s': modelo.model.Runtime,
+            'tiempo_total_s': time.perf_counter() - inicio,
+            **etapas,
+        }
+        fila['registro'] = registro
+        filas.append(fila)
+        objetivo = f"{fila['objetivo']:,.2f}" if fila['objetivo'] is not None else "-"
+        print(f"  {nombre:<11} objetivo {objetivo:>12}   tiempo total {fila['tiempo_total_s']:8.1f} s")
+
+    frio, dos_etapas = filas
+    ahorro = frio['tiempo_total_s'] - dos_etapas['tiempo_total_s']
+    print(f"\nTiempo ahorrado por las dos etapas: {ahorro:,.1f} s "
+          f"({ahorro / max(frio['tiempo_total_s'], 1e-10):.1%} de la resolución en frío)")
+    if dos_etapas.get('objetivo_inicio') is not None:
+        hasta = frio['registro'].tiempo_hasta(dos_etapas['objetivo_inicio'])
+        texto = f"{hasta:,.1f} s" if hasta is not None else "no lo alcanzó"
+        print(f"En frío, tiempo hasta un incumbente tan bueno como el punto de partida: {texto} "
+              f"(dos etapas: {dos_etapas['tiempo_base_s'] + dos_etapas['tiempo_reparacion_s']:,.1f} s)")
+        dos_etapas['tiempo_frio_hasta_inicio_s'] = hasta
+    for fila in filas:
+        del fila['registro']
+
+    Path(carpeta_salida).mkdir(exist_ok=True)
+    ruta = Path(carpeta_salida) / "dos_etapas.csv"
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    print(f"\n✓ Comparación guardada en: {ruta}")
+    print("="*70 + "\n")
+    return filas
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    archivo = sys.argv[2] if len(sys.argv) > 2 else "Parametros_Nuevos.xlsx"
+    comparar_con_frio(time_limit, archivo_excel=archivo)
@@ -0,0 +1,208 @@
+"""
+Punto de partida (MIP start) desde una carpeta de resultados exportada
+(ver ModeloLajaLatex.exportar_resultados y ModeloLajaLatex.optimizar)
+
+Cada archivo CSV de resultados se vuelve a asociar con su familia de
+variables por los índices (Central, Demanda, Canal, Zona, Semana, Temporada).
+Lo que los CSV no guardan se completa desde los valores leídos:
+    phi, delta_f              desde qf (igual que exportar_resultados)
+    phi_30, delta_v30         desde V_30Nov sobre los puntos v_k
+    lambda_f/z_f, lambda_30/z_30   pesos del tramo que contiene V o V_30Nov
+    superavit                 QD - qp = def - sup
+    V_30Nov                   V[32, t-1] (V_30Nov_1 en t = 1)
+Los valores se recortan a las cotas actuales del modelo (p. ej. las de
+fijar_por_alcance), así que los resultados de un caso con parámetros algo
+distintos también sirven como punto de partida.
+
+Por omisión solo se cargan las decisiones de operación (eta, alpha, beta y
+delta) y Gurobi completa el resto del MIP start. Las zonas phi y los volúmenes
+siguen al lago, así que tras un cambio de afluentes el punto completo suele
+ser infactible, mientras que las decisiones se pueden completar (familias=None
+carga todas las variables).
+"""
+
+from pathlib import Path
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import pandas as pd
+
+from formulaciones_pwl import bits_logaritmicos, pesos_desde_valor, zonas_desde_valor
+from modelo_laja_latex import ModeloLajaLatex
+
+
+# (archivo, familia, columnas de índice, columna de valor, completo)
+# completo=False: exportar_resultados omite las filas con valor ≈ 0
+ARCHIVOS_RESULTADOS = (
+    ('generacion.csv', 'qg', ('Central', 'Semana', 'Temporada'), 'Caudal_m3s', True),
+    ('vertimientos.csv', 'qv', ('Central', 'Semana', 'Temporada'), 'Caudal_m3s', False),
+    ('volumenes_lago.csv', 'V', ('Semana', 'Temporada'), 'Volumen_hm3', True),
+    ('volumenes_30nov.csv', 'V_30Nov', ('Temporada',), 'V_30Nov_hm3', True),
+    ('volumenes_por_uso.csv', 'VR_0', ('Temporada',), 'VR_0_hm3', True),
+    ('volumenes_por_uso.csv', 'VG_0', ('Temporada',), 'VG_0_hm3', True),
+    ('volumenes_vr_vg.csv', 'VR', ('Semana', 'Temporada'), 'VR_hm3', True),
+    ('volumenes_vr_vg.csv', 'VG', ('Semana', 'Temporada'), 'VG_hm3', True),
+    ('extracciones_por_uso.csv', 'qer', ('Semana', 'Temporada'), 'qer_m3s', True),
+    ('extracciones_por_uso.csv', 'qeg', ('Semana', 'Temporada'), 'qeg_m3s', True),
+    ('riego.csv', 'qp', ('Demanda', 'Canal', 'Semana', 'Temporada'), 'Provisto_m3s', True),
+    ('riego.csv', 'deficit', ('Demanda', 'Canal', 'Semana', 'Temporada'), 'Deficit_m3s', True),
+    ('riego.csv', 'eta', ('Demanda', 'Canal', 'Semana', 'Temporada'), 'Incumplimiento', True),
+    ('decision_alpha.csv', 'alpha', ('Semana', 'Temporada'), 'Alpha', True),
+    ('decision_beta.csv', 'beta', ('Semana', 'Temporada'), 'Beta', True),
+    ('decision_delta.csv', 'delta', ('Semana', 'Temporada'), 'Delta', True),
+    ('energia_total.csv', 'GEN', ('Central', 'Temporada'), 'Energia_GWh', True),
+    ('phi_zonas.csv', 'phi_var', ('Zona', 'Semana', 'Temporada'), 'Phi', False),
+    ('filtraciones.csv', 'qf', ('Semana', 'Temporada'), 'Filtracion_m3s', True),
+    ('filtraciones_incrementales.csv', 'delta_f', ('Zona', 'Semana', 'Temporada'), 'Delta_f_m3s', False),
+)
+
+MODOS_INICIO = ('start', 'hint')
+
+FAMILIAS_DECISION = ModeloLajaLatex.FAMILIAS_DECISION  # Decisiones de operación (ver ModeloLajaLatex)
+
+
+def leer_resultados(carpeta):
+    """
+    Lee los CSV de una carpeta de resultados
+
+    Returns:
+        tuple: (valores, ceros) con valores[familia] = {clave: valor} y ceros
+               el conjunto de familias cuyas claves ausentes valen 0
+    """
+    carpeta = Path(carpeta)
+    if not carpeta.is_dir():
+        raise FileNotFoundError(f"No existe la carpeta de resultados '{carpeta}'")
+    valores, ceros, tablas = {}, set(), {}
+    for archivo, familia, indices, columna, completo in ARCHIVOS_RESULTADOS:
+        ruta = carpeta / archivo
+        if not ruta.exists():
+            continue
+        if archivo not in tablas:
+            try:
+                tablas[archivo] = pd.read_csv(ruta)
+            except pd.errors.EmptyDataError:
+                tablas[archivo] = pd.DataFrame()  # exportar_resultados escribió una tabla vacía
+        df = tablas[archivo]
+        if not completo:
+            ceros.add(familia)
+        if not set(indices + (columna,)) <= set(df.columns):
+            continue
+        claves = zip(*(df[c].astype(int) for c in indices)) if len(indices) > 1 else df[indices[0]].astype(int)
+        valores[familia] = dict(zip(claves, df[columna].astype(float)))
+    return valores, ceros
+
+
+def _arreglo(valores, *indices):
+    """Valores de un dict {clave: valor} como arreglo (NaN donde falta la clave)"""
+    forma = tuple(len(ind) for ind in indices)
+    claves = indices[0] if len(indices) == 1 else np.ndindex(*forma)
+    if len(indices) > 1:
+        claves = (tuple(ind[i] for ind, i in zip(indices, pos)) for pos in claves)
+    return np.fromiter((valores.get(c, np.nan) for c in claves), dtype=np.float64).reshape(forma)
+
+
+def _guardar(valores, familia, arreglo, *indices):
+    """Agrega las entradas finitas de un arreglo como valores de la familia (sin pisar las leídas)"""
+    destino = valores.setdefault(familia, {})
+    for pos in zip(*np.nonzero(np.isfinite(arreglo))):
+        clave = tuple(ind[i] for ind, i in zip(indices, pos))
+        destino.setdefault(clave if len(clave) > 1 else clave[0], float(arreglo[pos]))
+
+
+def completar_valores(modelo, valores, ceros):
+    """
+    Completa en el lugar las familias que los CSV no guardan (ver docstring del módulo)
+
+    Args:
+        modelo: ModeloLajaLatex con construir_modelo() ya ejecutado
+        valores, ceros: Resultado de leer_resultados
+    """
+    W, T = modelo.W, modelo.T
+    K_zonas = modelo.K[:-1]
+    for familia in ceros:
+        destino = valores.setdefault(familia, {})
+        for clave in getattr(modelo, familia, {}):
+            destino.setdefault(clave, 0.0)
+
+    # V_30Nov[t] = V[32, t-1]
+    V = valores.get('V', {})
+    v30 = {t: V.get((32, t - 1), np.nan) if t > T[0] else modelo.V_30Nov_1 for t in T}
+    _guardar(valores, 'V_30Nov', np.array([v30[t] for t in T]), T)
+    V_30Nov = _arreglo(valores['V_30Nov'], T)
+    V = _arreglo(V, W, T)
+    v_pts = [modelo.v_k[k] for k in modelo.K]
+
+    # Curvas de la formulación incremental
+    if 'qf' in valores:
+        phi, delta_f = zonas_desde_valor(_arreglo(valores['qf'], W, T), [modelo.f_k[k] for k in modelo.K])
+        _guardar(valores, 'phi_var', phi, K_zonas, W, T)
+        _guardar(valores, 'delta_f', delta_f, K_zonas, W, T)
+    phi_30, delta_v30 = zonas_desde_valor(V_30Nov, v_pts)
+    _guardar(valores, 'phi_30', np.where(np.isfinite(V_30Nov), phi_30, np.nan), K_zonas, T)
+    _guardar(valores, 'delta_v30', delta_v30, K_zonas, T)
+
+    # Pesos y binarias de las formulaciones sos2 y logarítmica
+    bits = range(1, bits_logaritmicos(len(modelo.K)) + 1)
+    for volumen, lambdas, z, indices in ((V, 'lambda_f', 'z_f', (W, T)), (V_30Nov, 'lambda_30', 'z_30', (T,))):
+        if getattr(modelo, lambdas):
+            pesos, binarias = pesos_desde_valor(np.nan_to_num(volumen, nan=v_pts[0]), v_pts)
+            validos = np.isfinite(volumen)
+            _guardar(valores, lambdas, np.where(validos, pesos, np.nan), modelo.K, *indices)
+            _guardar(valores, z, np.where(validos, binarias, np.nan), bits, *indices)
+
+    # Superávit: QD - qp = def - sup
+    qp, deficit = valores.get('qp', {}), valores.get('deficit', {})
+    destino = valores.setdefault('superavit', {})
+    for (d, j, w, t) in modelo.superavit:
+        if (d, j, w, t) in qp and (d, j, w, t) in deficit:
+            destino.setdefault((d, j, w, t), max(0.0, qp[d, j, w, t] + deficit[d, j, w, t] - modelo.QD.get((d, j, w), 0)))
+    return valores
+
+
+def cargar_inicio_resultados(modelo, carpeta, modo='start', familias=FAMILIAS_DECISION):
+    """
+    Carga una carpeta de resultados como punto de partida de un modelo construido
+
+    Args:
+        modelo: ModeloLajaLatex con construir_modelo() ya ejecutado
+        carpeta: Carpeta con los CSV de exportar_resultados
+        modo: 'start' (atributo Start, MIP start) o 'hint' (VarHintVal)
+        familias: Familias de VARIABLES_MODELO a cargar (None para todas)
+
+    Returns:
+        dict: 'cargadas', 'sin_valor' y 'recortadas' (valores fuera de las cotas actuales)
+    """
+    if modo not in MODOS_INICIO:
+        raise ValueError(f"modo debe ser uno de {MODOS_INICIO}, se recibió '{modo}'")
+    etiqueta = 'todas las familias' if familias is None else ', '.join(familias)
+    familias = modelo.VARIABLES_MODELO if familias is None else familias
+    valores, ceros = leer_resultados(carpeta)
+    completar_valores(modelo, valores, ceros)
+
+    model = modelo.model
+    model.update()
+    variables, x = [], []
+    sin_valor = 0
+    for familia in familias:
+        leidos = valores.get(familia, {})
+        for clave, var in getattr(modelo, familia).items():
+            if not isinstance(var, gp.Var):
+                continue  # Alias (reducir=True) o entradas omitidas (indices_dispersos=True)
+            if clave not in leidos:
+                sin_valor += 1
+                continue
+            variables.append(var)
+            x.append(leidos[clave])
+
+    x = np.array(x)
+    binarias = np.array(model.getAttr('VType', variables)) != GRB.CONTINUOUS
+    x[binarias] = np.round(x[binarias])
+    recortado = np.clip(x, model.getAttr('LB', variables), model.getAttr('UB', variables))
+    recortadas = int(np.sum(np.abs(recortado - x) > 1e-5))
+    model.setAttr('Start' if modo == 'start' else 'VarHintVal', variables, recortado.tolist())
+
+    print(f"✓ Punto de partida desde '{carpeta}' ({modo}): {len(variables):,} variables ({etiqueta})")
+    if sin_valor or recortadas:
+        print(f"  ⚠ {sin_valor:,} variables sin valor en los CSV, {recortadas:,} valores recortados a las cotas")
+    return {'cargadas': len(variables), 'sin_valor': sin_valor, 'recortadas': recortadas}
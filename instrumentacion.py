@@ -0,0 +1,147 @@
+"""
+Instrumentación de fases: tiempo de reloj, tiempo de CPU y memoria máxima (RSS)
+Permite ver en qué se van los minutos de cada corrida y detectar regresiones
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def rss_maximo_mb():
+    """Memoria residente máxima del proceso hasta ahora [MB] (None si no se puede medir)"""
+    if resource is not None:
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KB, macOS reporta bytes
+        return maximo / (1024 ** 2) if sys.platform == 'darwin' else maximo / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 ** 2)
+    return None
+
+
+class RegistroFases:
+    """
+    Registro secuencial de fases de una corrida
+
+    Uso:
+        registro = RegistroFases()
+        with registro.fase('carga_excel'):
+            ...
+        registro.marcar('restricciones.1')   # abre una fase y cierra la marca anterior
+        registro.marcar('restricciones.2')
+        registro.cerrar_marca()
+        registro.guardar_json('resultados')
+
+    Cada fase guarda tiempo de reloj [s], tiempo de CPU del proceso [s] y el RSS
+    máximo del proceso al terminarla [MB]. Las fases anidadas se registran con
+    el nombre completo ('construccion/restricciones.7').
+    """
+
+    def __init__(self, activo=True):
+        self.activo = activo
+        self.fases = []
+        self._pila = []
+        self._marca = None
+        self._inicio = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+        self.info = {}
+
+    def _abrir(self, nombre):
+        ruta = '/'.join([*(p['nombre'] for p in self._pila), nombre])
+        fase = {
+            'nombre': nombre,
+            'ruta': ruta,
+            'nivel': len(self._pila),
+            '_t0': time.perf_counter(),
+            '_cpu0': time.process_time(),
+            '_rss0': rss_maximo_mb(),
+        }
+        self._pila.append(fase)
+        return fase
+
+    def _cerrar(self, fase):
+        while self._pila and self._pila[-1] is not fase:
+            self._cerrar(self._pila[-1])  # Marcas internas que quedaron abiertas
+        self._pila.pop()
+        if self._marca is fase:
+            self._marca = None
+        rss = rss_maximo_mb()
+        self.fases.append({
+            'nombre': fase['nombre'],
+            'ruta': fase['ruta'],
+            'nivel': fase['nivel'],
+            'reloj_s': time.perf_counter() - fase['_t0'],
+            'cpu_s': time.process_time() - fase['_cpu0'],
+            'rss_max_mb': rss,
+            'rss_incremento_mb': (rss - fase['_rss0']) if rss is not None else None,
+        })
+
+    @contextmanager
+    def fase(self, nombre):
+        """Mide el bloque como una fase"""
+        if not self.activo:
+            yield
+            return
+        fase = self._abrir(nombre)
+        try:
+            yield
+        finally:
+            self._cerrar(fase)
+
+    def marcar(self, nombre):
+        """Cierra la marca abierta (si la hay) y abre una nueva fase secuencial"""
+        if not self.activo:
+            return
+        self.cerrar_marca()
+        self._marca = self._abrir(nombre)
+
+    def cerrar_marca(self):
+        """Cierra la última fase abierta con marcar()"""
+        if self._marca is not None:
+            self._cerrar(self._marca)
+
+    def resumen(self):
+        """Diccionario serializable con todas las fases en orden de término"""
+        return {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'host': platform.node(),
+            'python': platform.python_version(),
+            'pid': os.getpid(),
+            'reloj_total_s': time.perf_counter() - self._inicio,
+            'cpu_total_s': time.process_time() - self._inicio_cpu,
+            'rss_max_mb': rss_maximo_mb(),
+            'info': self.info,
+            'fases': self.fases,
+        }
+
+    def imprimir(self):
+        """Tabla de fases por consola"""
+        print(f"\n{'Fase':<45} {'Reloj [s]':>10} {'CPU [s]':>10} {'RSS máx [MB]':>13}")
+        print("-" * 81)
+        for f in self.fases:
+            rss = f"{f['rss_max_mb']:.1f}" if f['rss_max_mb'] is not None else "-"
+            nombre = "  " * f['nivel'] + f['nombre']
+            print(f"{nombre:<45} {f['reloj_s']:>10.3f} {f['cpu_s']:>10.3f} {rss:>13}")
+
+    def guardar_json(self, carpeta_salida="resultados", nombre_archivo="tiempos_fases.json"):
+        """Escribe el reporte JSON en la carpeta de resultados y retorna la ruta"""
+        os.makedirs(carpeta_salida, exist_ok=True)
+        ruta = os.path.join(carpeta_salida, nombre_archivo)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, indent=2, ensure_ascii=False)
+        return ruta
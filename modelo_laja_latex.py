@@ -6,17 +6,92 @@ Horizonte: 5 Temporadas
 Solver: Gurobi
 """
 
+import hashlib
+import itertools
+import os
+import tempfile
+from pathlib import Path
+
 import gurobipy as gp
 from gurobipy import GRB
 import numpy as np
 import pandas as pd
 
+from cortes_validos import FAMILIAS_CORTES, FAMILIAS_USUARIO, MODOS_CORTES, SeparadorCortes, generar_cortes
+from formulaciones_pwl import (FORMULACIONES_PWL, agregar_curva, bits_logaritmicos, forma_curva,
+                                relajacion_exacta, zonas_desde_valor)
+from instrumentacion import RegistroFases
+from parametros_laja import ParametrosLaja
+from red_laja import IncidenciaRed
+
 class ModeloLajaLatex:
-    def __init__(self):
+    # Topologías ya compiladas (compartidas por todas las instancias)
+    _redes_compiladas = {}
+    
+    # Versión de la formulación: subirla al cambiar variables o restricciones
+    # invalida los modelos guardados en caché (ver construir_modelo)
+    VERSION_FORMULACION = 2
+    
+    # Familias de variables que se vuelven a enlazar al leer un modelo desde caché
+    VARIABLES_MODELO = ('V', 'V_30Nov', 'phi_var', 'phi_30', 'delta_f', 'delta_v30',
+                        'VR_0', 'VR', 'VG_0', 'VG', 'qer', 'qeg', 'qf', 'qg', 'qv', 'qp',
+                        'deficit', 'superavit', 'eta', 'alpha', 'beta', 'delta', 'GEN',
+                        'lambda_f', 'z_f', 'lambda_30', 'z_30')
+    
+    # Decisiones de operación: con ellas fijas el resto de un punto de partida
+    # (zonas de las curvas, caudales y volúmenes) se completa resolviendo
+    FAMILIAS_DECISION = ('eta', 'alpha', 'beta', 'delta')
+    
+    # Sentido en que al optimizador le conviene mover cada variable dependiente de
+    # las curvas, con la variable independiente fija (+1 subirla, -1 bajarla, 0 depende).
+    # qf baja el volumen del lago pero alimenta qg[16] y la red: 0.
+    # VR_0 y VG_0 solo acotan lo que se puede entregar por uso: +1.
+    SENTIDO_CURVAS = {'filtraciones': (0,), 'v30': (1, 1)}
+
+    # Centrales cuyo caudal es un alias con reducir=True: qg[1] = qer + qeg, qg[16] = qf
+    CENTRALES_SUSTITUIDAS = (1, 16)
+
+    def __init__(self, formulacion_pwl='incremental', bigm='global', reducir=False, indices_dispersos=False,
+                 fijar_alcance=False, acotar_red=False):
         """
         Inicializa el modelo de optimización para la cuenca del Laja
         Siguiendo formulación LaTeX con linealización por zonas
+        
+        Args:
+            formulacion_pwl: Formulación de las curvas de filtración y del 30 Nov
+                ('incremental', 'sos2', 'logaritmica' o 'gurobi'; ver formulaciones_pwl.py)
+            bigm: Lógica de vol_min/vol_max y de las penalizaciones por convenio:
+                'optimalidad' (big-M por restricción a partir de cotas que
+                cumple toda solución óptima, pero no toda solución factible; ver
+                calcular_bigm), 'global' (el mismo M_bigM en todas) o 'indicador'
+                (restricciones indicadoras de Gurobi, sin M en esas filas).
+                Define las filas del modelo, por eso no es opción de optimizar
+            reducir: Eliminar en la construcción las variables que solo son alias
+                (qg[1], qg[16], V_30Nov[t>1], GEN) y pasar a cotas las
+                restricciones de una sola variable (ver _agregar_sustituciones)
+            indices_dispersos: Crear qp, deficit, superavit y eta solo en las
+                combinaciones (d, j, w, t) activas (ver calcular_indices_activos)
+            fijar_alcance: Acotar V y V_30Nov por el volumen alcanzable y fijar
+                las binarias phi y phi_30 que esas cotas determinan (ver
+                fijar_por_alcance)
+            acotar_red: Acotar los caudales de la red propagando los balances
+                de nodo con los afluentes y las capacidades (ver acotar_por_red)
         """
+        if formulacion_pwl not in FORMULACIONES_PWL:
+            raise ValueError(f"formulacion_pwl debe ser una de {FORMULACIONES_PWL}, se recibió '{formulacion_pwl}'")
+        if bigm not in ('optimalidad', 'global', 'indicador'):
+            raise ValueError(f"bigm debe ser 'optimalidad', 'global' o 'indicador', se recibió '{bigm}'")
+        self.formulacion_pwl = formulacion_pwl
+        self.bigm = bigm
+        self.reducir = reducir
+        self.indices_dispersos = indices_dispersos
+        self.fijar_alcance = fijar_alcance
+        self.alcance_V = None  # (V_min, V_max) alcanzables, arreglos (w, t) (ver calcular_alcance_volumen)
+        self.acotar_red = acotar_red
+        self._cotas_base = {}  # familia -> cotas de construcción (ver _restaurar_cotas)
+        self.demanda_activa = None  # (d, j, w, t) con QD > 0 (ver calcular_indices_activos)
+        self.qp_activo = None  # (d, j, w, t) con variable qp
+        self.curvas_lp = frozenset()  # Curvas formuladas sin binarias (ver analizar_curvas)
         self.model = gp.Model("Convenio_Laja_6Temporadas_LaTeX")
         
         # Conjuntos
@@ -116,8 +191,8 @@ class ModeloLajaLatex:
             {'nodo': 'RieTucapel', 'tipo': 'out', 'var': 'qp_sum', 'idx': 2},
         ]
         
-        # Lista de nodos de balance únicos
-        self.NODOS_BALANCE = list(set(item['nodo'] for item in self.ARCOS_RED))
+        # Lista de nodos de balance únicos (en orden de aparición en ARCOS_RED)
+        self.NODOS_BALANCE = list(self.compilar_red(self.ARCOS_RED).nodos)
         
         # Parámetros
         self.V_30Nov_1 = None  # V_{30Nov,1}: Volumen al 30 Nov previo a temporada 1 [hm³]
@@ -137,6 +212,10 @@ class ModeloLajaLatex:
         self.psi = None  # ψ: Costo incumplir convenio [GWh]
         self.nu = None  # ν: Costo bajar umbral de V_MIN [GWh]
         self.M_bigM = None  # Parámetro Big-M
+        self.M_vol_min = None  # M de vol_min (ver calcular_bigm)
+        self.M_vol_max = None  # M de vol_max
+        self.M_deficit = None  # M de bigM_*: arreglo (d, j, w)
+        self.parametros = None  # ParametrosLaja: mismos datos como arreglos NumPy (QA[a-1, w-1, t-1], ...)
         
         # Variables (Formulación LaTeX)
         self.V = {}  # V_{w,t}: Volumen del lago al final de semana w, temporada t [hm³]
@@ -148,6 +227,12 @@ class ModeloLajaLatex:
         self.delta_f = {}  # Δf_{k,w,t}: Filtración incremental en zona k [m³/s]
         self.delta_v30 = {}  # Δv30_{k,t}: Incremento de volumen al 30 Nov en zona k, temporada t [hm³]
         
+        # Variables de las formulaciones PWL alternativas (sos2, logaritmica)
+        self.lambda_f = {}  # λ_{k,w,t}: Peso del punto k de la curva de filtraciones
+        self.z_f = {}  # z_{l,w,t}: Binaria del bit l (solo logaritmica)
+        self.lambda_30 = {}  # λ30_{k,t}: Peso del punto k de la curva del 30 Nov
+        self.z_30 = {}  # z30_{l,t}: Binaria del bit l (solo logaritmica)
+        
         # Volúmenes disponibles
         self.VR = {}  # VR_{w,t}: Volumen disponible para riego [hm³]
         self.VR_0 = {}  # VR_{0,t}: Volumen inicial riego temporada t [hm³]
@@ -175,8 +260,48 @@ class ModeloLajaLatex:
         # Energía generada
         self.GEN = {}  # GEN_{i,t}: Energía generada [GWh] por central i en temporada t
         
-    def cargar_parametros(self, dict_parametros):
-        """Carga los parámetros del modelo"""
+        # Restricciones cuyo lado derecho depende de QA (ver actualizar_afluentes)
+        self.balance_lago = {}  # (w, t) -> balance de volumen del lago
+        self.balance_red = {}  # (nodo, w, t) -> balance de flujo del nodo
+        
+        # Tiempos, CPU y memoria por fase (ver instrumentacion.py)
+        self.registro = RegistroFases()
+        
+        # Callbacks (model, where) que optimizar pasa a Gurobi (p. ej. SeparadorCortes)
+        self.callbacks = []
+        
+    @classmethod
+    def compilar_red(cls, arcos):
+        """
+        Incidencia nodo-arco de una lista de arcos con el formato de ARCOS_RED
+        
+        Se compila una sola vez por topología y queda guardada en la clase, así
+        que llamarla en cada construcción del modelo no cuesta nada.
+        """
+        clave = tuple((a['nodo'], a['tipo'], a['var'], a['idx']) for a in arcos)
+        red = cls._redes_compiladas.get(clave)
+        if red is None:
+            red = cls._redes_compiladas[clave] = IncidenciaRed(arcos)
+        return red
+
+    def cargar_parametros(self, dict_parametros, QA=None):
+        """
+        Carga los parámetros del modelo
+        
+        Acepta ParametrosLaja o el diccionario clásico; internamente se guarda
+        como ParametrosLaja en self.parametros y los atributos QA, QD, gamma,
+        rho y FS son sus vistas tipo diccionario.
+        
+        Args:
+            dict_parametros: Parámetros base (ParametrosLaja o dict)
+            QA: Arreglo opcional (6, 48, T) de afluentes que reemplaza al de los
+                parámetros base, p. ej. tensor[s] de cargar_escenarios_afluentes.
+                Los parámetros base no se modifican.
+        """
+        dict_parametros = ParametrosLaja.desde_dict(dict_parametros)
+        if QA is not None:
+            dict_parametros = dict_parametros.con_afluentes(QA)
+        self.parametros = dict_parametros
         self.V_30Nov_1 = dict_parametros.get('V_30Nov_1', dict_parametros.get('V_30Nov'))
         self.V_0 = dict_parametros.get('V_0')
         self.V_MIN = dict_parametros.get('V_MIN', 1400)
@@ -218,19 +343,49 @@ class ModeloLajaLatex:
         """Crea todas las variables según formulación LaTeX"""
         print("Creando variables de decisión (Formulación LaTeX)...")
         
+        if self.qp_activo is None:
+            self.calcular_indices_activos()  # Llamada directa, sin construir_modelo
         K_zonas = self.K[:-1]  # Zonas 1 a K-1 (la última zona no necesita variables delta)
         
         # Volúmenes del lago (sin límite superior estricto, controlado por delta)
-        self.V = self.model.addVars(self.W, self.T, lb=0, name="V")
+        # addGenConstrPWL extiende los tramos extremos fuera de [v_1, v_K]; con
+        # formulacion_pwl='gurobi' las cotas dejan V en el mismo rango que las demás
+        if self.formulacion_pwl == 'gurobi':
+            lb_v, ub_v = self.v_k[self.K[0]], self.v_k[self.K[-1]]
+        else:
+            lb_v, ub_v = 0, GRB.INFINITY
+        self.V = self.model.addVars(self.W, self.T, lb=lb_v, ub=ub_v, name="V")
         
         # Volumen al 30 de Noviembre (inicio de cada temporada)
-        self.V_30Nov = self.model.addVars(self.T, lb=0, name="V_30Nov")
-        
-        # Variables de linealización (phi y deltas)
-        self.phi_var = self.model.addVars(K_zonas, self.W, self.T, vtype=GRB.BINARY, name="phi")
-        self.phi_30 = self.model.addVars(K_zonas, self.T, vtype=GRB.BINARY, name="phi_30")
-        self.delta_f = self.model.addVars(K_zonas, self.W, self.T, lb=0, name="delta_f")
-        self.delta_v30 = self.model.addVars(K_zonas, self.T, lb=0, name="delta_v30")
+        if self.reducir:
+            # Solo V_30Nov[1], fijo por cotas; el resto son alias de V[32, t-1]
+            self.V_30Nov = self.model.addVars(self.T[:1], lb=self.V_30Nov_1, ub=self.V_30Nov_1, name="V_30Nov")
+        else:
+            self.V_30Nov = self.model.addVars(self.T, lb=lb_v, ub=ub_v, name="V_30Nov")
+        
+        # Variables de linealización (phi y deltas, o pesos lambda según la formulación)
+        # Las curvas en self.curvas_lp usan solo los deltas, sin binarias
+        incremental = self.formulacion_pwl == 'incremental'
+        lp_f = 'filtraciones' in self.curvas_lp
+        lp_30 = 'v30' in self.curvas_lp
+        if incremental and not lp_f:
+            self.phi_var = self.model.addVars(K_zonas, self.W, self.T, vtype=GRB.BINARY, name="phi")
+        if incremental and not lp_30:
+            self.phi_30 = self.model.addVars(K_zonas, self.T, vtype=GRB.BINARY, name="phi_30")
+        if incremental or lp_f:
+            self.delta_f = self.model.addVars(K_zonas, self.W, self.T, lb=0, name="delta_f")
+        if incremental or lp_30:
+            self.delta_v30 = self.model.addVars(K_zonas, self.T, lb=0, name="delta_v30")
+        if self.formulacion_pwl in ('sos2', 'logaritmica'):
+            bits = range(1, bits_logaritmicos(len(self.K)) + 1)
+            if not lp_f:
+                self.lambda_f = self.model.addVars(self.K, self.W, self.T, lb=0, ub=1, name="lambda_f")
+            if not lp_30:
+                self.lambda_30 = self.model.addVars(self.K, self.T, lb=0, ub=1, name="lambda_30")
+            if self.formulacion_pwl == 'logaritmica' and not lp_f:
+                self.z_f = self.model.addVars(bits, self.W, self.T, vtype=GRB.BINARY, name="z_f")
+            if self.formulacion_pwl == 'logaritmica' and not lp_30:
+                self.z_30 = self.model.addVars(bits, self.T, vtype=GRB.BINARY, name="z_30")
         
         # Volúmenes disponibles por uso
         self.VR_0 = self.model.addVars(self.T, lb=0, name="VR_0")
@@ -242,28 +397,47 @@ class ModeloLajaLatex:
         self.qer = self.model.addVars(self.W, self.T, lb=0, name="qer")
         self.qeg = self.model.addVars(self.W, self.T, lb=0, name="qeg")
         self.qf = self.model.addVars(self.W, self.T, lb=0, name="qf")
-        self.qg = self.model.addVars(self.I, self.W, self.T, lb=0, name="qg")
+        if self.reducir:
+            claves_qg = [(i, w, t) for i, w, t in itertools.product(self.I, self.W, self.T)
+                         if i not in self.CENTRALES_SUSTITUIDAS]
+            self.qg = self.model.addVars(claves_qg, lb=0, name="qg")
+        else:
+            self.qg = self.model.addVars(self.I, self.W, self.T, lb=0, name="qg")
         self.qv = self.model.addVars(self.I, self.W, self.T, lb=0, name="qv")
-        self.qp = self.model.addVars(self.D, self.J, self.W, self.T, lb=0, name="qp")
+        riego = list(itertools.product(self.D, self.J, self.W, self.T))
+        claves_qp = [c for c in riego if c in self.qp_activo]
+        claves_demanda = [c for c in riego if c in self.demanda_activa]
+        self.qp = self.model.addVars(claves_qp, lb=0, name="qp")
         
         # Déficit y superávit
-        self.deficit = self.model.addVars(self.D, self.J, self.W, self.T, lb=0, name="deficit")
-        self.superavit = self.model.addVars(self.D, self.J, self.W, self.T, lb=0, name="superavit")
+        self.deficit = self.model.addVars(claves_demanda, lb=0, name="deficit")
+        self.superavit = self.model.addVars(claves_demanda, lb=0, name="superavit")
         
         # Variables binarias
-        self.eta = self.model.addVars(self.D, self.J, self.W, self.T, vtype=GRB.BINARY, name="eta")
+        self.eta = self.model.addVars(claves_demanda, vtype=GRB.BINARY, name="eta")
         self.alpha = self.model.addVars(self.W, self.T, vtype=GRB.BINARY, name="alpha")
         self.beta = self.model.addVars(self.W, self.T, vtype=GRB.BINARY, name="beta")
         self.delta = self.model.addVars(self.W, self.T, vtype=GRB.BINARY, name="delta")
         
         # Energía generada
-        self.GEN = self.model.addVars(self.I, self.T, lb=0, name="GEN")
+        if self.reducir:
+            self.GEN = gp.tupledict()
+            self._agregar_sustituciones()
+        else:
+            self.GEN = self.model.addVars(self.I, self.T, lb=0, name="GEN")
+        
+        self._completar_indices_omitidos()
         
         print("✓ Variables creadas correctamente")
-        print(f"  Variables phi (filtraciones): {len(K_zonas) * 48 * 5:,}")
-        print(f"  Variables phi_30 (30 Nov): {len(K_zonas) * 5:,}")
-        print(f"  Variables delta_f: {len(K_zonas) * 48 * 5:,}")
-        print(f"  Variables delta_v30: {len(K_zonas) * 5:,}")
+        print(f"  Formulación de curvas: {self.formulacion_pwl}")
+        if self.formulacion_pwl == 'incremental':
+            print(f"  Variables phi (filtraciones): {len(self.phi_var):,}")
+            print(f"  Variables phi_30 (30 Nov): {len(self.phi_30):,}")
+            print(f"  Variables delta_f: {len(self.delta_f):,}")
+            print(f"  Variables delta_v30: {len(self.delta_v30):,}")
+        else:
+            print(f"  Variables lambda: {len(self.lambda_f) + len(self.lambda_30):,}")
+            print(f"  Binarias de curvas: {len(self.z_f) + len(self.z_30):,}")
 
     def crear_restricciones(self):
         """Crea todas las restricciones según formulación LaTeX"""
@@ -272,62 +446,79 @@ class ModeloLajaLatex:
         K_zonas = self.K[:-1]  # Zonas 1 a K-1
         
         # ========== 1. DEFINICIÓN DE FILTRACIONES ==========
+        self.registro.marcar('restricciones.1')
         print("  1. Definición de filtraciones...")
-        for t in self.T:
-            for w in self.W:
-                # qf[w,t] = f_1 + Σ delta_f[k,w,t]
-                self.model.addConstr(
-                    self.qf[w, t] == self.f_k[1] + gp.quicksum(
-                        self.delta_f[k, w, t] for k in K_zonas
-                    ),
-                    name=f"def_qf_{w}_{t}")
+        curva_mip = 'filtraciones' not in self.curvas_lp
+        if self.formulacion_pwl == 'incremental' or not curva_mip:
+            for t in self.T:
+                for w in self.W:
+                    # qf[w,t] = f_1 + Σ delta_f[k,w,t]
+                    self.model.addConstr(
+                        self.qf[w, t] == self.f_k[1] + gp.quicksum(
+                            self.delta_f[k, w, t] for k in K_zonas
+                        ),
+                        name=f"def_qf_{w}_{t}")
                 
-                for k in K_zonas:
-                    f_k = self.f_k[k]
-                    f_k_next = self.f_k[k + 1]
-                    v_k = self.v_k[k]
-                    v_k_next = self.v_k[k + 1]
+                    for k in K_zonas:
+                        f_k = self.f_k[k]
+                        f_k_next = self.f_k[k + 1]
+                        v_k = self.v_k[k]
+                        v_k_next = self.v_k[k + 1]
                     
-                    # Δf[k,w,t] ≤ f_{k+1} - f_k
-                    self.model.addConstr(
-                        self.delta_f[k, w, t] <= f_k_next - f_k,
-                        name=f"delta_f_upper_{k}_{w}_{t}")
+                        # Δf[k,w,t] ≤ f_{k+1} - f_k
+                        self.model.addConstr(
+                            self.delta_f[k, w, t] <= f_k_next - f_k,
+                            name=f"delta_f_upper_{k}_{w}_{t}")
                     
-                    # Δf[k,w,t] ≥ φ[k,w,t] * (f_{k+1} - f_k)
-                    self.model.addConstr(
-                        self.delta_f[k, w, t] >= self.phi_var[k, w, t] * (f_k_next - f_k),
-                        name=f"delta_f_lower_{k}_{w}_{t}")
+                        # Δf[k,w,t] ≥ φ[k,w,t] * (f_{k+1} - f_k)
+                        if curva_mip:
+                            self.model.addConstr(
+                                self.delta_f[k, w, t] >= self.phi_var[k, w, t] * (f_k_next - f_k),
+                                name=f"delta_f_lower_{k}_{w}_{t}")
                     
-                    # Δf[k,w,t] ≤ φ[k-1,w,t] * (f_{k+1} - f_k)  (si k > 1)
-                    if k > 1:
-                        self.model.addConstr(
-                            self.delta_f[k, w, t] <= self.phi_var[k-1, w, t] * (f_k_next - f_k),
-                            name=f"delta_f_prev_{k}_{w}_{t}")
+                        # Δf[k,w,t] ≤ φ[k-1,w,t] * (f_{k+1} - f_k)  (si k > 1)
+                        if curva_mip and k > 1:
+                            self.model.addConstr(
+                                self.delta_f[k, w, t] <= self.phi_var[k-1, w, t] * (f_k_next - f_k),
+                                name=f"delta_f_prev_{k}_{w}_{t}")
                 
-                # Relacionar V[w,t] con las zonas phi usando linealización
-                # V[w,t] = v_1 + Σ ((v_{k+1} - v_k)/(f_{k+1} - f_k)) * Δf[k,w,t]
-                v_expr = self.v_k[1]
-                for k in K_zonas:
-                    v_k = self.v_k[k]
-                    v_k_next = self.v_k[k + 1]
-                    f_k = self.f_k[k]
-                    f_k_next = self.f_k[k + 1]
+                    # Relacionar V[w,t] con las zonas phi usando linealización
+                    # V[w,t] = v_1 + Σ ((v_{k+1} - v_k)/(f_{k+1} - f_k)) * Δf[k,w,t]
+                    v_expr = self.v_k[1]
+                    for k in K_zonas:
+                        v_k = self.v_k[k]
+                        v_k_next = self.v_k[k + 1]
+                        f_k = self.f_k[k]
+                        f_k_next = self.f_k[k + 1]
                     
-                    if abs(f_k_next - f_k) > 1e-6:
-                        coef = (v_k_next - v_k) / (f_k_next - f_k)
-                        v_expr += coef * self.delta_f[k, w, t]
+                        if abs(f_k_next - f_k) > 1e-6:
+                            coef = (v_k_next - v_k) / (f_k_next - f_k)
+                            v_expr += coef * self.delta_f[k, w, t]
                 
-                # CLAVE: Esta es una restricción de IGUALDAD que relaciona V y qf
-                # a través de la curva de filtraciones
-                self.model.addConstr(
-                    self.V[w, t] == v_expr,
-                    name=f"vol_from_f_{w}_{t}")
+                    # CLAVE: Esta es una restricción de IGUALDAD que relaciona V y qf
+                    # a través de la curva de filtraciones
+                    self.model.addConstr(
+                        self.V[w, t] == v_expr,
+                        name=f"vol_from_f_{w}_{t}")
+        else:
+            # V[w,t] y qf[w,t] sobre la curva de puntos (v_k, f_k)
+            bits = range(1, bits_logaritmicos(len(self.K)) + 1)
+            v_pts = [self.v_k[k] for k in self.K]
+            f_pts = [self.f_k[k] for k in self.K]
+            for t in self.T:
+                for w in self.W:
+                    agregar_curva(
+                        self.model, self.formulacion_pwl, self.V[w, t], [self.qf[w, t]], v_pts, [f_pts],
+                        nombre=f"filt_{w}_{t}",
+                        lambdas=[self.lambda_f[k, w, t] for k in self.K] if self.lambda_f else (),
+                        binarias=[self.z_f[l, w, t] for l in bits] if self.z_f else ())
         
         # ========== 2. DEFINICIÓN DE VOLÚMENES DE RIEGO Y GENERACIÓN (30 NOV) ==========
+        self.registro.marcar('restricciones.2')
         print("  2. Volúmenes disponibles de riego y generación (30 Nov)...")
         
-        # Definir V_30Nov[t] para cada temporada
-        for t in self.T:
+        # Definir V_30Nov[t] para cada temporada (con reducir=True ya son cotas y alias)
+        for t in (self.T if not self.reducir else ()):
             if t == 1:
                 # V_30Nov[1] = V_30Nov_1 (parámetro conocido)
                 self.model.addConstr(
@@ -341,78 +532,95 @@ class ModeloLajaLatex:
         
         # Linealización de VR_0[t] y VG_0[t] basado en V_30Nov[t]
         # Usamos interpolación lineal por zonas entre los puntos (v_k, vr_k, vg_k)
+        self.registro.marcar('restricciones.2b')
         print("  2b. Linealización de VR_0 y VG_0 a partir de V_30Nov...")
         
-        for t in self.T:
-            # V_30Nov[t] = v_1 + Σ_{k=1}^{K-1} Δv30[k,t]
-            # Esta ecuación relaciona V_30Nov con las zonas activadas
-            v_expr = self.v_k[1]
-            for k in K_zonas:
-                v_k = self.v_k[k]
-                v_k_next = self.v_k[k + 1]
-                v_expr += self.delta_v30[k, t]
+        curva_mip = 'v30' not in self.curvas_lp
+        if self.formulacion_pwl == 'incremental' or not curva_mip:
+        
+            for t in self.T:
+                # V_30Nov[t] = v_1 + Σ_{k=1}^{K-1} Δv30[k,t]
+                # Esta ecuación relaciona V_30Nov con las zonas activadas
+                v_expr = self.v_k[1]
+                for k in K_zonas:
+                    v_k = self.v_k[k]
+                    v_k_next = self.v_k[k + 1]
+                    v_expr += self.delta_v30[k, t]
             
-            self.model.addConstr(
-                self.V_30Nov[t] == v_expr,
-                name=f"V30Nov_linearization_{t}")
+                self.model.addConstr(
+                    self.V_30Nov[t] == v_expr,
+                    name=f"V30Nov_linearization_{t}")
             
-            # VR_0[t] = vr_1 + Σ_{k=1}^{K-1} (vr_{k+1} - vr_k) × Δv30[k,t]
-            # Usamos las MISMAS variables Δv30 para mantener consistencia
-            vr_expr = self.vr_k[1]
-            for k in K_zonas:
-                vr_k = self.vr_k[k]
-                vr_k_next = self.vr_k[k + 1]
-                v_k = self.v_k[k]
-                v_k_next = self.v_k[k + 1]
-                vr_expr += (vr_k_next - vr_k) / (v_k_next - v_k) * self.delta_v30[k, t]
+                # VR_0[t] = vr_1 + Σ_{k=1}^{K-1} (vr_{k+1} - vr_k) × Δv30[k,t]
+                # Usamos las MISMAS variables Δv30 para mantener consistencia
+                vr_expr = self.vr_k[1]
+                for k in K_zonas:
+                    vr_k = self.vr_k[k]
+                    vr_k_next = self.vr_k[k + 1]
+                    v_k = self.v_k[k]
+                    v_k_next = self.v_k[k + 1]
+                    vr_expr += (vr_k_next - vr_k) / (v_k_next - v_k) * self.delta_v30[k, t]
             
-            self.model.addConstr(
-                self.VR_0[t] == vr_expr,
-                name=f"VR0_linearization_{t}")
+                self.model.addConstr(
+                    self.VR_0[t] == vr_expr,
+                    name=f"VR0_linearization_{t}")
             
-            # VG_0[t] = vg_1 + Σ_{k=1}^{K-1} (vg_{k+1} - vg_k) × Δv30[k,t]
-            # Usamos las MISMAS variables Δv30 para mantener consistencia
-            vg_expr = self.vg_k[1]
-            for k in K_zonas:
-                vg_k = self.vg_k[k]
-                vg_k_next = self.vg_k[k + 1]
-                v_k = self.v_k[k]
-                v_k_next = self.v_k[k + 1]
-                vg_expr += (vg_k_next - vg_k) / (v_k_next - v_k) * self.delta_v30[k, t]
+                # VG_0[t] = vg_1 + Σ_{k=1}^{K-1} (vg_{k+1} - vg_k) × Δv30[k,t]
+                # Usamos las MISMAS variables Δv30 para mantener consistencia
+                vg_expr = self.vg_k[1]
+                for k in K_zonas:
+                    vg_k = self.vg_k[k]
+                    vg_k_next = self.vg_k[k + 1]
+                    v_k = self.v_k[k]
+                    v_k_next = self.v_k[k + 1]
+                    vg_expr += (vg_k_next - vg_k) / (v_k_next - v_k) * self.delta_v30[k, t]
             
-            self.model.addConstr(
-                self.VG_0[t] == vg_expr,
-                name=f"VG0_linearization_{t}")
+                self.model.addConstr(
+                    self.VG_0[t] == vg_expr,
+                    name=f"VG0_linearization_{t}")
             
-            # Restricciones de linealización por zonas para Δv30[k,t]
-            # Estas aseguran que la interpolación sea correcta
-            for k in K_zonas:
-                v_k = self.v_k[k]
-                v_k_next = self.v_k[k + 1]
+                # Restricciones de linealización por zonas para Δv30[k,t]
+                # Estas aseguran que la interpolación sea correcta
+                for k in K_zonas:
+                    v_k = self.v_k[k]
+                    v_k_next = self.v_k[k + 1]
                 
-                # 1. Δv30[k,t] ≤ v_{k+1} - v_k
-                #    El incremento no puede exceder el ancho de la zona
-                self.model.addConstr(
-                    self.delta_v30[k, t] <= v_k_next - v_k,
-                    name=f"delta_v30_upper_{k}_{t}")
+                    # 1. Δv30[k,t] ≤ v_{k+1} - v_k
+                    #    El incremento no puede exceder el ancho de la zona
+                    self.model.addConstr(
+                        self.delta_v30[k, t] <= v_k_next - v_k,
+                        name=f"delta_v30_upper_{k}_{t}")
                 
-                # 2. Δv30[k,t] ≥ φ_30[k,t] × (v_{k+1} - v_k)
-                #    Si zona k está completa (φ_30[k,t]=1), el incremento es máximo
-                self.model.addConstr(
-                    self.delta_v30[k, t] >= self.phi_30[k, t] * (v_k_next - v_k),
-                    name=f"delta_v30_lower_{k}_{t}")
+                    # 2. Δv30[k,t] ≥ φ_30[k,t] × (v_{k+1} - v_k)
+                    #    Si zona k está completa (φ_30[k,t]=1), el incremento es máximo
+                    if curva_mip:
+                        self.model.addConstr(
+                            self.delta_v30[k, t] >= self.phi_30[k, t] * (v_k_next - v_k),
+                            name=f"delta_v30_lower_{k}_{t}")
                 
-                # 3. Δv30[k,t] ≤ φ_30[k-1,t] × (v_{k+1} - v_k)
-                #    Solo se puede tener incremento en zona k si zona k-1 está completa
-                if k > 1:
-                    self.model.addConstr(
-                        self.delta_v30[k, t] <= self.phi_30[k-1, t] * (v_k_next - v_k),
-                        name=f"delta_v30_ordering_{k}_{t}")
-                # Para k=1, no hay restricción previa (zona base siempre activa)
+                    # 3. Δv30[k,t] ≤ φ_30[k-1,t] × (v_{k+1} - v_k)
+                    #    Solo se puede tener incremento en zona k si zona k-1 está completa
+                    if curva_mip and k > 1:
+                        self.model.addConstr(
+                            self.delta_v30[k, t] <= self.phi_30[k-1, t] * (v_k_next - v_k),
+                            name=f"delta_v30_ordering_{k}_{t}")
+                    # Para k=1, no hay restricción previa (zona base siempre activa)
+        else:
+            # V_30Nov[t], VR_0[t] y VG_0[t] sobre la curva de puntos (v_k, vr_k, vg_k)
+            bits = range(1, bits_logaritmicos(len(self.K)) + 1)
+            v_pts = [self.v_k[k] for k in self.K]
+            for t in self.T:
+                agregar_curva(
+                    self.model, self.formulacion_pwl, self.V_30Nov[t], [self.VR_0[t], self.VG_0[t]], v_pts,
+                    [[self.vr_k[k] for k in self.K], [self.vg_k[k] for k in self.K]],
+                    nombre=f"v30_{t}",
+                    lambdas=[self.lambda_30[k, t] for k in self.K] if self.lambda_30 else (),
+                    binarias=[self.z_30[l, t] for l in bits] if self.z_30 else ())
         
         # ========== 3. GENERACIÓN EN EL TORO ==========
+        self.registro.marcar('restricciones.3')
         print("  3. Generación en El Toro...")
-        for t in self.T:
+        for t in (self.T if not self.reducir else ()):
             for w in self.W:
                 # qg[1,w,t] = qer[w,t] + qeg[w,t]
                 self.model.addConstr(
@@ -421,6 +629,7 @@ class ModeloLajaLatex:
                 
         
         # ========== 3b. BALANCE DE VOLÚMENES POR USO (VR Y VG) ==========
+        self.registro.marcar('restricciones.3b')
         print("  3b. Balance de volúmenes por uso (VR y VG)...")
         for t in self.T:
             for w in self.W:
@@ -448,8 +657,8 @@ class ModeloLajaLatex:
                         name=f"balance_VG_{w}_{t}")
         
         # Restricción adicional: volúmenes finales no negativos (ya garantizado por lb=0 en definición de variables)
-        # Pero podemos agregar explícitamente para claridad:
-        for t in self.T:
+        # Pero podemos agregar explícitamente para claridad (se omite con reducir=True):
+        for t in (self.T if not self.reducir else ()):
             # VR[48,t] ≥ 0  (sobrante de riego no negativo)
             self.model.addConstr(
                 self.VR[48, t] >= 0,
@@ -461,47 +670,53 @@ class ModeloLajaLatex:
                 name=f"VG_final_nonneg_{t}")
         
         # ========== 4. BALANCE DE VOLUMEN EN EL LAGO ==========
+        self.registro.marcar('restricciones.4')
         print("  4. Balance de volumen del lago...")
         for t in self.T:
             for w in self.W:
                 if w == 1 and t == 1:
                     # V[1,1] = V_0 + (QA[1,1,1] - qg[1,1,1] - qf[1,1]) * FS[1] / 10^6
-                    self.model.addConstr(
+                    self.balance_lago[w, t] = self.model.addConstr(
                         self.V[w, t] <= self.V_0 + (self.QA[1, w, t] - self.qg[1, w, t] - self.qf[w, t]) * self.FS[w] / 1000000,
                         name=f"balance_vol_11")
                 elif w == 1 and t > 1:
                     # V[1,t] = V[48,t-1] + (QA[1,1,t] - qg[1,1,t] - qf[1,t]) * FS[1] / 10^6
-                    self.model.addConstr(
+                    self.balance_lago[w, t] = self.model.addConstr(
                         self.V[w, t] <= self.V[48, t-1] + (self.QA[1, w, t] - self.qg[1, w, t] - self.qf[w, t]) * self.FS[w] / 1000000,
                         name=f"balance_vol_1{t}")
                 else:
                     # V[w,t] = V[w-1,t] + (QA[1,w,t] - qg[1,w,t] - qf[w,t]) * FS[w] / 10^6
-                    self.model.addConstr(
+                    self.balance_lago[w, t] = self.model.addConstr(
                         self.V[w, t] <= self.V[w-1, t] + (self.QA[1, w, t] - self.qg[1, w, t] - self.qf[w, t]) * self.FS[w] / 1000000,
                         name=f"balance_vol_{w}_{t}")
         
         # ========== 5. VOLÚMENES MÍNIMOS Y MÁXIMOS DEL LAGO ==========
+        self.registro.marcar('restricciones.5')
         print("  5. Volúmenes mínimos y máximos del lago...")
-        for t in self.T:
-            for w in self.W:
-                # V[w,t] ≥ V_MIN - M * β[w,t]
-                self.model.addConstr(
-                    self.V[w, t] >= self.V_MIN - self.M_bigM * self.beta[w, t],
-                    name=f"vol_min_{w}_{t}")
+        if self.bigm == 'indicador':
+            self._volumenes_indicador()
+        else:
+            for t in self.T:
+                for w in self.W:
+                    # V[w,t] ≥ V_MIN - M * β[w,t]
+                    self.model.addConstr(
+                        self.V[w, t] >= self.V_MIN - self.M_vol_min * self.beta[w, t],
+                        name=f"vol_min_{w}_{t}")
                 
-                # V[w,t] ≤ V_MAX + M * δ[w,t]
-                self.model.addConstr(
-                    self.V[w, t] <= self.V_MAX + self.M_bigM * self.delta[w, t],
-                    name=f"vol_max_{w}_{t}")
+                    # V[w,t] ≤ V_MAX + M * δ[w,t]
+                    self.model.addConstr(
+                        self.V[w, t] <= self.V_MAX + self.M_vol_max * self.delta[w, t],
+                        name=f"vol_max_{w}_{t}")
         
         # V[48,6] ≥ V_F (Volumen final esperado al término de la última temporada)
         self.model.addConstr(
-            self.V[48, 6] >= self.V_F,
+            self.V[self.W[-1], self.T[-1]] >= self.V_F,
             name="vol_final")
         
         # ========== 6. INCLUSIÓN DE FILTRACIONES ==========
+        self.registro.marcar('restricciones.6')
         print("  6. Inclusión de filtraciones en Laja...")
-        for t in self.T:
+        for t in (self.T if not self.reducir else ()):
             for w in self.W:
                 # qg[16,w,t] = qf[w,t]
                 self.model.addConstr(
@@ -509,52 +724,31 @@ class ModeloLajaLatex:
                     name=f"laja_filt_{w}_{t}")
         
         # ========== 7. BALANCE DE FLUJO EN REDES (Genérico usando ARCOS_RED) ==========
+        self.registro.marcar('restricciones.7')
         print("  7. Balance de flujo en redes...")
+        red = self.compilar_red(self.ARCOS_RED)
+        variables_red = {'qg': self.qg, 'qv': self.qv, 'qer': self.qer, 'qeg': self.qeg,
+                         'qf': self.qf, 'qp': self.qp}
+        # Σ QA entrante - Σ QA saliente por nodo, semana y temporada
+        aporte_neto = red.constante(self.parametros.QA[:, :len(self.W), :len(self.T)])
         for nodo in self.NODOS_BALANCE:
-            for t in self.T:
-                for w in self.W:
-                    # Construir flujo entrante y saliente para este nodo
-                    flujo_entrante = 0
-                    flujo_saliente = 0
-                    
-                    # Filtrar arcos que corresponden a este nodo
-                    arcos_nodo = [arco for arco in self.ARCOS_RED if arco['nodo'] == nodo]
-                    
-                    for arco in arcos_nodo:
-                        var_type = arco['var']
-                        idx = arco['idx']
-                        tipo = arco['tipo']
-                        
-                        # Seleccionar la variable correcta según el tipo
-                        if var_type == 'qa':
-                            valor = self.QA[idx, w, t]
-                        elif var_type == 'qg':
-                            valor = self.qg[idx, w, t]
-                        elif var_type == 'qv':
-                            valor = self.qv[idx, w, t]
-                        elif var_type == 'qer':
-                            valor = self.qer[w, t]
-                        elif var_type == 'qeg':
-                            valor = self.qeg[w, t]
-                        elif var_type == 'qf':
-                            valor = self.qf[w, t]
-                        elif var_type == 'qp_sum':
-                            valor = gp.quicksum(self.qp[d, idx, w, t] for d in self.D)
-                        else:
-                            continue  # Variable no reconocida
-                        
-                        # Agregar al flujo correspondiente
-                        if tipo == 'in':
-                            flujo_entrante += valor
-                        elif tipo == 'out':
-                            flujo_saliente += valor
-                    
-                    # Agregar restricción de balance
-                    self.model.addConstr(
-                        flujo_entrante == flujo_saliente,
+            n = red.indice_nodo[nodo]
+            terminos = self._terminos_red(red, n)
+            if not terminos and not aporte_neto[n].any():
+                continue  # Con reducir=True el balance queda 0 = 0 (El Toro)
+            coeficientes = [signo for _, _, signo in terminos]
+            for it, t in enumerate(self.T):
+                for iw, w in enumerate(self.W):
+                    # Σ entrantes - Σ salientes = -aporte neto de afluentes
+                    flujo_neto = gp.LinExpr(
+                        coeficientes,
+                        [variables_red[familia][prefijo + (w, t)] for familia, prefijo, _ in terminos])
+                    self.balance_red[nodo, w, t] = self.model.addLConstr(
+                        flujo_neto, GRB.EQUAL, 0.0 - aporte_neto[n, iw, it],
                         name=f"Balance_{nodo}_{w}_{t}")
         
         # RIESALTOS: Restricción especial (no es un balance de flujo)
+        self.registro.marcar('restricciones.7b')
         print("  7b. Restricción especial RieSaltos...")
         for t in self.T:
             for w in self.W:
@@ -563,75 +757,96 @@ class ModeloLajaLatex:
                     name=f"riesaltos_{w}_{t}")
         
         # ========== 8. CUMPLIMIENTO DE DEMANDAS DE RIEGO ==========
+        self.registro.marcar('restricciones.8')
         print("  8. Cumplimiento de demandas de riego...")
         for t in self.T:
             for w in self.W:
                 for d in self.D:
                     for j in self.J:
+                        if (d, j, w, t) not in self.demanda_activa:
+                            continue  # QD = 0: sup = qp y def = 0 (ver calcular_indices_activos)
                         # QD[d,j,w] - qp[d,j,w,t] = def[d,j,w,t] - sup[d,j,w,t]
                         self.model.addConstr(
                             self.QD.get((d, j, w), 0) - self.qp[d, j, w, t] == self.deficit[d, j, w, t] - self.superavit[d, j, w, t],
                             name=f"balance_riego_{d}_{j}_{w}_{t}")
         
         # ========== 9. ACTIVACIÓN DE PENALIZACIONES POR CONVENIO ==========
+        self.registro.marcar('restricciones.9')
         print("  9. Activación de penalizaciones por convenio...")
-        for t in self.T:
-            for w in self.W:
-                # Canal Abanico (j=4)
-                # Primeros regantes: def[1,4,w,t] ≤ M * (1 + η[1,4,w,t] - α[w,t])
-                self.model.addConstr(
-                    self.deficit[1, 4, w, t] <= self.M_bigM * (1 + self.eta[1, 4, w, t] - self.alpha[w, t]),
-                    name=f"bigM_abanico_1_{w}_{t}")
+        if self.bigm == 'indicador':
+            self._convenio_indicador()
+        else:
+            M = self.M_deficit  # M[d-1, j-1, w-1]
+            activa = self.demanda_activa  # Sin fila donde QD = 0 (déficit nulo)
+            for t in self.T:
+                for w in self.W:
+                    # Canal Abanico (j=4)
+                    # Primeros regantes: def[1,4,w,t] ≤ M * (1 + η[1,4,w,t] - α[w,t])
+                    if (1, 4, w, t) in activa:
+                        self.model.addConstr(
+                            self.deficit[1, 4, w, t] <= M[0, 3, w-1] * (1 + self.eta[1, 4, w, t] - self.alpha[w, t]),
+                            name=f"bigM_abanico_1_{w}_{t}")
                 
-                # Segundos y emergencia en Abanico
-                for d in [2, 3]:
-                    self.model.addConstr(
-                        self.deficit[d, 4, w, t] <= self.M_bigM * self.eta[d, 4, w, t],
-                        name=f"bigM_abanico_{d}_{w}_{t}")
+                    # Segundos y emergencia en Abanico
+                    for d in [2, 3]:
+                        if (d, 4, w, t) in activa:
+                            self.model.addConstr(
+                                self.deficit[d, 4, w, t] <= M[d-1, 3, w-1] * self.eta[d, 4, w, t],
+                                name=f"bigM_abanico_{d}_{w}_{t}")
                 
-                # Canal RieZaCo (j=1)
-                # Primeros regantes: def[1,1,w,t] ≤ M * (η[1,1,w,t] + α[w,t])
-                self.model.addConstr(
-                    self.deficit[1, 1, w, t] <= self.M_bigM * (self.eta[1, 1, w, t] + self.alpha[w, t]),
-                    name=f"bigM_riezaco_1_{w}_{t}")
+                    # Canal RieZaCo (j=1)
+                    # Primeros regantes: def[1,1,w,t] ≤ M * (η[1,1,w,t] + α[w,t])
+                    if (1, 1, w, t) in activa:
+                        self.model.addConstr(
+                            self.deficit[1, 1, w, t] <= M[0, 0, w-1] * (self.eta[1, 1, w, t] + self.alpha[w, t]),
+                            name=f"bigM_riezaco_1_{w}_{t}")
                 
-                # Segundos y emergencia en RieZaCo
-                for d in [2, 3]:
-                    self.model.addConstr(
-                        self.deficit[d, 1, w, t] <= self.M_bigM * self.eta[d, 1, w, t],
-                        name=f"bigM_riezaco_{d}_{w}_{t}")
+                    # Segundos y emergencia en RieZaCo
+                    for d in [2, 3]:
+                        if (d, 1, w, t) in activa:
+                            self.model.addConstr(
+                                self.deficit[d, 1, w, t] <= M[d-1, 0, w-1] * self.eta[d, 1, w, t],
+                                name=f"bigM_riezaco_{d}_{w}_{t}")
                 
-                # Canal RieTucapel (j=2)
-                # Primeros regantes: def[1,2,w,t] ≤ M * (η[1,2,w,t] + α[w,t])
-                self.model.addConstr(
-                    self.deficit[1, 2, w, t] <= self.M_bigM * (self.eta[1, 2, w, t] + self.alpha[w, t]),
-                    name=f"bigM_tucapel_1_{w}_{t}")
+                    # Canal RieTucapel (j=2)
+                    # Primeros regantes: def[1,2,w,t] ≤ M * (η[1,2,w,t] + α[w,t])
+                    if (1, 2, w, t) in activa:
+                        self.model.addConstr(
+                            self.deficit[1, 2, w, t] <= M[0, 1, w-1] * (self.eta[1, 2, w, t] + self.alpha[w, t]),
+                            name=f"bigM_tucapel_1_{w}_{t}")
                 
-                # Segundos y emergencia en RieTucapel
-                for d in [2, 3]:
-                    self.model.addConstr(
-                        self.deficit[d, 2, w, t] <= self.M_bigM * self.eta[d, 2, w, t],
-                        name=f"bigM_tucapel_{d}_{w}_{t}")
+                    # Segundos y emergencia en RieTucapel
+                    for d in [2, 3]:
+                        if (d, 2, w, t) in activa:
+                            self.model.addConstr(
+                                self.deficit[d, 2, w, t] <= M[d-1, 1, w-1] * self.eta[d, 2, w, t],
+                                name=f"bigM_tucapel_{d}_{w}_{t}")
                 
-                # Canal RieSaltos (j=3)
-                for d in self.D:
-                    self.model.addConstr(
-                        self.deficit[d, 3, w, t] <= self.M_bigM * self.eta[d, 3, w, t],
-                        name=f"bigM_saltos_{d}_{w}_{t}")
+                    # Canal RieSaltos (j=3)
+                    for d in self.D:
+                        if (d, 3, w, t) in activa:
+                            self.model.addConstr(
+                                self.deficit[d, 3, w, t] <= M[d-1, 2, w-1] * self.eta[d, 3, w, t],
+                                name=f"bigM_saltos_{d}_{w}_{t}")
         
         # ========== 10. CAPACIDADES ==========
+        self.registro.marcar('restricciones.10')
         print("  10. Capacidades de centrales...")
         for t in self.T:
             for i in self.I:
                 for w in self.W:
-                    # qg[i,w,t] ≤ γ_i
+                    # qg[i,w,t] ≤ γ_i  (cota de la variable con reducir=True, salvo qg[1] = qer + qeg)
+                    if self.reducir and isinstance(self.qg[i, w, t], gp.Var):
+                        self.qg[i, w, t].UB = self.gamma[i]
+                        continue
                     self.model.addConstr(
                         self.qg[i, w, t] <= self.gamma[i],
                         name=f"cap_max_{i}_{w}_{t}")
         
         # ========== 11. DEFINICIÓN DE ENERGÍA GENERADA ==========
+        self.registro.marcar('restricciones.11')
         print("  11. Definición de energía generada...")
-        for t in self.T:
+        for t in (self.T if not self.reducir else ()):  # Con reducir=True GEN es una expresión
             for i in self.I:
                 # GEN[i,t] = Σ_w qg[i,w,t] * ρ_i * FS_w / (3600 * 1000)
                 self.model.addConstr(
@@ -641,6 +856,7 @@ class ModeloLajaLatex:
                     ),
                     name=f"def_energia_{i}_{t}")
         
+        self.registro.cerrar_marca()
         print("✓ Restricciones creadas correctamente")
         
     def crear_funcion_objetivo(self):
@@ -680,17 +896,519 @@ class ModeloLajaLatex:
         
         print("✓ Función objetivo creada correctamente")
         
-    def construir_modelo(self):
-        """Construye el modelo completo"""
+    def _agregar_sustituciones(self):
+        """
+        Alias de las variables eliminadas con reducir=True
+        
+        V_30Nov[t] = V[32, t-1] (t > 1), qg[1,w,t] = qer + qeg, qg[16,w,t] = qf y
+        GEN[i,t] = Σ_w qg[i,w,t] ρ_i FS_w / (3600·1000). Las restricciones y
+        exportar_resultados usan los alias como si fueran las variables.
+        """
+        for t in self.T[1:]:
+            self.V_30Nov[t] = self.V[32, t-1]
+        for t in self.T:
+            for w in self.W:
+                self.qg[1, w, t] = self.qer[w, t] + self.qeg[w, t]
+                self.qg[16, w, t] = self.qf[w, t]
+        for i in self.I:
+            for t in self.T:
+                self.GEN[i, t] = gp.quicksum(
+                    self.qg[i, w, t] * self.rho[i] * self.FS[w] / (3600 * 1000)
+                    for w in self.W
+                )
+    
+    def calcular_indices_activos(self):
+        """
+        Combinaciones (d, j, w, t) en que se crean las variables de riego
+        
+        demanda_activa: QD[d,j,w] > 0. Solo ahí hay deficit, superavit, eta,
+            balance de riego y fila de convenio. Con QD = 0 el déficit óptimo
+            es 0 (bajar def y sup a la vez mantiene el balance y mejora el
+            objetivo), así que deficit = eta = 0 y superavit = qp.
+        qp_activo: demanda_activa más los canales que aparecen en la red
+            (qp_sum incluye todas las demandas d) y qp[3,3] (RieSaltos). Un qp
+            fuera de esos solo aparece en su balance de riego con QD = 0, así
+            que vale 0.
+        
+        Con indices_dispersos=False se usan todas las combinaciones.
+        """
+        riego = list(itertools.product(self.D, self.J, self.W, self.T))
+        if not self.indices_dispersos:
+            self.demanda_activa = set(riego)
+            self.qp_activo = set(riego)
+            return
+        
+        QD = np.asarray(self.parametros.QD, dtype=np.float64)
+        red = self.compilar_red(self.ARCOS_RED)
+        canales_red = {prefijo[1] for terminos in red.terminos
+                       for familia, prefijo, _ in terminos if familia == 'qp'}
+        self.demanda_activa = {(d, j, w, t) for d, j, w, t in riego if QD[d-1, j-1, w-1] > 0}
+        self.qp_activo = self.demanda_activa | {
+            (d, j, w, t) for d, j, w, t in riego if j in canales_red or (d, j) == (3, 3)}
+        
+        print("Índices de riego activos:")
+        print(f"  deficit/superavit/eta: {len(self.demanda_activa):,} de {len(riego):,}")
+        print(f"  qp: {len(self.qp_activo):,} de {len(riego):,}")
+    
+    # Paso [hm³] al que se redondean hacia afuera las cotas de volumen alcanzable
+    # (ver _redondear_afuera)
+    PASO_ALCANCE = 0.01
+    
+    def calcular_alcance_volumen(self, max_iteraciones=20):
+        """
+        Volumen mínimo y máximo alcanzable del lago en cada semana
+        
+        El balance del lago es V[w] ≤ V[w-1] + (QA[1,w] - qg[1,w] - qf[w])·FS_w/10^6
+        con qg ≥ 0 y qf ≥ mín f(V) en el rango de V[w]:
+            hacia adelante (desde V_0): V[w] ≤ V_max[w-1] + (QA[1,w] - qf_min[w])·FS_w/10^6
+            hacia atrás (desde V[48,6] ≥ V_F): V[w-1] ≥ V_min[w] - (QA[1,w] - qf_min[w])·FS_w/10^6
+        sobre el piso y techo de V (curva de filtraciones y vol_min/vol_max). Como
+        qf_min depende del rango, las dos pasadas se repiten hasta que no cambian.
+        
+        Returns:
+            tuple: (V_min, V_max) arreglos (w, t) [hm³], o None si los datos son
+                   infactibles (V_F no alcanzable desde V_0)
+        """
+        nW, nT = len(self.W), len(self.T)
+        FS = np.array([self.FS[w] for w in self.W]) / 1000000
+        fs = np.tile(FS, nT)  # Semanas en orden (t, w)
+        entrada = self.parametros.QA[0, :nW, :nT].T.reshape(-1) * fs
+        v_pts = np.array([self.v_k[k] for k in self.K], dtype=np.float64)
+        f_pts = np.array([self.f_k[k] for k in self.K], dtype=np.float64)
+        
+        piso = max(0.0, self.V_MIN - self.M_vol_min, v_pts[0])
+        techo = min(self.V_MAX + self.M_vol_max, v_pts[-1])
+        
+        def qf_minimo(lo, hi):
+            interiores = f_pts[(v_pts > lo) & (v_pts < hi)]
+            return float(min(np.interp(lo, v_pts, f_pts), np.interp(hi, v_pts, f_pts), *interiores))
+        
+        n = nW * nT
+        lo = np.full(n, piso)
+        hi = np.full(n, techo)
+        lo[-1] = max(lo[-1], self.V_F)
+        for _ in range(max_iteraciones):
+            anterior = (lo.copy(), hi.copy())
+            neto = entrada - np.array([qf_minimo(lo[i], hi[i]) for i in range(n)]) * fs
+            previo = self.V_0
+            for i in range(n):
+                hi[i] = min(hi[i], previo + neto[i])
+                previo = hi[i]
+            for i in range(n - 1, 0, -1):
+                lo[i-1] = max(lo[i-1], lo[i] - neto[i])
+            if (lo > hi).any() or self.V_0 < lo[0] - neto[0]:
+                return None
+            if np.array_equal(lo, anterior[0]) and np.array_equal(hi, anterior[1]):
+                break
+        
+        lo, hi = self._redondear_afuera(lo, hi, self.PASO_ALCANCE)
+        return lo.reshape(nT, nW).T, hi.reshape(nT, nW).T
+    
+    def fijar_por_alcance(self):
+        """
+        Aplica calcular_alcance_volumen al modelo construido
+        
+        Acota V[w,t] y V_30Nov[t] (= V[32,t-1], V_30Nov_1 en t=1) y fija las
+        binarias de zona: φ[k]=1 si el volumen mínimo ya completa la zona k
+        (V ≥ v_{k+1}) y φ[k]=0 si el máximo no la completa (V ≤ v_{k+1}).
+        Parte siempre de las cotas del modelo sin fijar, así que se puede
+        repetir tras actualizar_afluentes.
+        
+        Returns:
+            int: Binarias fijadas
+        """
+        familias = {'V': self.V, 'V_30Nov': self.V_30Nov, 'phi': self.phi_var, 'phi_30': self.phi_30}
+        self._restaurar_cotas(familias)
+        
+        alcance = self.calcular_alcance_volumen()
+        if alcance is None:
+            print("  ⚠ V_F no es alcanzable desde V_0 con los afluentes dados: no se fijan cotas")
+            self.alcance_V = None
+            return 0
+        V_min, V_max = alcance
+        self.alcance_V = alcance
+        
+        rango_V = {(w, t): (V_min[w-1, t-1], V_max[w-1, t-1]) for w in self.W for t in self.T}
+        rango_30 = {t: (self.V_30Nov_1, self.V_30Nov_1) if t == 1 else rango_V[32, t-1] for t in self.T}
+        for nombre, rangos in (('V', rango_V), ('V_30Nov', rango_30)):
+            for c, (lb, ub) in self._cotas_base[nombre].items():
+                lo, hi = rangos[c]
+                familias[nombre][c].LB = max(lb, lo)
+                familias[nombre][c].UB = min(ub, hi)
+        
+        fijadas = {}
+        for nombre, rango in (('phi', lambda k, *wt: rango_V[wt]), ('phi_30', lambda k, t: rango_30[t])):
+            fijadas[nombre] = 0
+            for c in self._cotas_base[nombre]:
+                lo, hi = rango(*c)
+                umbral = self.v_k[c[0] + 1]
+                if lo >= umbral:
+                    familias[nombre][c].LB = 1
+                elif hi <= umbral:
+                    familias[nombre][c].UB = 0
+                else:
+                    continue
+                fijadas[nombre] += 1
+        
+        print("Alcance del volumen del lago:")
+        print(f"  V: ancho medio del rango alcanzable {np.mean(V_max - V_min):,.1f} hm³ "
+              f"(mín {V_min.min():,.1f}, máx {V_max.max():,.1f})")
+        for nombre in ('phi', 'phi_30'):
+            total = len(self._cotas_base[nombre])
+            if total:
+                print(f"  ✓ {nombre}: {fijadas[nombre]:,} de {total:,} binarias fijadas")
+        return sum(fijadas.values())
+    
+    # Holgura [m³/s] para declarar vacío un intervalo de caudal (errores de redondeo)
+    TOLERANCIA_RED = 1e-6
+    # Paso [m³/s] al que se redondean hacia afuera las cotas de caudal (ver _redondear_afuera)
+    PASO_RED = 0.01
+    
+    def calcular_cotas_red(self, max_pasadas=50):
+        """
+        Cotas de los caudales de la red por propagación de intervalos
+        
+        Cada balance de nodo es Σ entrantes - Σ salientes = -aporte neto de QA,
+        y además qp[3,3] = qv[11] (RieSaltos) y qg[16] = qf. Partiendo de
+        0 ≤ qg[i] ≤ γ_i y de qf ≤ máx f(V) en el rango alcanzable (alcance_V, o
+        la curva completa), cada término de cada ecuación se acota con el
+        intervalo del resto de la ecuación, hacia aguas abajo (p. ej.
+        qv[3] ≤ QA[3] + γ_1 + QA[2] + ...) y hacia aguas arriba, hasta que
+        ninguna cota cambia.
+        
+        Returns:
+            dict: (familia, prefijo) -> (lb, ub), arreglos (w, t) [m³/s]; None
+                  si algún intervalo queda vacío (datos infactibles)
+        """
+        nW, nT = len(self.W), len(self.T)
+        red = self.compilar_red(self.ARCOS_RED)
+        aporte_neto = red.constante(self.parametros.QA[:, :nW, :nT])
+        
+        ecuaciones = [(red.terminos[n], -aporte_neto[n]) for n in range(len(red))]
+        ecuaciones.append(((('qp', (3, 3), 1.0), ('qv', (11,), -1.0)), np.zeros((nW, nT))))
+        ecuaciones.append(((('qg', (16,), 1.0), ('qf', (), -1.0)), np.zeros((nW, nT))))
+        
+        cotas = {}
+        for terminos, _ in ecuaciones:
+            for familia, prefijo, _ in terminos:
+                cotas[familia, prefijo] = [np.zeros((nW, nT)), np.full((nW, nT), np.inf)]
+        for (familia, prefijo), (_, ub) in cotas.items():
+            if familia == 'qg':
+                ub[:] = self.gamma[prefijo[0]]
+        v_pts = np.array([self.v_k[k] for k in self.K], dtype=np.float64)
+        f_pts = np.array([self.f_k[k] for k in self.K], dtype=np.float64)
+        if self.alcance_V is None:
+            cotas['qf', ()][1][:] = f_pts.max()
+        else:
+            for (iw, it), lo in np.ndenumerate(self.alcance_V[0]):
+                hi = self.alcance_V[1][iw, it]
+                interiores = f_pts[(v_pts > lo) & (v_pts < hi)]
+                cotas['qf', ()][1][iw, it] = max(np.interp(lo, v_pts, f_pts),
+                                                 np.interp(hi, v_pts, f_pts), *interiores)
+        
+        for _ in range(max_pasadas):
+            cambio = False
+            for terminos, rhs in ecuaciones:
+                for a, (familia_a, prefijo_a, signo_a) in enumerate(terminos):
+                    # signo_a·x_a = rhs - Σ_{b≠a} signo_b·x_b
+                    resto_min = np.zeros_like(rhs)
+                    resto_max = np.zeros_like(rhs)
+                    for b, (familia_b, prefijo_b, signo_b) in enumerate(terminos):
+                        if b == a:
+                            continue
+                        lb, ub = cotas[familia_b, prefijo_b]
+                        resto_min += signo_b * (lb if signo_b > 0 else ub)
+                        resto_max += signo_b * (ub if signo_b > 0 else lb)
+                    lo, hi = (rhs - resto_max) / signo_a, (rhs - resto_min) / signo_a
+                    if signo_a < 0:
+                        lo, hi = hi, lo
+                    lb, ub = cotas[familia_a, prefijo_a]
+                    nuevo_lb, nuevo_ub = np.maximum(lb, lo), np.minimum(ub, hi)
+                    if ((nuevo_lb > lb + 1e-9) | (nuevo_ub < ub - 1e-9)).any():
+                        cambio = True
+                    lb[:], ub[:] = nuevo_lb, nuevo_ub
+            if not cambio:
+                break
+        
+        if any((lb > ub + self.TOLERANCIA_RED).any() for lb, ub in cotas.values()):
+            return None
+        cotas = {c: self._redondear_afuera(lb, ub, self.PASO_RED) for c, (lb, ub) in cotas.items()}
+        return {c: (np.maximum(lb, 0.0), ub) for c, (lb, ub) in cotas.items()}
+    
+    @staticmethod
+    def _redondear_afuera(lo, hi, paso):
+        """
+        Amplía un intervalo al menos un paso hacia cada lado y lo redondea a múltiplos del paso
+        
+        Las cotas propagadas coinciden con las que ya implican las restricciones;
+        ampliadas solo en el error de redondeo (1e-6) dejan filas y cotas casi
+        paralelas con las que HiGHS termina en 'Solve error' o con incumbentes
+        infactibles. Un paso de holgura no cambia las binarias que se fijan salvo
+        en el borde y las cotas quedan lejos de la tolerancia de factibilidad.
+        """
+        return np.floor(lo / paso - 1.0) * paso, np.ceil(hi / paso + 1.0) * paso
+    
+    def acotar_por_red(self):
+        """
+        Aplica calcular_cotas_red a los caudales del modelo construido
+        
+        Parte de las cotas de construcción, así que se puede repetir tras
+        actualizar_afluentes.
+        
+        Returns:
+            int: Variables con cotas más ajustadas que las de construcción
+        """
+        familias = {'qg': self.qg, 'qv': self.qv, 'qer': self.qer, 'qeg': self.qeg,
+                    'qf': self.qf, 'qp': self.qp}
+        self._restaurar_cotas(familias)
+        cotas = self.calcular_cotas_red()
+        if cotas is None:
+            print("  ⚠ Los balances de la red son infactibles con los afluentes dados: no se fijan cotas")
+            return 0
+        
+        acotadas, finitas, positivas, total = 0, 0, 0, 0
+        for (familia, prefijo), (lb, ub) in cotas.items():
+            base = self._cotas_base[familia]
+            for (iw, it), lo in np.ndenumerate(lb):
+                clave = prefijo + (self.W[iw], self.T[it])
+                if clave not in base:
+                    continue  # Alias (reducir) o índice sin variable (indices_dispersos)
+                lb_base, ub_base = base[clave]
+                variable = familias[familia][clave]
+                total += 1
+                if lo > lb_base:
+                    variable.LB = lo
+                    positivas += 1
+                if ub[iw, it] < ub_base:
+                    variable.UB = ub[iw, it]
+                    finitas += ub_base >= GRB.INFINITY
+                if lo > lb_base or ub[iw, it] < ub_base:
+                    acotadas += 1
+        
+        print("Cotas de caudales por propagación en la red:")
+        print(f"  ✓ {acotadas:,} de {total:,} caudales acotados "
+              f"({finitas:,} sin cota superior previa, {positivas:,} con cota inferior > 0)")
+        return acotadas
+    
+    def _restaurar_cotas(self, familias):
+        """
+        Devuelve las variables de cada familia (nombre -> tupledict) a sus cotas
+        de construcción; la primera vez las registra en self._cotas_base
+        """
+        nuevas = [nombre for nombre in familias if nombre not in self._cotas_base]
+        if nuevas:
+            self.model.update()
+        for nombre in nuevas:
+            self._cotas_base[nombre] = {c: (v.LB, v.UB) for c, v in familias[nombre].items()
+                                        if isinstance(v, gp.Var)}
+        for nombre in familias:
+            for c, (lb, ub) in self._cotas_base[nombre].items():
+                familias[nombre][c].LB, familias[nombre][c].UB = lb, ub
+    
+    def _completar_indices_omitidos(self):
+        """
+        Entradas de qp, deficit, superavit y eta fuera de los índices activos
+        
+        qp, deficit y eta valen 0 (expresión constante) y superavit es qp, para
+        que el resto del código (objetivo, exportar_resultados) las vea igual.
+        """
+        for clave in itertools.product(self.D, self.J, self.W, self.T):
+            if clave not in self.qp:
+                self.qp[clave] = gp.LinExpr()
+            if clave not in self.deficit:
+                self.deficit[clave] = gp.LinExpr()
+                self.eta[clave] = gp.LinExpr()
+                self.superavit[clave] = self.qp[clave]
+    
+    def _terminos_red(self, red, n):
+        """
+        Términos (familia, prefijo, signo) del balance del nodo n
+        
+        Con reducir=True qg[1] y qg[16] se reemplazan por qer + qeg y qf, y se
+        suman los términos repetidos (los que se anulan desaparecen).
+        """
+        if not self.reducir:
+            return red.terminos[n]
+        sustituciones = {('qg', (1,)): (('qer', ()), ('qeg', ())), ('qg', (16,)): (('qf', ()),)}
+        netos = {}
+        for familia, prefijo, signo in red.terminos[n]:
+            for parte in sustituciones.get((familia, prefijo), ((familia, prefijo),)):
+                netos[parte] = netos.get(parte, 0.0) + signo
+        return tuple((familia, prefijo, signo) for (familia, prefijo), signo in netos.items() if signo != 0)
+    
+    def _volumenes_indicador(self):
+        """
+        Sección 5 con restricciones indicadoras: β[w,t]=0 → V ≥ V_MIN y δ[w,t]=0 → V ≤ V_MAX
+        
+        Lo que el big-M permitía con β=1 o δ=1 (V ≥ V_MIN - M, V ≤ V_MAX + M)
+        queda como cotas de V, con los M de optimalidad de calcular_bigm.
+        """
+        for t in self.T:
+            for w in self.W:
+                self.V[w, t].LB = max(0.0, self.V_MIN - self.M_vol_min)
+                self.V[w, t].UB = self.V_MAX + self.M_vol_max
+                self.model.addGenConstrIndicator(
+                    self.beta[w, t], False, self.V[w, t], GRB.GREATER_EQUAL, self.V_MIN,
+                    name=f"vol_min_{w}_{t}")
+                self.model.addGenConstrIndicator(
+                    self.delta[w, t], False, self.V[w, t], GRB.LESS_EQUAL, self.V_MAX,
+                    name=f"vol_max_{w}_{t}")
+    
+    def _convenio_indicador(self):
+        """
+        Sección 9 con restricciones indicadoras sobre η[d,j,w,t]
+        
+        η=0 → def ≤ 0 en las filas simples. En las de primeros regantes la
+        condición depende también de α, por lo que queda η=0 → def ≤ M·α
+        (RieZaCo, RieTucapel) o η=0 → def ≤ M·(1 - α) (Abanico), con el M
+        de optimalidad (QD). El déficit se acota por QD (ver calcular_bigm).
+        """
+        M = self.M_deficit  # M[d-1, j-1, w-1]
+        for (d, j, w, t), deficit in self.deficit.items():
+            if isinstance(deficit, gp.Var):
+                deficit.UB = M[d-1, j-1, w-1]
+        for t in self.T:
+            for w in self.W:
+                for j, canal in ((4, 'abanico'), (1, 'riezaco'), (2, 'tucapel'), (3, 'saltos')):
+                    for d in self.D:
+                        if (d, j, w, t) not in self.demanda_activa:
+                            continue
+                        if d == 1 and j == 4:
+                            lhs = self.deficit[d, j, w, t] + M[d-1, j-1, w-1] * self.alpha[w, t]
+                            rhs = M[d-1, j-1, w-1]
+                        elif d == 1 and j != 3:
+                            lhs = self.deficit[d, j, w, t] - M[d-1, j-1, w-1] * self.alpha[w, t]
+                            rhs = 0.0
+                        else:
+                            lhs, rhs = self.deficit[d, j, w, t], 0.0
+                        self.model.addGenConstrIndicator(
+                            self.eta[d, j, w, t], False, lhs, GRB.LESS_EQUAL, rhs,
+                            name=f"ind_{canal}_{d}_{w}_{t}")
+    
+    def analizar_curvas(self):
+        """
+        Decide qué curvas se pueden formular como LP exacto
+        
+        Revisa la forma de los puntos (v_k, f_k) y (v_k, vr_k, vg_k) junto con
+        SENTIDO_CURVAS (ver formulaciones_pwl.relajacion_exacta). Las curvas
+        exactas quedan en self.curvas_lp y se formulan solo con los deltas.
+        
+        Returns:
+            frozenset: Nombres de las curvas formuladas sin binarias
+        """
+        v_pts = [self.v_k[k] for k in self.K]
+        curvas = {
+            'filtraciones': ("V -> qf", [[self.f_k[k] for k in self.K]]),
+            'v30': ("V_30Nov -> VR_0, VG_0", [[self.vr_k[k] for k in self.K], [self.vg_k[k] for k in self.K]]),
+        }
+        lp = set()
+        print("Análisis de forma de las curvas:")
+        for nombre, (descripcion, ys_pts) in curvas.items():
+            formas = ", ".join(forma_curva(v_pts, y_pts) for y_pts in ys_pts)
+            if relajacion_exacta(v_pts, ys_pts, self.SENTIDO_CURVAS[nombre]):
+                lp.add(nombre)
+                print(f"  ✓ {descripcion} ({formas}): relajación exacta, formulación LP")
+            else:
+                print(f"  ⚠ {descripcion} ({formas}): se mantiene como MIP")
+        self.curvas_lp = frozenset(lp)
+        return self.curvas_lp
+    
+    def calcular_bigm(self):
+        """
+        M de cada restricción big-M a partir de los datos
+        
+        Con bigm='optimalidad' cada M sale de una cota que cumple toda solución
+        óptima (no necesariamente toda solución factible), así que el modelo
+        conserva el óptimo aunque excluya algunas soluciones factibles:
+            vol_min: V ≥ 0, así que basta M = V_MIN
+            vol_max: las curvas acotan V por v_K, así que basta M = v_K - V_MAX
+            bigM_* de riego: en el óptimo def[d,j,w,t] ≤ QD[d,j,w] (bajar def y
+                sup a la vez mantiene el balance de riego y mejora el objetivo),
+                así que basta M = QD[d,j,w]
+        Cada valor se acota por M_bigM para no relajar el modelo original.
+        Con bigm='global' todas usan M_bigM.
+        """
+        nW = len(self.W)
+        M = float(self.M_bigM)
+        forma = (len(self.D), len(self.J), nW)
+        if self.bigm == 'global':
+            # Con 'indicador' también se calculan: acotan V y el déficit
+            self.M_vol_min, self.M_vol_max = M, M
+            self.M_deficit = np.full(forma, M)
+            return
+        
+        self.M_vol_min = min(M, max(0.0, self.V_MIN))
+        self.M_vol_max = min(M, max(0.0, self.v_k[self.K[-1]] - self.V_MAX))
+        QD = np.asarray(self.parametros.QD, dtype=np.float64)[:, :, :nW]
+        self.M_deficit = np.minimum(M, np.maximum(QD, 0.0)).reshape(forma)
+        
+        print("Big-M por cotas de optimalidad:" if self.bigm == 'optimalidad' else
+              "Cotas para las restricciones indicadoras (M de optimalidad):")
+        print(f"  vol_min: {self.M_vol_min:,.1f}   vol_max: {self.M_vol_max:,.1f}   (global: {M:,.1f})")
+        print(f"  bigM_* de riego: máx {self.M_deficit.max():,.2f}, "
+              f"{np.mean(self.M_deficit == 0):.0%} en cero (demanda nula)")
+    
+    def construir_modelo(self, carpeta_cache=None, detectar_convexidad=True):
+        """
+        Construye el modelo completo
+        
+        Args:
+            carpeta_cache: Si se entrega, el modelo construido se guarda ahí como
+                MPS comprimido (modelo_<huella>.mps.gz) más un mapa de índices
+                (modelo_<huella>.indices.npz). La huella combina los parámetros,
+                la topología, la clase y VERSION_FORMULACION, por lo que las
+                corridas siguientes del mismo caso leen el modelo con gp.read
+                en lugar de construirlo.
+            detectar_convexidad: Formular como LP las curvas cuya relajación es
+                exacta según su forma y el sentido del objetivo (analizar_curvas)
+        """
         print("\n" + "="*70)
         print("CONSTRUYENDO MODELO - FORMULACIÓN LATEX")
         print("="*70 + "\n")
         
-        self.crear_variables()
-        self.crear_restricciones()
-        self.crear_funcion_objetivo()
-        
-        self.model.update()
+        if detectar_convexidad:
+            self.analizar_curvas()
+        else:
+            self.curvas_lp = frozenset()
+        self.calcular_bigm()
+        self.calcular_indices_activos()
+        
+        rutas_cache = self._rutas_cache_modelo(carpeta_cache) if carpeta_cache else None
+        leido = False
+        if rutas_cache is not None:
+            with self.registro.fase('cache_modelo.leer'):
+                try:
+                    leido = self._leer_modelo_cache(*rutas_cache)
+                except Exception as e:
+                    print(f"  ⚠ Caché de modelo ilegible ({e}), se reconstruirá")
+            if leido:
+                print(f"✓ Modelo cargado desde caché '{rutas_cache[0].name}'")
+        
+        if not leido:
+            with self.registro.fase('crear_variables'):
+                self.crear_variables()
+            with self.registro.fase('crear_restricciones'):
+                self.crear_restricciones()
+            with self.registro.fase('crear_funcion_objetivo'):
+                self.crear_funcion_objetivo()
+            
+            with self.registro.fase('model.update'):
+                self.model.update()
+            
+            if rutas_cache is not None:
+                with self.registro.fase('cache_modelo.escribir'):
+                    try:
+                        self._guardar_modelo_cache(*rutas_cache)
+                        print(f"✓ Caché de modelo actualizado: '{rutas_cache[0].name}'")
+                    except (OSError, gp.GurobiError) as e:
+                        print(f"  ⚠ No se pudo escribir el caché de modelo: {e}")
+        
+        if self.fijar_alcance:
+            with self.registro.fase('fijar_por_alcance'):
+                self.fijar_por_alcance()
+        if self.acotar_red:
+            with self.registro.fase('acotar_por_red'):
+                self.acotar_por_red()
         
         print("\n" + "="*70)
         print("MODELO CONSTRUIDO EXITOSAMENTE")
@@ -700,9 +1418,127 @@ class ModeloLajaLatex:
         print(f"Restricciones: {self.model.NumConstrs:,}")
         print(f"Variables binarias: {self.model.NumBinVars:,}")
         print("="*70 + "\n")
+    
+    def huella_modelo(self):
+        """SHA-256 de todo lo que determina el modelo construido"""
+        h = hashlib.sha256()
+        h.update(f"{type(self).__name__}|formulacion-v{self.VERSION_FORMULACION}|pwl-{self.formulacion_pwl}|"
+                 f"lp-{','.join(sorted(self.curvas_lp))}|bigm-{self.bigm}|reducir-{self.reducir}|"
+                 f"dispersos-{self.indices_dispersos}|".encode())
+        h.update(self.parametros.huella().encode())
+        h.update(repr((self.T, self.W, self.I, self.D, self.J, self.A, self.NODOS_BALANCE)).encode())
+        h.update(repr([(a['nodo'], a['tipo'], a['var'], a['idx']) for a in self.ARCOS_RED]).encode())
+        return h.hexdigest()
+    
+    def _rutas_cache_modelo(self, carpeta_cache):
+        carpeta = Path(carpeta_cache)
+        prefijo = f"modelo_{self.huella_modelo()[:16]}"
+        return carpeta / f"{prefijo}.mps.gz", carpeta / f"{prefijo}.indices.npz"
+    
+    def _guardar_modelo_cache(self, ruta_mps, ruta_indices):
+        """
+        Escribe el modelo (MPS comprimido) y el mapa clave -> índice de cada
+        familia de variables y de las restricciones que usa actualizar_afluentes
+        """
+        ruta_mps.parent.mkdir(parents=True, exist_ok=True)
+        mapa = {'__version__': np.array(self.VERSION_FORMULACION)}
+        for nombre in self.VARIABLES_MODELO:
+            # Las expresiones de reducir=True no se guardan: se rearman al leer
+            variables = {c: v for c, v in getattr(self, nombre).items() if isinstance(v, gp.Var)}
+            mapa[f'claves__{nombre}'] = np.array(list(variables.keys()), dtype=np.int64)
+            mapa[f'indices__{nombre}'] = np.array([v.index for v in variables.values()], dtype=np.int64)
+        mapa['claves__balance_lago'] = np.array(list(self.balance_lago), dtype=np.int64)
+        mapa['indices__balance_lago'] = np.array([c.index for c in self.balance_lago.values()], dtype=np.int64)
+        nodos = list(dict.fromkeys(nodo for nodo, _, _ in self.balance_red))
+        mapa['nodos__balance_red'] = np.array(nodos)
+        mapa['claves__balance_red'] = np.array([(nodos.index(n), w, t) for n, w, t in self.balance_red], dtype=np.int64)
+        mapa['indices__balance_red'] = np.array([c.index for c in self.balance_red.values()], dtype=np.int64)
+        
+        # Escritura atómica: primero el MPS y al final el mapa, que es el que marca el caché como válido
+        fd, ruta_tmp = tempfile.mkstemp(dir=ruta_mps.parent, suffix='.mps.gz')
+        os.close(fd)
+        try:
+            self.model.write(ruta_tmp)
+            os.replace(ruta_tmp, ruta_mps)
+        except BaseException:
+            os.remove(ruta_tmp)
+            raise
+        fd, ruta_tmp = tempfile.mkstemp(dir=ruta_mps.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **mapa)
+            os.replace(ruta_tmp, ruta_indices)
+        except BaseException:
+            os.remove(ruta_tmp)
+            raise
+    
+    def _leer_modelo_cache(self, ruta_mps, ruta_indices):
+        """
+        Lee el modelo guardado y vuelve a enlazar los tupledict (V, qg, phi_var, ...)
         
-    def optimizar(self, time_limit=None, mip_gap=None):
-        """Resuelve el modelo"""
+        Returns:
+            bool: True si el caché existía y se cargó
+        """
+        if not (ruta_mps.exists() and ruta_indices.exists()):
+            return False
+        
+        with np.load(ruta_indices, allow_pickle=False) as datos:
+            if int(datos['__version__']) != self.VERSION_FORMULACION:
+                return False
+            mapa = {c: datos[c] for c in datos.files}
+        
+        modelo = gp.read(str(ruta_mps))
+        variables = modelo.getVars()
+        restricciones = modelo.getConstrs()
+        
+        def claves(nombre):
+            arreglo = mapa[f'claves__{nombre}']
+            if arreglo.ndim == 1:
+                return arreglo.tolist()
+            return [tuple(c) for c in arreglo.tolist()]
+        
+        self.model.dispose()
+        self.model = modelo
+        for nombre in self.VARIABLES_MODELO:
+            setattr(self, nombre, gp.tupledict(zip(
+                claves(nombre), (variables[i] for i in mapa[f'indices__{nombre}'].tolist()))))
+        self.balance_lago = dict(zip(
+            claves('balance_lago'), (restricciones[i] for i in mapa['indices__balance_lago'].tolist())))
+        nodos = mapa['nodos__balance_red'].tolist()
+        self.balance_red = {(nodos[n], w, t): restricciones[i] for (n, w, t), i in zip(
+            claves('balance_red'), mapa['indices__balance_red'].tolist())}
+        if self.reducir:
+            self._agregar_sustituciones()
+        self._completar_indices_omitidos()
+        return True
+        
+    def optimizar(self, time_limit=None, mip_gap=None, inicio_relajar_y_fijar=None, carpeta_inicio=None,
+                  inicio_caso_base=None, archivo_control=None, reanudar=False):
+        """
+        Resuelve el modelo
+        
+        Args:
+            time_limit: Límite de tiempo [s]
+            mip_gap: Gap relativo (2% por defecto)
+            inicio_relajar_y_fijar: Si se entrega (dict de opciones, {} para las
+                de omisión), corre antes relajar_y_fijar y usa su solución como
+                MIP start
+            carpeta_inicio: Carpeta de resultados de una corrida anterior cuyas
+                decisiones se cargan como MIP start (ver cargar_inicio)
+            inicio_caso_base: Si se entrega (dict de opciones, {} para las de
+                omisión), resuelve antes el Caso Base de filtración fija y
+                repara su solución como MIP start (ver inicio_caso_base.py)
+            archivo_control: Archivo .npz donde se guarda cada incumbente que
+                mejora durante la optimización (ver puntos_control.py)
+            reanudar: Cargar el incumbente de archivo_control como MIP start
+                (tiene prioridad sobre los otros puntos de partida)
+        
+        La lógica de vol_min/vol_max y del convenio (bigm) no se elige aquí:
+        'indicador' agrega restricciones generales en lugar de las filas big-M
+        de las secciones 5 y 9 y cambia las cotas de V y del déficit, así que
+        cambiarla exige reconstruir el modelo. Se fija en el constructor y
+        comparar_bigm.py construye un modelo por modo.
+        """
         print("\n" + "="*70)
         print("INICIANDO OPTIMIZACIÓN")
         print("="*70 + "\n")
@@ -714,7 +1550,32 @@ class ModeloLajaLatex:
         else:
             self.model.Params.MIPGap = 0.02  # 2% por defecto
         
-        self.model.optimize()
+        if carpeta_inicio is not None:
+            with self.registro.fase('cargar_inicio'):
+                self.cargar_inicio(carpeta_inicio)
+        if inicio_relajar_y_fijar is not None:
+            from relajar_y_fijar import relajar_y_fijar
+            with self.registro.fase('relajar_y_fijar'):
+                relajar_y_fijar(self, **inicio_relajar_y_fijar)
+        etapas = None
+        if inicio_caso_base is not None:
+            from inicio_caso_base import cargar_inicio_caso_base
+            with self.registro.fase('inicio_caso_base'):
+                etapas = cargar_inicio_caso_base(self, **inicio_caso_base)
+        punto_control = None
+        if archivo_control is not None:
+            from puntos_control import PuntoControl, cargar_punto_control
+            if reanudar:
+                with self.registro.fase('reanudar'):
+                    cargar_punto_control(self, archivo_control)
+            punto_control = PuntoControl(self, archivo_control)
+            self.callbacks.append(punto_control)
+        try:
+            with self.registro.fase('optimize'):
+                self.model.optimize(self._despachar_callbacks if self.callbacks else None)
+        finally:
+            if punto_control is not None:
+                self.callbacks.remove(punto_control)
         
         print("\n" + "="*70)
         print("RESULTADOS DE LA OPTIMIZACIÓN")
@@ -725,21 +1586,140 @@ class ModeloLajaLatex:
             print(f"Valor objetivo: {self.model.ObjVal:,.2f} GWh")
             print(f"Gap de optimalidad: {self.model.MIPGap*100:.4f}%")
             print(f"Tiempo de resolución: {self.model.Runtime:.2f} segundos")
+            print(f"Lógica de convenio: {self.bigm}")
         elif self.model.status == GRB.TIME_LIMIT:
             print("⚠ Tiempo límite alcanzado")
             if hasattr(self.model, 'ObjVal'):
                 print(f"Mejor solución encontrada: {self.model.ObjVal:,.2f} GWh")
                 print(f"Gap de optimalidad: {self.model.MIPGap*100:.2f}%")
+        elif self.model.status == GRB.INTERRUPTED:
+            print("⚠ Optimización interrumpida")
+            if hasattr(self.model, 'ObjVal'):
+                print(f"Mejor solución encontrada: {self.model.ObjVal:,.2f} GWh")
+                print(f"Gap de optimalidad: {self.model.MIPGap*100:.2f}%")
         else:
             print(f"✗ Estado de optimización: {self.model.status}")
+        if etapas is not None:
+            tiempo_etapas = etapas['tiempo_base_s'] + etapas['tiempo_reparacion_s']
+            print(f"Dos etapas (Caso Base): {tiempo_etapas:.1f} s de etapas + {self.model.Runtime:.1f} s de MIP "
+                  f"= {tiempo_etapas + self.model.Runtime:.1f} s")
+            print("  (el tiempo ahorrado frente a una resolución en frío lo mide inicio_caso_base.comparar_con_frio)")
+        if punto_control is not None and punto_control.guardados:
+            print(f"Incumbentes guardados en '{archivo_control}': {punto_control.guardados}")
         
         print("="*70 + "\n")
         
+    def cargar_inicio(self, carpeta, modo='start', familias=FAMILIAS_DECISION):
+        """
+        Usa los CSV de exportar_resultados de una corrida anterior como punto
+        de partida (ver inicio_resultados.py)
+        
+        Args:
+            carpeta: Carpeta de resultados
+            modo: 'start' (MIP start) o 'hint' (VarHintVal)
+            familias: Familias a cargar; por omisión las decisiones de
+                operación y Gurobi completa el resto (None para todas)
+        
+        Returns:
+            dict: 'cargadas', 'sin_valor' y 'recortadas'
+        """
+        from inicio_resultados import cargar_inicio_resultados
+        
+        if not self.balance_lago:
+            raise RuntimeError("Construya el modelo (construir_modelo) antes de cargar un punto de partida")
+        return cargar_inicio_resultados(self, carpeta, modo=modo, familias=familias)
+    
+    def _despachar_callbacks(self, model, where):
+        """Callback de Gurobi que llama a cada función de self.callbacks"""
+        for callback in self.callbacks:
+            callback(model, where)
+    
+    def agregar_cortes(self, familias=FAMILIAS_CORTES, modo='estatico'):
+        """
+        Agrega desigualdades válidas al modelo construido (ver cortes_validos.py)
+        
+        Args:
+            familias: Familias de FAMILIAS_CORTES a agregar
+            modo: 'estatico' (restricciones del modelo) o 'usuario' (cortes que
+                un SeparadorCortes agrega en optimizar cuando la relajación del
+                nodo los viola; solo FAMILIAS_USUARIO)
+        
+        Returns:
+            int: Cortes generados
+        """
+        if modo not in MODOS_CORTES:
+            raise ValueError(f"modo debe ser uno de {MODOS_CORTES}, se recibió '{modo}'")
+        if modo == 'usuario' and not set(familias) <= set(FAMILIAS_USUARIO):
+            raise ValueError(f"Solo {FAMILIAS_USUARIO} se pueden agregar como cortes de usuario; "
+                             f"las demás pueden cortar soluciones factibles (use modo='estatico')")
+        cortes = generar_cortes(self, familias)
+        
+        print(f"Desigualdades válidas ({modo}):")
+        for familia, lista in cortes.items():
+            print(f"  {familia}: {len(lista):,} cortes")
+        todos = [corte for lista in cortes.values() for corte in lista]
+        if modo == 'estatico':
+            for nombre, terminos, rhs in todos:
+                self.model.addLConstr(gp.LinExpr([c for c, _ in terminos], [v for _, v in terminos]),
+                                      GRB.LESS_EQUAL, rhs, name=nombre)
+        elif todos:
+            self.model.Params.PreCrush = 1  # Los cortes de usuario se expresan en el modelo original
+            self.callbacks.append(SeparadorCortes(todos))
+        return len(todos)
+    
+    def actualizar_afluentes(self, QA, mantener_inicio=True):
+        """
+        Cambia el escenario de afluentes de un modelo ya construido
+        
+        QA solo aparece como constante en el balance del lago y en los balances
+        de los nodos con afluente, así que basta reescribir esos lados derechos
+        (sin reconstruir el modelo). Si el modelo ya tiene una solución, se deja
+        como punto de partida (MIP start) de la próxima optimización; en LP
+        Gurobi reutiliza además la base anterior.
+        
+        Args:
+            QA: Arreglo (a, w, t) de afluentes del nuevo escenario [m³/s]
+            mantener_inicio: Si es True y hay solución, fija Start = X actual
+        """
+        if not self.balance_lago:
+            raise RuntimeError("Construya el modelo (construir_modelo) antes de actualizar afluentes")
+        
+        if mantener_inicio and self.model.SolCount > 0:
+            variables = self.model.getVars()
+            self.model.setAttr('Start', variables, self.model.getAttr('X', variables))
+        
+        self.parametros = self.parametros.con_afluentes(QA)
+        self.QA = self.parametros['QA']
+        QA = self.parametros.QA[:, :len(self.W), :len(self.T)]
+        FS = np.array([self.FS[w] for w in self.W])
+        
+        # Balance del lago: V[w,t] - V[w-1,t] + (qg + qf)*FS/10^6 <= QA[1,w,t]*FS/10^6 (+ V_0 en w=1, t=1)
+        # (gurobipy divide multiplicando por el recíproco; se replica para obtener el mismo valor)
+        rhs_lago = QA[0] * FS[:, None] * (1 / 1000000)
+        rhs_lago[0, 0] += self.V_0
+        claves = list(self.balance_lago)
+        self.model.setAttr('RHS', [self.balance_lago[c] for c in claves],
+                           [rhs_lago[w - 1, t - 1] for w, t in claves])
+        
+        # Balances de red: solo los nodos que reciben o entregan afluentes
+        red = self.compilar_red(self.ARCOS_RED)
+        rhs_red = 0.0 - red.constante(QA)
+        nodos_qa = {red.nodos[n] for n in np.unique(red.matrices['qa'].nonzero()[0])}
+        claves = [c for c in self.balance_red if c[0] in nodos_qa]
+        self.model.setAttr('RHS', [self.balance_red[c] for c in claves],
+                           [rhs_red[red.indice_nodo[nodo], w - 1, t - 1] for nodo, w, t in claves])
+        
+        # Las cotas de volumen alcanzable y de caudales dependen de QA
+        if self.fijar_alcance:
+            self.fijar_por_alcance()
+        if self.acotar_red:
+            self.acotar_por_red()
+        
     def exportar_resultados(self, carpeta_salida="resultados"):
         """Exporta los resultados a archivos CSV"""
         import os
         
-        if self.model.status not in [GRB.OPTIMAL, GRB.TIME_LIMIT]:
+        if self.model.status not in [GRB.OPTIMAL, GRB.TIME_LIMIT, GRB.INTERRUPTED]:
             print("No hay solución factible para exportar")
             return
         
@@ -752,7 +1732,7 @@ class ModeloLajaLatex:
         
         # 1. Generación por central
         df_generacion = pd.DataFrame([
-            {'Central': i, 'Semana': w, 'Temporada': t, 'Caudal_m3s': self.qg[i, w, t].X}
+            {'Central': i, 'Semana': w, 'Temporada': t, 'Caudal_m3s': self._valor(self.qg[i, w, t])}
             for i in self.I for w in self.W for t in self.T
         ])
         df_generacion.to_csv(f"{carpeta_salida}/generacion.csv", index=False)
@@ -773,7 +1753,7 @@ class ModeloLajaLatex:
         
         # 3b. Volúmenes al 30 de Noviembre
         df_v30nov = pd.DataFrame([
-            {'Temporada': t, 'V_30Nov_hm3': self.V_30Nov[t].X}
+            {'Temporada': t, 'V_30Nov_hm3': self._valor(self.V_30Nov[t])}
             for t in self.T
         ])
         df_v30nov.to_csv(f"{carpeta_salida}/volumenes_30nov.csv", index=False)
@@ -817,9 +1797,9 @@ class ModeloLajaLatex:
                 'Semana': w,
                 'Temporada': t,
                 'Demanda_m3s': self.QD.get((d, j, w), 0),
-                'Provisto_m3s': self.qp[d, j, w, t].X,
-                'Deficit_m3s': self.deficit[d, j, w, t].X,
-                'Incumplimiento': self.eta[d, j, w, t].X
+                'Provisto_m3s': self._valor(self.qp[d, j, w, t]),
+                'Deficit_m3s': self._valor(self.deficit[d, j, w, t]),
+                'Incumplimiento': self._valor(self.eta[d, j, w, t])
             }
             for d in self.D for j in self.J for w in self.W for t in self.T
         ])
@@ -849,18 +1829,26 @@ class ModeloLajaLatex:
             {
                 'Central': i,
                 'Temporada': t,
-                'Energia_GWh': self.GEN[i, t].X,
-                'Energia_MWh': self.GEN[i, t].X * 1000
+                'Energia_GWh': self._valor(self.GEN[i, t]),
+                'Energia_MWh': self._valor(self.GEN[i, t]) * 1000
             }
             for i in self.I for t in self.T
         ])
         df_energia.to_csv(f"{carpeta_salida}/energia_total.csv", index=False)
         
         # 7. Variables de linealización (phi)
+        # Sin phi (sos2, logaritmica, gurobi o curva formulada como LP) se reconstruyen desde qf
         K_zonas = self.K[:-1]
+        if self.phi_var:
+            phi = self._solucion_arreglo(self.phi_var, K_zonas, self.W, self.T)
+            delta_f = self._solucion_arreglo(self.delta_f, K_zonas, self.W, self.T)
+        else:
+            phi, delta_f = zonas_desde_valor(
+                self._solucion_arreglo(self.qf, self.W, self.T), [self.f_k[k] for k in self.K])
         df_phi = pd.DataFrame([
-            {'Zona': k, 'Semana': w, 'Temporada': t, 'Phi': self.phi_var[k, w, t].X}
-            for k in K_zonas for w in self.W for t in self.T if self.phi_var[k, w, t].X > 0.5
+            {'Zona': k, 'Semana': w, 'Temporada': t, 'Phi': phi[ik, iw, it]}
+            for ik, k in enumerate(K_zonas) for iw, w in enumerate(self.W) for it, t in enumerate(self.T)
+            if phi[ik, iw, it] > 0.5
         ])
         if len(df_phi) > 0:
             df_phi.to_csv(f"{carpeta_salida}/phi_zonas.csv", index=False)
@@ -874,10 +1862,47 @@ class ModeloLajaLatex:
         
         # 9. Filtraciones incrementales por zona (delta_f)
         df_delta_f = pd.DataFrame([
-            {'Zona': k, 'Semana': w, 'Temporada': t, 'Delta_f_m3s': self.delta_f[k, w, t].X}
-            for k in K_zonas for w in self.W for t in self.T if self.delta_f[k, w, t].X > 0.001
+            {'Zona': k, 'Semana': w, 'Temporada': t, 'Delta_f_m3s': delta_f[ik, iw, it]}
+            for ik, k in enumerate(K_zonas) for iw, w in enumerate(self.W) for it, t in enumerate(self.T)
+            if delta_f[ik, iw, it] > 0.001
         ])
         if len(df_delta_f) > 0:
             df_delta_f.to_csv(f"{carpeta_salida}/filtraciones_incrementales.csv", index=False)
         
+        # 10. Balance por nodo de la red (caudal entrante, saliente y residuo)
+        red = self.compilar_red(self.ARCOS_RED)
+        entrante, saliente = red.flujos({
+            'qa': self.parametros.QA[:, :len(self.W), :len(self.T)],
+            'qg': self._solucion_arreglo(self.qg, self.I, self.W, self.T),
+            'qv': self._solucion_arreglo(self.qv, self.I, self.W, self.T),
+            'qer': self._solucion_arreglo(self.qer, self.W, self.T),
+            'qeg': self._solucion_arreglo(self.qeg, self.W, self.T),
+            'qf': self._solucion_arreglo(self.qf, self.W, self.T),
+            'qp': self._solucion_arreglo(self.qp, self.D, self.J, self.W, self.T),
+        })
+        n_nodos, n_w, n_t = entrante.shape
+        df_balance = pd.DataFrame({
+            'Nodo': np.repeat(red.nodos, n_w * n_t),
+            'Semana': np.tile(np.repeat(self.W, n_t), n_nodos),
+            'Temporada': np.tile(self.T, n_nodos * n_w),
+            'Entrante_m3s': entrante.ravel(),
+            'Saliente_m3s': saliente.ravel(),
+            'Residuo_m3s': (entrante - saliente).ravel(),
+        })
+        df_balance.to_csv(f"{carpeta_salida}/balance_nodos.csv", index=False)
+        
         print("✓ Resultados exportados exitosamente")
+    
+    @staticmethod
+    def _valor(x):
+        """Valor en la solución de una variable o de una expresión (alias de reducir=True)"""
+        return x.X if isinstance(x, gp.Var) else x.getValue()
+    
+    def _solucion_arreglo(self, variables, *indices):
+        """Valores X de un tupledict como arreglo con un eje por conjunto de índices"""
+        forma = tuple(len(ind) for ind in indices)
+        claves = indices[0] if len(indices) == 1 else itertools.product(*indices)
+        if all(isinstance(v, gp.Var) for v in variables.values()):
+            valores = self.model.getAttr('X', variables)
+            return np.fromiter((valores[clave] for clave in claves), dtype=np.float64).reshape(forma)
+        return np.fromiter((self._valor(variables[clave]) for clave in claves), dtype=np.float64).reshape(forma)
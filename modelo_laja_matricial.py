@@ -0,0 +1,540 @@
+"""
+Constructor matricial del modelo Laja (misma formulación LaTeX)
+Arma cada familia de restricciones como una matriz dispersa y la agrega con
+addMConstr, en lugar de una llamada a addConstr por restricción
+
+Uso:
+    modelo = ModeloLajaMatricial()
+    modelo.cargar_parametros(parametros)
+    modelo.construir_modelo()
+
+Para verificar que el modelo es idéntico al de ModeloLajaLatex:
+    python3 modelo_laja_matricial.py
+"""
+
+import filecmp
+import itertools
+import os
+import tempfile
+import time
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import scipy.sparse as sp
+
+from modelo_laja_latex import ModeloLajaLatex
+
+
+class _FilasSeccion:
+    """
+    Acumula las filas de una familia de restricciones antes de agregarlas
+
+    Cada llamada a agregar() entrega un grupo de n filas con la misma cantidad
+    de términos. La clave de orden de cada fila reproduce el orden de los
+    ciclos del constructor original, para que el modelo (y el archivo LP)
+    quede fila por fila igual.
+    """
+
+    def __init__(self, n_columnas, con_nombres=True):
+        self.n_columnas = n_columnas
+        self.orden = []
+        self.nombres = [] if con_nombres else None
+        self.sentidos = []
+        self.rhs = []
+        self.filas = []
+        self.columnas = []
+        self.coeficientes = []
+        self.n_filas = 0
+
+    def agregar(self, orden, nombres, sentido, rhs, *terminos):
+        """
+        Args:
+            orden: Arreglo (n, m) de enteros con la clave de orden de cada fila
+            nombres: Lista de n nombres de restricción (None si la sección va sin nombres)
+            sentido: '<', '>' o '='
+            rhs: Escalar o arreglo (n,) con el lado derecho
+            terminos: Tuplas (columnas, coeficientes) o (columnas, coeficientes, activo),
+                      cada una con un término por fila
+        """
+        orden = np.asarray(orden, dtype=np.int64)
+        n = orden.shape[0]
+        filas = np.arange(self.n_filas, self.n_filas + n)
+        for termino in terminos:
+            columnas, coeficientes = termino[0], termino[1]
+            columnas = np.broadcast_to(columnas, (n,))
+            coeficientes = np.broadcast_to(np.asarray(coeficientes, dtype=np.float64), (n,))
+            if len(termino) > 2:
+                activo = np.broadcast_to(termino[2], (n,))
+                self.filas.append(filas[activo])
+                self.columnas.append(columnas[activo])
+                self.coeficientes.append(coeficientes[activo])
+            else:
+                self.filas.append(filas)
+                self.columnas.append(columnas)
+                self.coeficientes.append(coeficientes)
+        self.orden.append(orden)
+        if self.nombres is not None:
+            self.nombres.extend(nombres)
+        self.sentidos.append(np.full(n, sentido))
+        self.rhs.append(np.broadcast_to(np.asarray(rhs, dtype=np.float64), (n,)))
+        self.n_filas += n
+
+    def emitir(self, model, x):
+        """Agrega todas las filas al modelo en un solo addMConstr"""
+        ancho = max(o.shape[1] for o in self.orden)
+        orden = np.vstack([np.pad(o, ((0, 0), (0, ancho - o.shape[1])), constant_values=-1)
+                           for o in self.orden])
+        permutacion = np.lexsort(orden.T[::-1])
+        posicion = np.empty_like(permutacion)
+        posicion[permutacion] = np.arange(len(permutacion))
+
+        # Solo las columnas que aparecen en la sección: addMConstr recorre todo x
+        columnas = np.concatenate(self.columnas)
+        usadas, columnas_locales = np.unique(columnas, return_inverse=True)
+        A = sp.csr_matrix(
+            (np.concatenate(self.coeficientes),
+             (posicion[np.concatenate(self.filas)], columnas_locales)),
+            shape=(self.n_filas, len(usadas)))
+        x = x[usadas]
+        sentidos = np.concatenate(self.sentidos)[permutacion]
+        rhs = np.concatenate(self.rhs)[permutacion]
+        if self.nombres is None:
+            return model.addMConstr(A, x, sentidos, rhs), None
+        nombres = [self.nombres[p] for p in permutacion]
+        return model.addMConstr(A, x, sentidos, rhs, name=nombres), nombres
+
+
+class ModeloLajaMatricial(ModeloLajaLatex):
+    """
+    Misma formulación que ModeloLajaLatex, construida con la API matricial de gurobipy
+
+    Las variables se crean con addMVar (un bloque por familia) y se exponen
+    también como tupledict con las mismas claves y nombres que el constructor
+    original, por lo que exportar_resultados y los scripts de diagnóstico
+    funcionan sin cambios. Las restricciones de cada sección numerada se
+    agregan con un único addMConstr; self.restricciones_matriz guarda el
+    MConstr y los nombres de cada sección.
+
+    Con nombres=False se omiten los nombres de variables y restricciones
+    (Gurobi usa C0, C1, ...), lo que acorta la construcción a cambio de
+    archivos LP/ILP menos legibles.
+    """
+
+    def __init__(self, nombres=True, formulacion_pwl='incremental', bigm='global', reducir=False,
+                 indices_dispersos=False, fijar_alcance=False, acotar_red=False):
+        if formulacion_pwl != 'incremental':
+            raise ValueError("ModeloLajaMatricial solo implementa la formulación 'incremental'; "
+                             "use ModeloLajaLatex para las demás")
+        if reducir or indices_dispersos:
+            raise ValueError("ModeloLajaMatricial no implementa reducir ni indices_dispersos; use ModeloLajaLatex")
+        super().__init__(formulacion_pwl, bigm, reducir, indices_dispersos, fijar_alcance, acotar_red)
+        self.nombres = nombres
+        self.mvars = {}  # nombre -> MVar con forma (|índice 1|, |índice 2|, ...)
+        self._columnas = {}  # nombre -> arreglo de columnas globales con la forma del MVar
+        self.x = None  # MVar 1-D con todas las variables en orden de creación
+        self.restricciones_matriz = {}
+
+    # ---------- Variables ----------
+
+    def _agregar_bloque(self, atributo, nombre, indices, vtype=GRB.CONTINUOUS):
+        """addMVar con los mismos nombres y orden que model.addVars(*indices, name=nombre)"""
+        forma = tuple(len(ind) for ind in indices)
+        claves = list(itertools.product(*indices))
+        if len(indices) == 1:
+            claves = [c[0] for c in claves]
+
+        if self.nombres:
+            if len(indices) == 1:
+                nombres = [f"{nombre}[{c}]" for c in claves]
+            else:
+                nombres = [f"{nombre}[{','.join(map(str, c))}]" for c in claves]
+            mvar = self.model.addMVar(forma, lb=0.0, vtype=vtype,
+                                      name=np.array(nombres, dtype=object).reshape(forma))
+        else:
+            mvar = self.model.addMVar(forma, lb=0.0, vtype=vtype)
+        inicio = self._n_columnas
+        self._n_columnas += mvar.size
+        self.mvars[atributo] = mvar
+        self._columnas[atributo] = np.arange(inicio, self._n_columnas).reshape(forma)
+        setattr(self, atributo, gp.tupledict(zip(claves, mvar.reshape(-1).tolist())))
+
+    def crear_variables(self):
+        """Crea todas las variables (mismo orden y nombres que ModeloLajaLatex)"""
+        print("Creando variables de decisión (Formulación LaTeX, matricial)...")
+
+        K_zonas = self.K[:-1]
+        self._n_columnas = 0
+        W, T, I, D, J = self.W, self.T, self.I, self.D, self.J
+
+        self._agregar_bloque('V', "V", (W, T))
+        self._agregar_bloque('V_30Nov', "V_30Nov", (T,))
+        if 'filtraciones' not in self.curvas_lp:
+            self._agregar_bloque('phi_var', "phi", (K_zonas, W, T), GRB.BINARY)
+        if 'v30' not in self.curvas_lp:
+            self._agregar_bloque('phi_30', "phi_30", (K_zonas, T), GRB.BINARY)
+        self._agregar_bloque('delta_f', "delta_f", (K_zonas, W, T))
+        self._agregar_bloque('delta_v30', "delta_v30", (K_zonas, T))
+        self._agregar_bloque('VR_0', "VR_0", (T,))
+        self._agregar_bloque('VR', "VR", (W, T))
+        self._agregar_bloque('VG_0', "VG_0", (T,))
+        self._agregar_bloque('VG', "VG", (W, T))
+        self._agregar_bloque('qer', "qer", (W, T))
+        self._agregar_bloque('qeg', "qeg", (W, T))
+        self._agregar_bloque('qf', "qf", (W, T))
+        self._agregar_bloque('qg', "qg", (I, W, T))
+        self._agregar_bloque('qv', "qv", (I, W, T))
+        self._agregar_bloque('qp', "qp", (D, J, W, T))
+        self._agregar_bloque('deficit', "deficit", (D, J, W, T))
+        self._agregar_bloque('superavit', "superavit", (D, J, W, T))
+        self._agregar_bloque('eta', "eta", (D, J, W, T), GRB.BINARY)
+        self._agregar_bloque('alpha', "alpha", (W, T), GRB.BINARY)
+        self._agregar_bloque('beta', "beta", (W, T), GRB.BINARY)
+        self._agregar_bloque('delta', "delta", (W, T), GRB.BINARY)
+        self._agregar_bloque('GEN', "GEN", (I, T))
+
+        self.x = gp.hstack([self.mvars[a].reshape(-1) for a in self.mvars])
+
+        print("✓ Variables creadas correctamente")
+        print(f"  Variables totales: {self._n_columnas:,}")
+
+    # ---------- Restricciones ----------
+
+    def _emitir(self, seccion, filas):
+        self.restricciones_matriz[seccion] = filas.emitir(self.model, self.x)
+
+    def _convenio_bigm(self, c, tt, ww, iw, it, nombres):
+        """Sección 9 con big-M (filas en el orden del constructor original)"""
+        filas = _FilasSeccion(self._n_columnas, self.nombres)
+        M = self.M_deficit[:, :, iw]  # (d, j, n) en el orden (t, w)
+        # (canal j, nombre, posición del bloque) en el orden del constructor original
+        canales = [(4, 'abanico', 0), (1, 'riezaco', 3), (2, 'tucapel', 6)]
+        for j, canal, pos in canales:
+            M1 = M[0, j - 1]
+            terminos_alpha = ((c['alpha'][iw, it], M1, M1 != 0),) if j == 4 else ((c['alpha'][iw, it], -M1, M1 != 0),)
+            filas.agregar(np.c_[tt, ww, np.full_like(tt, pos)], nombres(f"bigM_{canal}_1_{{}}_{{}}", ww, tt),
+                          '<', M1 if j == 4 else 0.0,
+                          (c['deficit'][0, j - 1, iw, it], 1.0), (c['eta'][0, j - 1, iw, it], -M1, M1 != 0),
+                          *terminos_alpha)
+            for d in [2, 3]:
+                Md = M[d - 1, j - 1]
+                filas.agregar(np.c_[tt, ww, np.full_like(tt, pos + d - 1)],
+                              nombres(f"bigM_{canal}_{d}_{{}}_{{}}", ww, tt), '<', 0.0,
+                              (c['deficit'][d - 1, j - 1, iw, it], 1.0), (c['eta'][d - 1, j - 1, iw, it], -Md, Md != 0))
+        for d in self.D:
+            Md = M[d - 1, 2]
+            filas.agregar(np.c_[tt, ww, np.full_like(tt, 8 + d)], nombres(f"bigM_saltos_{d}_{{}}_{{}}", ww, tt),
+                          '<', 0.0, (c['deficit'][d - 1, 2, iw, it], 1.0), (c['eta'][d - 1, 2, iw, it], -Md, Md != 0))
+        self._emitir('9', filas)
+
+    def crear_restricciones(self):
+        """Crea todas las restricciones por familia, con una matriz dispersa por sección"""
+        print("\nCreando restricciones (Formulación LaTeX, matricial)...")
+
+        c = self._columnas
+        p = self.parametros
+        n_col = self._n_columnas
+        nK = len(self.K) - 1
+        nW, nT = len(self.W), len(self.T)
+
+        f = np.array([self.f_k[k] for k in self.K], dtype=np.float64)
+        v = np.array([self.v_k[k] for k in self.K], dtype=np.float64)
+        vr = np.array([self.vr_k[k] for k in self.K], dtype=np.float64)
+        vg = np.array([self.vg_k[k] for k in self.K], dtype=np.float64)
+        ancho_f = f[1:] - f[:-1]  # f_{k+1} - f_k
+        ancho_v = v[1:] - v[:-1]  # v_{k+1} - v_k
+        QA = p.QA[:, :nW, :nT]
+        QD = p.QD[:, :, :nW]
+        FS = p.FS[:nW]
+        gamma = p.gamma
+        rho = p.rho
+
+        # Mallas de índices 1-indexados (w, t) y (k, w, t), en el orden de los ciclos "for t: for w:"
+        tt, ww = np.meshgrid(self.T, self.W, indexing='ij')
+        tt, ww = tt.ravel(), ww.ravel()
+        iw, it = ww - 1, tt - 1
+
+        def nombres(patron, *indices):
+            if not self.nombres:
+                return None
+            return [patron.format(*fila) for fila in zip(*indices)]
+
+        # ========== 1. DEFINICIÓN DE FILTRACIONES ==========
+        self.registro.marcar('restricciones.1')
+        print("  1. Definición de filtraciones...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        dK = c['delta_f'][:, iw, it].T  # (n, K-1)
+        filas.agregar(np.c_[tt, ww, np.zeros_like(tt)], nombres("def_qf_{}_{}", ww, tt), '=', f[0],
+                      (c['qf'][iw, it], 1.0),
+                      *[(dK[:, k], -1.0) for k in range(nK)])
+        kk3, tt3, ww3 = (a.ravel() for a in np.meshgrid(self.K[:-1], self.T, self.W, indexing='ij'))
+        ik3, iw3, it3 = kk3 - 1, ww3 - 1, tt3 - 1
+        filas.agregar(np.c_[tt3, ww3, 3 * kk3 - 2], nombres("delta_f_upper_{}_{}_{}", kk3, ww3, tt3),
+                      '<', ancho_f[ik3], (c['delta_f'][ik3, iw3, it3], 1.0))
+        if 'filtraciones' not in self.curvas_lp:
+            filas.agregar(np.c_[tt3, ww3, 3 * kk3 - 1], nombres("delta_f_lower_{}_{}_{}", kk3, ww3, tt3),
+                          '>', 0.0, (c['delta_f'][ik3, iw3, it3], 1.0),
+                          (c['phi_var'][ik3, iw3, it3], -ancho_f[ik3]))
+            sig = kk3 > 1
+            filas.agregar(np.c_[tt3, ww3, 3 * kk3][sig], nombres("delta_f_prev_{}_{}_{}", kk3[sig], ww3[sig], tt3[sig]),
+                          '<', 0.0, (c['delta_f'][ik3, iw3, it3][sig], 1.0),
+                          (c['phi_var'][ik3 - 1, iw3, it3][sig], -ancho_f[ik3][sig]))
+        activo = np.abs(ancho_f) > 1e-6
+        pendiente = np.divide(ancho_v, ancho_f, out=np.zeros_like(ancho_v), where=activo)
+        filas.agregar(np.c_[tt, ww, np.full_like(tt, 3 * nK + 1)], nombres("vol_from_f_{}_{}", ww, tt), '=', v[0],
+                      (c['V'][iw, it], 1.0),
+                      *[(dK[:, k], -pendiente[k], activo[k]) for k in range(nK)])
+        self._emitir('1', filas)
+
+        # ========== 2. DEFINICIÓN DE VOLÚMENES DE RIEGO Y GENERACIÓN (30 NOV) ==========
+        self.registro.marcar('restricciones.2')
+        print("  2. Volúmenes disponibles de riego y generación (30 Nov)...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        filas.agregar([[1]], ["def_V30Nov_1"], '=', self.V_30Nov_1, (c['V_30Nov'][0], 1.0))
+        t_sig = np.array(self.T[1:])
+        filas.agregar(t_sig[:, None], nombres("def_V30Nov_{}", t_sig), '=', 0.0,
+                      (c['V_30Nov'][t_sig - 1], 1.0), (c['V'][31, t_sig - 2], -1.0))
+        self._emitir('2', filas)
+
+        self.registro.marcar('restricciones.2b')
+        print("  2b. Linealización de VR_0 y VG_0 a partir de V_30Nov...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        t1 = np.array(self.T)
+        d30 = c['delta_v30'][:, t1 - 1].T  # (T, K-1)
+        filas.agregar(np.c_[t1, np.zeros_like(t1)], nombres("V30Nov_linearization_{}", t1), '=', v[0],
+                      (c['V_30Nov'][t1 - 1], 1.0), *[(d30[:, k], -1.0) for k in range(nK)])
+        filas.agregar(np.c_[t1, np.ones_like(t1)], nombres("VR0_linearization_{}", t1), '=', vr[0],
+                      (c['VR_0'][t1 - 1], 1.0),
+                      *[(d30[:, k], -((vr[k + 1] - vr[k]) / ancho_v[k])) for k in range(nK)])
+        filas.agregar(np.c_[t1, np.full_like(t1, 2)], nombres("VG0_linearization_{}", t1), '=', vg[0],
+                      (c['VG_0'][t1 - 1], 1.0),
+                      *[(d30[:, k], -((vg[k + 1] - vg[k]) / ancho_v[k])) for k in range(nK)])
+        kk2, tt2 = (a.ravel() for a in np.meshgrid(self.K[:-1], self.T, indexing='ij'))
+        ik2, it2 = kk2 - 1, tt2 - 1
+        filas.agregar(np.c_[tt2, 3 * kk2], nombres("delta_v30_upper_{}_{}", kk2, tt2), '<', ancho_v[ik2],
+                      (c['delta_v30'][ik2, it2], 1.0))
+        if 'v30' not in self.curvas_lp:
+            filas.agregar(np.c_[tt2, 3 * kk2 + 1], nombres("delta_v30_lower_{}_{}", kk2, tt2), '>', 0.0,
+                          (c['delta_v30'][ik2, it2], 1.0), (c['phi_30'][ik2, it2], -ancho_v[ik2]))
+            sig = kk2 > 1
+            filas.agregar(np.c_[tt2, 3 * kk2 + 2][sig], nombres("delta_v30_ordering_{}_{}", kk2[sig], tt2[sig]),
+                          '<', 0.0, (c['delta_v30'][ik2, it2][sig], 1.0),
+                          (c['phi_30'][ik2 - 1, it2][sig], -ancho_v[ik2][sig]))
+        self._emitir('2b', filas)
+
+        # ========== 3. GENERACIÓN EN EL TORO ==========
+        self.registro.marcar('restricciones.3')
+        print("  3. Generación en El Toro...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        filas.agregar(np.c_[tt, ww], nombres("gen_eltoro_{}_{}", ww, tt), '=', 0.0,
+                      (c['qg'][0, iw, it], 1.0), (c['qer'][iw, it], -1.0), (c['qeg'][iw, it], -1.0))
+        self._emitir('3', filas)
+
+        # ========== 3b. BALANCE DE VOLÚMENES POR USO (VR Y VG) ==========
+        self.registro.marcar('restricciones.3b')
+        print("  3b. Balance de volúmenes por uso (VR y VG)...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        # gurobipy divide una expresión multiplicando por el recíproco; se replica para
+        # obtener exactamente los mismos coeficientes que el constructor original
+        coef_fs = FS[iw] * (1 / 1000000)
+        primera = ww == 1
+        for u, (nombre, inicial, extraccion) in enumerate([('VR', 'VR_0', 'qer'), ('VG', 'VG_0', 'qeg')]):
+            prim, resto = primera, ~primera
+            filas.agregar(np.c_[np.zeros_like(tt), tt, ww, np.full_like(tt, u)][prim],
+                          nombres(f"balance_{nombre}_1_{{}}", tt[prim]), '=', 0.0,
+                          (c[nombre][iw, it][prim], 1.0), (c[inicial][it][prim], -1.0),
+                          (c[extraccion][iw, it][prim], coef_fs[prim]))
+            filas.agregar(np.c_[np.zeros_like(tt), tt, ww, np.full_like(tt, u)][resto],
+                          nombres(f"balance_{nombre}_{{}}_{{}}", ww[resto], tt[resto]), '=', 0.0,
+                          (c[nombre][iw, it][resto], 1.0), (c[nombre][iw - 1, it][resto], -1.0),
+                          (c[extraccion][iw, it][resto], coef_fs[resto]))
+            filas.agregar(np.c_[np.ones_like(t1), t1, np.zeros_like(t1), np.full_like(t1, u)],
+                          nombres(f"{nombre}_final_nonneg_{{}}", t1), '>', 0.0, (c[nombre][nW - 1, t1 - 1], 1.0))
+        self._emitir('3b', filas)
+
+        # ========== 4. BALANCE DE VOLUMEN EN EL LAGO ==========
+        self.registro.marcar('restricciones.4')
+        print("  4. Balance de volumen del lago...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        aporte = QA[0, iw, it] * FS[iw] * (1 / 1000000)  # Constante (QA * FS / 10^6)
+        inicio = primera & (tt == 1)
+        filas.agregar(np.c_[tt, ww][inicio], nombres("balance_vol_1{}", tt[inicio]), '<',
+                      self.V_0 + aporte[inicio],
+                      (c['V'][iw, it][inicio], 1.0),
+                      (c['qg'][0, iw, it][inicio], coef_fs[inicio]), (c['qf'][iw, it][inicio], coef_fs[inicio]))
+        arrastre = primera & (tt > 1)
+        filas.agregar(np.c_[tt, ww][arrastre], nombres("balance_vol_1{}", tt[arrastre]), '<',
+                      aporte[arrastre],
+                      (c['V'][iw, it][arrastre], 1.0), (c['V'][nW - 1, it - 1][arrastre], -1.0),
+                      (c['qg'][0, iw, it][arrastre], coef_fs[arrastre]), (c['qf'][iw, it][arrastre], coef_fs[arrastre]))
+        resto = ~primera
+        filas.agregar(np.c_[tt, ww][resto], nombres("balance_vol_{}_{}", ww[resto], tt[resto]), '<',
+                      aporte[resto],
+                      (c['V'][iw, it][resto], 1.0), (c['V'][iw - 1, it][resto], -1.0),
+                      (c['qg'][0, iw, it][resto], coef_fs[resto]), (c['qf'][iw, it][resto], coef_fs[resto]))
+        self._emitir('4', filas)
+        restricciones = self.restricciones_matriz['4'][0].tolist()  # Filas en orden (t, w)
+        self.balance_lago = dict(zip(zip(ww.tolist(), tt.tolist()), restricciones))
+
+        # ========== 5. VOLÚMENES MÍNIMOS Y MÁXIMOS DEL LAGO ==========
+        self.registro.marcar('restricciones.5')
+        print("  5. Volúmenes mínimos y máximos del lago...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        if self.bigm == 'indicador':
+            self._volumenes_indicador()
+        else:
+            filas.agregar(np.c_[np.zeros_like(tt), tt, ww, np.zeros_like(tt)], nombres("vol_min_{}_{}", ww, tt),
+                          '>', self.V_MIN, (c['V'][iw, it], 1.0), (c['beta'][iw, it], self.M_vol_min))
+            filas.agregar(np.c_[np.zeros_like(tt), tt, ww, np.ones_like(tt)], nombres("vol_max_{}_{}", ww, tt),
+                          '<', self.V_MAX, (c['V'][iw, it], 1.0), (c['delta'][iw, it], -self.M_vol_max))
+        filas.agregar([[1, 0, 0, 0]], ["vol_final"], '>', self.V_F, (c['V'][-1, -1], 1.0))
+        self._emitir('5', filas)
+
+        # ========== 6. INCLUSIÓN DE FILTRACIONES ==========
+        self.registro.marcar('restricciones.6')
+        print("  6. Inclusión de filtraciones en Laja...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        filas.agregar(np.c_[tt, ww], nombres("laja_filt_{}_{}", ww, tt), '=', 0.0,
+                      (c['qg'][15, iw, it], 1.0), (c['qf'][iw, it], -1.0))
+        self._emitir('6', filas)
+
+        # ========== 7. BALANCE DE FLUJO EN REDES (Genérico usando ARCOS_RED) ==========
+        self.registro.marcar('restricciones.7')
+        print("  7. Balance de flujo en redes...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        red = self.compilar_red(self.ARCOS_RED)
+        aporte_neto = red.constante(QA)[:, iw, it]  # (n_nodos, n) en el orden (t, w)
+        for n_nodo, nodo in enumerate(self.NODOS_BALANCE):
+            n = red.indice_nodo[nodo]
+            terminos = [(c[familia][tuple(i - 1 for i in prefijo) + (iw, it)], signo)
+                        for familia, prefijo, signo in red.terminos[n]]
+            filas.agregar(np.c_[np.full_like(tt, n_nodo), tt, ww], nombres(f"Balance_{nodo}_{{}}_{{}}", ww, tt),
+                          '=', 0.0 - aporte_neto[n], *terminos)
+        self._emitir('7', filas)
+        restricciones = iter(self.restricciones_matriz['7'][0].tolist())  # Orden (nodo, t, w)
+        self.balance_red = {(nodo, w, t): next(restricciones)
+                            for nodo in self.NODOS_BALANCE for t, w in zip(tt.tolist(), ww.tolist())}
+
+        self.registro.marcar('restricciones.7b')
+        print("  7b. Restricción especial RieSaltos...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        filas.agregar(np.c_[tt, ww], nombres("riesaltos_{}_{}", ww, tt),
+                      '=', 0.0, (c['qp'][2, 2, iw, it], 1.0), (c['qv'][10, iw, it], -1.0))
+        self._emitir('7b', filas)
+
+        # ========== 8. CUMPLIMIENTO DE DEMANDAS DE RIEGO ==========
+        self.registro.marcar('restricciones.8')
+        print("  8. Cumplimiento de demandas de riego...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        t4, w4, d4, j4 = (a.ravel() for a in np.meshgrid(self.T, self.W, self.D, self.J, indexing='ij'))
+        id4, ij4, iw4, it4 = d4 - 1, j4 - 1, w4 - 1, t4 - 1
+        filas.agregar(np.c_[t4, w4, d4, j4], nombres("balance_riego_{}_{}_{}_{}", d4, j4, w4, t4), '=',
+                      -QD[id4, ij4, iw4],
+                      (c['qp'][id4, ij4, iw4, it4], -1.0), (c['deficit'][id4, ij4, iw4, it4], -1.0),
+                      (c['superavit'][id4, ij4, iw4, it4], 1.0))
+        self._emitir('8', filas)
+
+        # ========== 9. ACTIVACIÓN DE PENALIZACIONES POR CONVENIO ==========
+        self.registro.marcar('restricciones.9')
+        print("  9. Activación de penalizaciones por convenio...")
+        if self.bigm == 'indicador':
+            # Restricciones generales: no pasan por la matriz de la sección
+            self._convenio_indicador()
+        else:
+            self._convenio_bigm(c, tt, ww, iw, it, nombres)
+
+        # ========== 10. CAPACIDADES ==========
+        self.registro.marcar('restricciones.10')
+        print("  10. Capacidades de centrales...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        t3, i3, w3 = (a.ravel() for a in np.meshgrid(self.T, self.I, self.W, indexing='ij'))
+        filas.agregar(np.c_[t3, i3, w3], nombres("cap_max_{}_{}_{}", i3, w3, t3), '<', gamma[i3 - 1],
+                      (c['qg'][i3 - 1, w3 - 1, t3 - 1], 1.0))
+        self._emitir('10', filas)
+
+        # ========== 11. DEFINICIÓN DE ENERGÍA GENERADA ==========
+        self.registro.marcar('restricciones.11')
+        print("  11. Definición de energía generada...")
+        filas = _FilasSeccion(n_col, self.nombres)
+        t2, i2 = (a.ravel() for a in np.meshgrid(self.T, self.I, indexing='ij'))
+        filas.agregar(np.c_[t2, i2], nombres("def_energia_{}_{}", i2, t2), '=', 0.0,
+                      (c['GEN'][i2 - 1, t2 - 1], 1.0),
+                      *[(c['qg'][i2 - 1, w, t2 - 1], -(rho[i2 - 1] * FS[w] * (1 / (3600 * 1000)))) for w in range(nW)])
+        self._emitir('11', filas)
+
+        self.registro.cerrar_marca()
+        print("✓ Restricciones creadas correctamente")
+
+    def crear_funcion_objetivo(self):
+        """Función objetivo como vector de costos sobre self.x"""
+        print("\nCreando función objetivo (Formulación LaTeX, matricial)...")
+
+        costos = np.zeros(self._n_columnas)
+        costos[self._columnas['GEN'].ravel()] = 1.0
+        costos[self._columnas['eta'].ravel()] = -self.psi
+        costos[self._columnas['beta'].ravel()] = -self.nu
+        costos[self._columnas['delta'].ravel()] = -self.nu
+        costos[self._columnas['deficit'].ravel()] = -1.0
+        self.model.setObjective(costos @ self.x, GRB.MAXIMIZE)
+
+        print("✓ Función objetivo creada correctamente")
+
+
+def comparar_archivos_lp(modelo_a, modelo_b, carpeta=None):
+    """
+    Escribe ambos modelos en formato LP y los compara byte a byte
+
+    Returns:
+        tuple: (iguales, ruta_a, ruta_b)
+    """
+    carpeta = carpeta or tempfile.mkdtemp(prefix="laja_lp_")
+    ruta_a = os.path.join(carpeta, "modelo_original.lp")
+    ruta_b = os.path.join(carpeta, "modelo_matricial.lp")
+    modelo_a.model.write(ruta_a)
+    modelo_b.model.write(ruta_b)
+    return filecmp.cmp(ruta_a, ruta_b, shallow=False), ruta_a, ruta_b
+
+
+if __name__ == "__main__":
+    import contextlib
+    import difflib
+    import io
+
+    from cargar_datos_5temporadas import cargar_parametros_excel
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        parametros = cargar_parametros_excel()
+
+    tiempos = {}
+    modelos = {}
+    constructores = [
+        ('original', lambda: ModeloLajaLatex(indices_dispersos=False)),
+        ('matricial', ModeloLajaMatricial),
+        ('sin nombres', lambda: ModeloLajaMatricial(nombres=False)),
+    ]
+    for nombre, clase in constructores:
+        modelo = clase()
+        modelo.model.Params.OutputFlag = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            modelo.cargar_parametros(parametros)
+            inicio = time.perf_counter()
+            modelo.construir_modelo()
+        tiempos[nombre] = time.perf_counter() - inicio
+        modelos[nombre] = modelo
+
+    print("\n" + "="*70)
+    print("CONSTRUCTOR MATRICIAL VS ORIGINAL")
+    print("="*70)
+    for nombre, modelo in modelos.items():
+        print(f"  {nombre:<12} {tiempos[nombre]:8.3f} s  {tiempos['original'] / tiempos[nombre]:5.1f}x  "
+              f"({modelo.model.NumVars:,} variables, {modelo.model.NumConstrs:,} restricciones)")
+
+    iguales, ruta_a, ruta_b = comparar_archivos_lp(modelos['original'], modelos['matricial'])
+    if iguales:
+        print("✓ Archivos LP idénticos")
+    else:
+        print("✗ Los archivos LP difieren:")
+        with open(ruta_a) as fa, open(ruta_b) as fb:
+            diferencias = list(difflib.unified_diff(fa.readlines(), fb.readlines(), ruta_a, ruta_b, n=0))
+        print("".join(diferencias[:40]))
+    print("="*70 + "\n")
@@ -1,10 +1,21 @@
 """
 Script principal para optimizar el modelo de 6 temporadas de la cuenca del Laja
 Utiliza la formulación LaTeX con linealización por zonas progresivas
+
+Uso:
+    python optimizar_laja_5temporadas.py [--reanudar] [--cache]
+
+Con --reanudar se parte del último incumbente guardado en el punto de control
+(resultados/punto_control.npz) de una corrida anterior del mismo modelo.
+Con --cache el modelo construido se guarda en cache_modelos/ y se lee de ahí
+en las corridas siguientes con los mismos parámetros y opciones.
 """
 
 from modelo_laja_latex import ModeloLajaLatex
+from modelo_laja_matricial import ModeloLajaMatricial
 from cargar_datos_5temporadas import cargar_parametros_excel
+from instrumentacion import RegistroFases
+import sys
 import time
 
 def main():
@@ -16,26 +27,41 @@ def main():
     print(" "*10 + "Convenio Hidroeléctricas y Riegos")
     print("="*70 + "\n")
     
+    # Registro de tiempos, CPU y memoria por fase (se guarda en resultados/tiempos_fases.json)
+    registro = RegistroFases()
+    
     # 1. Cargar datos desde Excel
     print("PASO 1: Cargando datos desde Excel...")
     print("-" * 70)
-    parametros = cargar_parametros_excel()
+    with registro.fase('carga_excel'):
+        parametros = cargar_parametros_excel()
     
     # 2. Crear instancia del modelo
     print("\n" + "="*70)
     print("PASO 2: Inicializando modelo de optimización...")
     print("-" * 70)
-    modelo = ModeloLajaLatex()
+    # Constructor matricial (addMVar/addMConstr): mismo modelo, construcción ~3x más rápida
+    # (ver modelo_laja_matricial.py)
+    constructor_matricial = False
+    # Lógica de vol_min/vol_max y del convenio: 'global', 'optimalidad' o 'indicador'
+    # (se fija al construir el modelo; ver ModeloLajaLatex.calcular_bigm y comparar_bigm.py)
+    bigm = 'global'
+    modelo = ModeloLajaMatricial(bigm=bigm) if constructor_matricial else ModeloLajaLatex(bigm=bigm)
+    modelo.registro = registro
     
     # 3. Cargar parámetros en el modelo
     print("\nCargando parámetros en el modelo...")
-    modelo.cargar_parametros(parametros)
+    with registro.fase('cargar_parametros'):
+        modelo.cargar_parametros(parametros)
     
     # 4. Construir modelo
     print("\n" + "="*70)
     print("PASO 3: Construyendo modelo matemático...")
     print("-" * 70)
-    modelo.construir_modelo()
+    # Con --cache el modelo construido queda en cache_modelos/ y se reutiliza si los parámetros no cambian
+    carpeta_cache = "cache_modelos" if '--cache' in sys.argv[1:] else None
+    with registro.fase('construir_modelo'):
+        modelo.construir_modelo(carpeta_cache=carpeta_cache)
     
     # 5. Optimizar
     print("\n" + "="*70)
@@ -45,25 +71,54 @@ def main():
     # Configuración de optimización
     tiempo_limite = 3600  # 1 hora
     gap = 0.02  # 2% de optimalidad
+    # Punto de partida con relajar y fijar (None para no usarlo); ver relajar_y_fijar.py
+    inicio_relajar_y_fijar = None  # p. ej. {'semanas_por_bloque': 48, 'time_limit_bloque': 120}
+    # Punto de partida desde los CSV de una corrida anterior (None para no usarlo); ver inicio_resultados.py
+    carpeta_inicio = None  # p. ej. "resultados" para volver a resolver tras cambiar parámetros
+    # Dos etapas: Caso Base con qf fijo como punto de partida (None para no usarlo); ver inicio_caso_base.py
+    inicio_caso_base = None  # p. ej. {'time_limit_base': 300, 'time_limit_reparacion': 120}
+    # Cada incumbente que mejora se guarda aquí; con --reanudar se parte del último (ver puntos_control.py)
+    archivo_control = "resultados/punto_control.npz"
+    reanudar = '--reanudar' in sys.argv[1:]
     
     print(f"\nConfiguración:")
     print(f"  - Tiempo límite: {tiempo_limite} segundos ({tiempo_limite/60:.0f} minutos)")
     print(f"  - Gap de optimalidad: {gap*100:.1f}%")
     print(f"  - Solver: Gurobi")
+    print(f"  - Constructor: {'matricial' if constructor_matricial else 'ModeloLajaLatex'}")
+    print(f"  - Big-M: {bigm}")
+    print(f"  - Relajar y fijar: {'sí' if inicio_relajar_y_fijar is not None else 'no'}")
+    print(f"  - Punto de partida: {carpeta_inicio if carpeta_inicio is not None else 'no'}")
+    print(f"  - Dos etapas (Caso Base): {'sí' if inicio_caso_base is not None else 'no'}")
+    print(f"  - Punto de control: {archivo_control} (reanudar: {'sí' if reanudar else 'no'})")
     print(f"  - Temporadas: {len(modelo.T)}")
     print(f"  - Semanas por temporada: 48")
     print(f"  - Total semanas simuladas: {len(modelo.T) * 48}")
     print()
     
     inicio = time.time()
-    modelo.optimizar(time_limit=tiempo_limite, mip_gap=gap)
+    modelo.optimizar(time_limit=tiempo_limite, mip_gap=gap, inicio_relajar_y_fijar=inicio_relajar_y_fijar,
+                     carpeta_inicio=carpeta_inicio, inicio_caso_base=inicio_caso_base,
+                     archivo_control=archivo_control, reanudar=reanudar)
     tiempo_total = time.time() - inicio
     
     # 6. Exportar resultados
     print("\n" + "="*70)
     print("PASO 5: Exportando resultados...")
     print("-" * 70)
-    modelo.exportar_resultados()
+    with registro.fase('exportar_resultados'):
+        modelo.exportar_resultados()
+    
+    registro.info.update({
+        'variables': modelo.model.NumVars,
+        'restricciones': modelo.model.NumConstrs,
+        'binarias': modelo.model.NumBinVars,
+        'estado': modelo.model.Status,
+        'tiempo_limite_s': tiempo_limite,
+        'mip_gap': gap,
+    })
+    registro.imprimir()
+    ruta_reporte = registro.guardar_json("resultados")
     
     # Resumen final
     print("\n" + "="*70)
@@ -79,6 +134,9 @@ def main():
     print("  ✓ decision_beta.csv - Penalizaciones por umbral mínimo")
     print("  ✓ energia_total.csv - Energía total generada por central y temporada")
     print("  ✓ phi_zonas.csv - Zonas de linealización activadas (formulación LaTeX)")
+    print("  ✓ balance_nodos.csv - Caudal entrante, saliente y residuo por nodo de la red")
+    print(f"  ✓ {ruta_reporte.split('/')[-1]} - Tiempo, CPU y memoria por fase de la corrida")
+    print(f"  ✓ {archivo_control.split('/')[-1]} - Último incumbente (punto de control para reanudar)")
     print("\n" + "="*70 + "\n")
 
 
@@ -87,6 +145,7 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         print("\n\n⚠ Optimización interrumpida por el usuario")
+        print("  El último incumbente queda en el punto de control; se retoma con --reanudar")
     except Exception as e:
         print(f"\n\n❌ ERROR: {e}")
         import traceback
@@ -0,0 +1,280 @@
+"""
+Contenedor de parámetros del modelo Laja respaldado por arreglos NumPy
+Mantiene una vista compatible con el diccionario que entrega cargar_parametros_excel
+"""
+
+import hashlib
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+# Parámetros indexados y significado de cada eje (todos 1-indexados en la vista dict)
+EJES_ARREGLOS = {
+    'FC': ('k',),            # f_k: filtración por zona [m³/s]
+    'VC': ('k',),            # v_k: volumen por zona [hm³]
+    'VUC': ('u', 'k'),       # vr_k (u=1) y vg_k (u=2) [hm³]
+    'QA': ('a', 'w', 't'),   # Afluentes [m³/s], forma (6, 48, T)
+    'QD': ('d', 'j', 'w'),   # Demandas de riego [m³/s], forma (3, 4, 48)
+    'gamma': ('i',),         # Caudal máximo por central [m³/s]
+    'rho': ('i',),           # Rendimiento por central [MW/(m³/s)]
+    'pi': ('i',),            # Potencia máxima por central [MW]
+    'FS': ('w',),            # Factor de segundos por semana [s]
+}
+
+
+class VistaIndexada(MutableMapping):
+    """
+    Vista tipo diccionario sobre un arreglo NumPy con índices 1-indexados
+
+    vista[(a, w, t)] equivale a arreglo[a-1, w-1, t-1] (para arreglos 1-D la
+    clave es un entero). Las posiciones con mascara=False se comportan como
+    claves ausentes, igual que en el diccionario original.
+    """
+
+    def __init__(self, arreglo, mascara=None):
+        self.arreglo = arreglo
+        self.mascara = mascara  # None: todas las posiciones están presentes
+
+    def _posicion(self, clave):
+        indices = clave if isinstance(clave, tuple) else (clave,)
+        if len(indices) != self.arreglo.ndim:
+            raise KeyError(clave)
+        posicion = []
+        for i, n in zip(indices, self.arreglo.shape):
+            try:
+                i_entero = int(i)
+            except (TypeError, ValueError):
+                raise KeyError(clave) from None
+            if i_entero != i or not 1 <= i_entero <= n:
+                raise KeyError(clave)
+            posicion.append(i_entero - 1)
+        return tuple(posicion)
+
+    def __getitem__(self, clave):
+        posicion = self._posicion(clave)
+        if self.mascara is not None and not self.mascara[posicion]:
+            raise KeyError(clave)
+        return float(self.arreglo[posicion])
+
+    def __setitem__(self, clave, valor):
+        posicion = self._posicion(clave)
+        self.arreglo[posicion] = valor
+        if self.mascara is not None:
+            self.mascara[posicion] = True
+
+    def __delitem__(self, clave):
+        posicion = self._posicion(clave)
+        if self.mascara is None:
+            self.mascara = np.ones(self.arreglo.shape, dtype=bool)
+        elif not self.mascara[posicion]:
+            raise KeyError(clave)
+        self.mascara[posicion] = False
+        self.arreglo[posicion] = 0.0
+
+    def __iter__(self):
+        presentes = np.argwhere(self.mascara) if self.mascara is not None else np.ndindex(self.arreglo.shape)
+        for posicion in presentes:
+            if self.arreglo.ndim == 1:
+                yield int(posicion[0]) + 1
+            else:
+                yield tuple(int(p) + 1 for p in posicion)
+
+    def __len__(self):
+        return int(self.mascara.sum()) if self.mascara is not None else self.arreglo.size
+
+    def __repr__(self):
+        return f"VistaIndexada(forma={self.arreglo.shape}, presentes={len(self)})"
+
+
+class ParametrosLaja(MutableMapping):
+    """
+    Parámetros del modelo en arreglos contiguos
+
+    Los parámetros indexados se guardan como atributos NumPy (p.QA tiene forma
+    (6, 48, T), p.QD forma (3, 4, 48), etc.) para poder cortar temporadas o
+    afluentes completos sin búsquedas por clave. El acceso tipo diccionario
+    (p['QA'][(a, w, t)], p.get('V_0')) entrega las mismas claves y valores que
+    el diccionario original, por lo que el código existente sigue funcionando.
+    """
+
+    def __init__(self, escalares=None, arreglos=None, mascaras=None):
+        self.escalares = dict(escalares or {})
+        self._vistas = {}
+        mascaras = mascaras or {}
+        for nombre, arreglo in (arreglos or {}).items():
+            self._fijar_arreglo(nombre, arreglo, mascaras.get(nombre))
+
+    # ---------- Construcción ----------
+
+    @classmethod
+    def desde_dict(cls, dict_parametros):
+        """
+        Construye el contenedor a partir del diccionario clásico (claves tupla)
+
+        La forma de cada arreglo se deduce del índice máximo de cada eje; las
+        posiciones sin clave quedan marcadas como ausentes.
+        """
+        if isinstance(dict_parametros, cls):
+            return dict_parametros
+
+        escalares, arreglos, mascaras = {}, {}, {}
+        for nombre, valor in dict_parametros.items():
+            if not hasattr(valor, 'items'):
+                escalares[nombre] = valor
+                continue
+
+            claves = [c if isinstance(c, tuple) else (c,) for c in valor.keys()]
+            if not claves:
+                arreglos[nombre] = np.zeros((0,) * len(EJES_ARREGLOS.get(nombre, ('k',))))
+                continue
+            posiciones = np.array(claves, dtype=np.int64) - 1
+            if (posiciones < 0).any():
+                raise ValueError(f"Parámetro '{nombre}': los índices deben partir en 1")
+
+            forma = tuple(posiciones.max(axis=0) + 1)
+            arreglo = np.zeros(forma, dtype=np.float64)
+            arreglo[tuple(posiciones.T)] = np.fromiter(valor.values(), dtype=np.float64, count=len(claves))
+            arreglos[nombre] = arreglo
+
+            if len(claves) < arreglo.size:
+                mascara = np.zeros(forma, dtype=bool)
+                mascara[tuple(posiciones.T)] = True
+                mascaras[nombre] = mascara
+
+        return cls(escalares, arreglos, mascaras)
+
+    @classmethod
+    def desde_arreglos(cls, datos):
+        """
+        Reconstruye el contenedor desde el formato plano de a_arreglos()
+        (por ejemplo, el contenido de un archivo .npz)
+        """
+        escalares, arreglos, mascaras = {}, {}, {}
+        for clave in datos.keys():
+            tipo, _, nombre = clave.partition('__')
+            if tipo == 'escalar':
+                escalares[nombre] = datos[clave].item()
+            elif tipo == 'arreglo':
+                arreglos[nombre] = datos[clave]
+            elif tipo == 'mascara':
+                mascaras[nombre] = datos[clave]
+        return cls(escalares, arreglos, mascaras)
+
+    def a_arreglos(self):
+        """
+        Formato plano {clave: np.ndarray} apto para np.savez (sin pickle)
+        """
+        plano = {f'escalar__{n}': np.array(v) for n, v in self.escalares.items()}
+        for nombre, vista in self._vistas.items():
+            plano[f'arreglo__{nombre}'] = vista.arreglo
+            if vista.mascara is not None:
+                plano[f'mascara__{nombre}'] = vista.mascara
+        return plano
+
+    def _fijar_arreglo(self, nombre, arreglo, mascara=None):
+        arreglo = np.ascontiguousarray(arreglo, dtype=np.float64)
+        if mascara is not None:
+            mascara = np.ascontiguousarray(mascara, dtype=bool)
+            if mascara.all():
+                mascara = None
+        setattr(self, nombre, arreglo)
+        self._vistas[nombre] = VistaIndexada(arreglo, mascara)
+
+    def copiar(self):
+        """Copia independiente (arreglos y máscaras incluidos)"""
+        return ParametrosLaja(
+            self.escalares,
+            {n: v.arreglo.copy() for n, v in self._vistas.items()},
+            {n: v.mascara.copy() for n, v in self._vistas.items() if v.mascara is not None})
+
+    def con_afluentes(self, QA):
+        """
+        Nuevo conjunto de parámetros con los afluentes reemplazados, en memoria
+
+        Solo se copia QA (y los escalares); el resto de los arreglos se comparte
+        con el original, por lo que crear un escenario no cuesta más que su QA.
+        Use copiar() antes si se van a modificar otros parámetros del resultado.
+
+        Args:
+            QA: Arreglo (a, w, t) de afluentes del escenario [m³/s]
+        """
+        QA = np.array(QA, dtype=np.float64)  # Copia propia: el escenario no comparte QA
+        if QA.ndim != 3:
+            raise ValueError(f"QA debe tener forma (a, w, t), se recibió {QA.shape}")
+        nuevo = ParametrosLaja(self.escalares)
+        for nombre, vista in self._vistas.items():
+            if nombre != 'QA':
+                setattr(nuevo, nombre, vista.arreglo)
+                nuevo._vistas[nombre] = vista
+        nuevo._fijar_arreglo('QA', QA)
+        return nuevo
+
+    def huella(self):
+        """
+        SHA-256 del contenido (escalares, arreglos y máscaras)
+
+        Dos contenedores con los mismos datos tienen la misma huella, vengan del
+        Excel, del caché .npz o de con_afluentes().
+        """
+        h = hashlib.sha256()
+        for clave, arreglo in sorted(self.a_arreglos().items()):
+            arreglo = np.ascontiguousarray(arreglo)
+            h.update(f"{clave}|{arreglo.dtype.str}|{arreglo.shape}|".encode())
+            h.update(arreglo.tobytes())
+        return h.hexdigest()
+
+    # ---------- Acceso vectorizado ----------
+
+    @property
+    def nombres_arreglos(self):
+        return list(self._vistas)
+
+    def presentes(self, nombre):
+        """Máscara booleana de posiciones con dato para el parámetro indexado"""
+        vista = self._vistas[nombre]
+        if vista.mascara is None:
+            return np.ones(vista.arreglo.shape, dtype=bool)
+        return vista.mascara
+
+    def a_dict(self):
+        """Diccionario clásico (claves tupla) equivalente, para código que necesita un dict real"""
+        resultado = dict(self.escalares)
+        for nombre, vista in self._vistas.items():
+            resultado[nombre] = dict(vista.items())
+        return resultado
+
+    # ---------- Interfaz de diccionario ----------
+
+    def __getitem__(self, nombre):
+        if nombre in self._vistas:
+            return self._vistas[nombre]
+        return self.escalares[nombre]
+
+    def __setitem__(self, nombre, valor):
+        if isinstance(valor, np.ndarray):
+            self._fijar_arreglo(nombre, valor)
+        elif hasattr(valor, 'items'):
+            nuevo = ParametrosLaja.desde_dict({nombre: valor})
+            self._fijar_arreglo(nombre, getattr(nuevo, nombre), nuevo._vistas[nombre].mascara)
+        else:
+            self._vistas.pop(nombre, None)
+            self.escalares[nombre] = valor
+
+    def __delitem__(self, nombre):
+        if nombre in self._vistas:
+            del self._vistas[nombre]
+            delattr(self, nombre)
+        else:
+            del self.escalares[nombre]
+
+    def __iter__(self):
+        yield from self.escalares
+        yield from self._vistas
+
+    def __len__(self):
+        return len(self.escalares) + len(self._vistas)
+
+    def __repr__(self):
+        formas = ', '.join(f"{n}{v.arreglo.shape}" for n, v in self._vistas.items())
+        return f"ParametrosLaja(escalares={list(self.escalares)}, arreglos=[{formas}])"
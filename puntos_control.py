@@ -0,0 +1,111 @@
+"""
+Puntos de control de los incumbentes durante optimizaciones largas
+(ver ModeloLajaLatex.optimizar)
+
+PuntoControl es un callback que, cada vez que Gurobi encuentra una solución
+entera mejor, escribe en un archivo .npz el vector de la solución (en el orden
+de model.getVars()), su objetivo, la cota y el tiempo transcurrido, junto con
+la huella del modelo (ModeloLajaLatex.huella_modelo). La escritura es atómica,
+así que si el proceso muere (Ctrl-C, corte o desalojo de la máquina) el
+archivo queda con el último incumbente completo.
+
+cargar_punto_control vuelve a cargar ese incumbente como MIP start de un
+modelo con la misma huella.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from gurobipy import GRB
+
+
+def guardar_punto_control(ruta, x, objetivo, cota, tiempo_s, huella):
+    """Escribe un punto de control (escritura atómica: temporal + os.replace)"""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, ruta_tmp = tempfile.mkstemp(dir=ruta.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, x=np.asarray(x, dtype=np.float64), objetivo=np.array(objetivo), cota=np.array(cota),
+                     tiempo_s=np.array(tiempo_s), huella=np.array(huella))
+        os.replace(ruta_tmp, ruta)
+    except BaseException:
+        os.remove(ruta_tmp)
+        raise
+
+
+def leer_punto_control(ruta):
+    """
+    Lee un punto de control
+
+    Returns:
+        dict: 'x', 'objetivo', 'cota', 'tiempo_s' y 'huella'
+    """
+    with np.load(ruta) as datos:
+        return {
+            'x': datos['x'],
+            'objetivo': float(datos['objetivo']),
+            'cota': float(datos['cota']),
+            'tiempo_s': float(datos['tiempo_s']),
+            'huella': str(datos['huella']),
+        }
+
+
+def cargar_punto_control(modelo, ruta):
+    """
+    Carga el último incumbente de un punto de control como MIP start
+
+    Args:
+        modelo: ModeloLajaLatex con construir_modelo() ya ejecutado
+        ruta: Archivo del punto de control
+
+    Returns:
+        float: Objetivo del incumbente cargado, o None si no hay punto de
+               control o es de otro modelo
+    """
+    if not Path(ruta).exists():
+        print(f"  Sin punto de control en '{ruta}', se parte sin incumbente")
+        return None
+    punto = leer_punto_control(ruta)
+    modelo.model.update()
+    variables = modelo.model.getVars()
+    if punto['huella'] != modelo.huella_modelo() or len(punto['x']) != len(variables):
+        print(f"  ⚠ El punto de control '{ruta}' es de otro modelo (formulación o parámetros), se ignora")
+        return None
+    modelo.model.setAttr('Start', variables, punto['x'].tolist())
+    print(f"✓ Reanudando desde '{ruta}': objetivo {punto['objetivo']:,.2f} GWh, cota {punto['cota']:,.2f} "
+          f"(guardado a los {punto['tiempo_s']:.1f} s)")
+    return punto['objetivo']
+
+
+class PuntoControl:
+    """
+    Callback que guarda cada incumbente que mejora el objetivo
+
+    Uso:
+        punto_control = PuntoControl(modelo, "resultados/punto_control.npz")
+        modelo.model.optimize(punto_control)
+    """
+
+    def __init__(self, modelo, ruta, tolerancia=1e-9):
+        self.ruta = Path(ruta)
+        self.tolerancia = tolerancia
+        modelo.model.update()
+        self.variables = modelo.model.getVars()
+        self.sentido = modelo.model.ModelSense
+        self.huella = modelo.huella_modelo()
+        self.mejor = None
+        self.guardados = 0
+
+    def __call__(self, model, where):
+        if where != GRB.Callback.MIPSOL:
+            return
+        objetivo = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+        if self.mejor is not None and self.sentido * (self.mejor - objetivo) <= self.tolerancia * max(1.0, abs(objetivo)):
+            return
+        self.mejor = objetivo
+        guardar_punto_control(self.ruta, model.cbGetSolution(self.variables), objetivo,
+                              model.cbGet(GRB.Callback.MIPSOL_OBJBND), model.cbGet(GRB.Callback.RUNTIME), self.huella)
+        self.guardados += 1
@@ -0,0 +1,128 @@
+"""
+Topología compilada de la red de la cuenca del Laja
+Convierte la lista de arcos ARCOS_RED en una incidencia nodo-arco con índices
+enteros, para armar balances y evaluar flujos sin recorrer la lista por nodo
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+
+# Familias de variables/parámetros que pueden aparecer en un arco
+# qa: afluente QA[a]  qg/qv: central i  qer/qeg/qf: caudales del lago  qp_sum: Σ_d qp[d, j]
+FAMILIAS_RED = ('qa', 'qg', 'qv', 'qer', 'qeg', 'qf', 'qp_sum')
+FAMILIAS_SIN_INDICE = ('qer', 'qeg', 'qf')
+
+
+class IncidenciaRed:
+    """
+    Incidencia nodo-arco de ARCOS_RED
+
+    Atributos:
+        nodos: Nodos de balance, en orden de primera aparición en ARCOS_RED
+        arco_nodo, arco_signo, arco_familia, arco_idx: Un elemento por arco
+            (signo +1 entrante, -1 saliente; familia es la posición en
+            FAMILIAS_RED; idx es 0-indexado, -1 en qer/qeg/qf)
+        matrices: familia -> matriz dispersa (n_nodos, n_índices) con el signo
+            de cada arco; qer/qeg/qf tienen una sola columna
+        entradas, salidas: Igual que matrices, separando arcos entrantes y
+            salientes (coeficientes 1)
+        terminos: Por nodo, tupla de (familia, prefijo, signo), donde prefijo es
+            la parte de la clave de la variable antes de (w, t). qp_sum ya viene
+            expandido en un término qp por demanda d.
+    """
+
+    def __init__(self, arcos, demandas=(1, 2, 3)):
+        self.nodos = tuple(dict.fromkeys(arco['nodo'] for arco in arcos))
+        self.indice_nodo = {nodo: n for n, nodo in enumerate(self.nodos)}
+
+        for arco in arcos:
+            if arco['var'] not in FAMILIAS_RED:
+                raise ValueError(f"Arco con variable no reconocida: {arco}")
+            if arco['tipo'] not in ('in', 'out'):
+                raise ValueError(f"Arco con tipo no reconocido: {arco}")
+
+        self.arco_nodo = np.array([self.indice_nodo[a['nodo']] for a in arcos], dtype=np.int64)
+        self.arco_signo = np.array([1.0 if a['tipo'] == 'in' else -1.0 for a in arcos])
+        self.arco_familia = np.array([FAMILIAS_RED.index(a['var']) for a in arcos], dtype=np.int64)
+        self.arco_idx = np.array([a['idx'] - 1 if a['idx'] is not None else -1 for a in arcos], dtype=np.int64)
+
+        self.entradas = {}
+        self.salidas = {}
+        for f, familia in enumerate(FAMILIAS_RED):
+            sel = self.arco_familia == f
+            columnas = np.maximum(self.arco_idx[sel], 0)
+            n_columnas = int(columnas.max()) + 1 if sel.any() else 0
+            for destino, tipo in ((self.entradas, 1.0), (self.salidas, -1.0)):
+                parte = sel & (self.arco_signo == tipo)
+                destino[familia] = sp.csr_matrix(
+                    (np.ones(int(parte.sum())), (self.arco_nodo[parte], np.maximum(self.arco_idx[parte], 0))),
+                    shape=(len(self.nodos), n_columnas))
+        self.matrices = {f: (self.entradas[f] - self.salidas[f]).tocsr() for f in FAMILIAS_RED}
+
+        terminos = [[] for _ in self.nodos]
+        for arco, n, signo in zip(arcos, self.arco_nodo, self.arco_signo):
+            familia, idx = arco['var'], arco['idx']
+            if familia == 'qa':
+                continue  # Parámetro: va al lado derecho (ver constante())
+            if familia == 'qp_sum':
+                terminos[n].extend(('qp', (d, idx), signo) for d in demandas)
+            elif familia in FAMILIAS_SIN_INDICE:
+                terminos[n].append((familia, (), signo))
+            else:
+                terminos[n].append((familia, (idx,), signo))
+        self.terminos = tuple(tuple(t) for t in terminos)
+
+    def __len__(self):
+        return len(self.nodos)
+
+    @staticmethod
+    def _aplicar(matriz, valores):
+        """Σ sobre arcos: matriz (n_nodos, m) por valores (m, ...) -> (n_nodos, ...)"""
+        valores = np.asarray(valores, dtype=np.float64)[:matriz.shape[1]]
+        if matriz.shape[1] == 0:
+            return np.zeros((matriz.shape[0],) + valores.shape[1:])
+        plano = matriz @ valores.reshape(valores.shape[0], -1)
+        return plano.reshape((matriz.shape[0],) + valores.shape[1:])
+
+    def constante(self, QA):
+        """
+        Aporte neto de afluentes por nodo: Σ_entrantes QA - Σ_salientes QA
+
+        Args:
+            QA: Arreglo (a, w, t)
+
+        Returns:
+            np.ndarray (n_nodos, w, t)
+        """
+        return self._aplicar(self.matrices['qa'], QA)
+
+    def flujos(self, valores):
+        """
+        Caudal entrante y saliente por nodo a partir de arreglos de caudales
+
+        Args:
+            valores: dict con 'qa' (a, w, t), 'qg' y 'qv' (i, w, t), 'qer', 'qeg'
+                     y 'qf' (w, t) y 'qp' (d, j, w, t)
+
+        Returns:
+            tuple: (entrante, saliente), cada uno de forma (n_nodos, w, t)
+        """
+        forma = np.shape(valores['qf'])
+        entrante = np.zeros((len(self.nodos),) + forma)
+        saliente = np.zeros((len(self.nodos),) + forma)
+        for familia in FAMILIAS_RED:
+            if familia == 'qp_sum':
+                datos = np.sum(valores['qp'], axis=0)
+            elif familia in FAMILIAS_SIN_INDICE:
+                datos = np.asarray(valores[familia])[None]
+            else:
+                datos = valores[familia]
+            entrante += self._aplicar(self.entradas[familia], datos)
+            saliente += self._aplicar(self.salidas[familia], datos)
+        return entrante, saliente
+
+    def residuo(self, valores):
+        """Entrante - saliente por nodo (cero en una solución que cumple los balances)"""
+        entrante, saliente = self.flujos(valores)
+        return entrante - saliente
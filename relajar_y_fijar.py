@@ -0,0 +1,119 @@
+"""
+Heurística relajar-y-fijar (relax-and-fix) para obtener un punto de partida
+del MIP completo (ver ModeloLajaLatex.optimizar)
+
+El horizonte se divide en bloques de semanas consecutivas. En cada paso las
+binarias (phi, phi_30, eta, alpha, beta, delta y las z de la formulación
+logarítmica) del bloque actual y de los siguientes `bloques_enteros - 1` son
+enteras, las de bloques posteriores se relajan a continuas y las de bloques
+anteriores ya están fijas. Al resolver se fijan las binarias del bloque actual
+y se avanza. El último paso deja todas las binarias fijas, así que su solución
+es factible para el MIP completo y se carga como Start.
+
+Las binarias de phi_30[k,t] (curva del 30 Nov) van con la semana 1 de la
+temporada t. Al terminar se restituyen los tipos y cotas originales.
+"""
+
+import time
+
+import gurobipy as gp
+from gurobipy import GRB
+
+
+FAMILIAS_BINARIAS = ('phi_var', 'phi_30', 'eta', 'alpha', 'beta', 'delta', 'z_f', 'z_30')
+FAMILIAS_SIN_SEMANA = ('phi_30', 'z_30')
+
+
+def bloques_binarias(modelo, semanas_por_bloque):
+    """
+    Binarias del modelo agrupadas por bloque de tiempo
+
+    Returns:
+        list: Por bloque (en orden temporal), la lista de variables binarias
+    """
+    n_bloques_temporada = -(-len(modelo.W) // semanas_por_bloque)
+    bloques = [[] for _ in range(n_bloques_temporada * len(modelo.T))]
+    for familia in FAMILIAS_BINARIAS:
+        for clave, var in getattr(modelo, familia).items():
+            if not isinstance(var, gp.Var):
+                continue  # Entradas omitidas con indices_dispersos
+            t = clave[-1]
+            w = modelo.W[0] if familia in FAMILIAS_SIN_SEMANA else clave[-2]
+            indice = (modelo.T.index(t)) * n_bloques_temporada + modelo.W.index(w) // semanas_por_bloque
+            bloques[indice].append(var)
+    return bloques
+
+
+def relajar_y_fijar(modelo, semanas_por_bloque=48, bloques_enteros=1, time_limit_bloque=120,
+                    mip_gap_bloque=0.01):
+    """
+    Corre relajar-y-fijar sobre un ModeloLajaLatex construido y carga la
+    solución como Start
+
+    Args:
+        modelo: ModeloLajaLatex con construir_modelo() ya ejecutado
+        semanas_por_bloque: Semanas por bloque (48 = una temporada por bloque)
+        bloques_enteros: Bloques que se mantienen enteros en cada paso (el
+            actual más los siguientes como anticipación)
+        time_limit_bloque, mip_gap_bloque: Límites de cada subproblema
+
+    Returns:
+        float: Objetivo de la solución cargada como Start, o None si algún
+               paso no encontró solución (el modelo queda como estaba)
+    """
+    if semanas_por_bloque < 1 or bloques_enteros < 1:
+        raise ValueError("semanas_por_bloque y bloques_enteros deben ser ≥ 1")
+    model = modelo.model
+    model.update()
+    bloques = bloques_binarias(modelo, semanas_por_bloque)
+    binarias = [var for bloque in bloques for var in bloque]
+    originales = {
+        'VType': model.getAttr('VType', binarias),
+        'LB': model.getAttr('LB', binarias),
+        'UB': model.getAttr('UB', binarias),
+    }
+    parametros = {'TimeLimit': model.Params.TimeLimit, 'MIPGap': model.Params.MIPGap}
+
+    print("\n" + "="*70)
+    print("RELAJAR Y FIJAR")
+    print("="*70)
+    print(f"  {len(bloques)} bloques de {semanas_por_bloque} semanas, {bloques_enteros} entero(s) por paso, "
+          f"{len(binarias):,} binarias")
+
+    inicio = time.perf_counter()
+    solucion = None
+    try:
+        model.Params.TimeLimit = time_limit_bloque
+        model.Params.MIPGap = mip_gap_bloque
+        for b, bloque in enumerate(bloques):
+            for j, otro in enumerate(bloques[b:], start=b):
+                tipo = GRB.BINARY if j < b + bloques_enteros else GRB.CONTINUOUS
+                model.setAttr('VType', otro, [tipo] * len(otro))
+            model.optimize()
+            if model.SolCount == 0:
+                print(f"  ⚠ Bloque {b + 1}: sin solución (estado {model.Status}), se descarta la heurística")
+                break
+            valores = [round(x) for x in model.getAttr('X', bloque)]
+            model.setAttr('LB', bloque, valores)
+            model.setAttr('UB', bloque, valores)
+            print(f"  Bloque {b + 1}/{len(bloques)}: objetivo {model.ObjVal:,.2f} ({model.Runtime:.1f} s)")
+        else:
+            variables = model.getVars()
+            solucion = (model.getAttr('X', variables), model.ObjVal)
+    except gp.GurobiError as e:
+        print(f"  ⚠ Error de Gurobi en relajar y fijar: {e}")
+    finally:
+        for atributo, valores in originales.items():
+            model.setAttr(atributo, binarias, valores)
+        model.Params.TimeLimit = parametros['TimeLimit']
+        model.Params.MIPGap = parametros['MIPGap']
+        model.reset()
+
+    if solucion is None:
+        print("="*70 + "\n")
+        return None
+    model.setAttr('Start', model.getVars(), solucion[0])
+    print(f"✓ Punto de partida cargado: objetivo {solucion[1]:,.2f} GWh "
+          f"({time.perf_counter() - inicio:.1f} s)")
+    print("="*70 + "\n")
+    return solucion[1]
@@ -0,0 +1,55 @@
+"""
+Escenarios de Monte Carlo en memoria (sin reescribir Parametros_Nuevos.xlsx)
+"""
+
+import contextlib
+import hashlib
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+
+RAIZ = Path(__file__).resolve().parent.parent
+LIBRO = RAIZ / "Parametros_Nuevos.xlsx"
+
+sys.path.insert(0, str(RAIZ / "Simulacion_MonteCarlo"))
+from aplicar_escenario_montecarlo import escenario_en_memoria  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def parametros():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cargar_parametros_excel(str(LIBRO))
+
+
+def test_escenario_en_memoria_no_toca_la_base(parametros):
+    contenido = hashlib.sha256(LIBRO.read_bytes()).hexdigest()
+    QA_base = parametros.QA.copy()
+    huella = parametros.huella()
+    qa_escenario = np.random.default_rng(0).uniform(0, 200, QA_base.shape)
+
+    escenario = escenario_en_memoria(parametros, qa_escenario)
+    np.testing.assert_array_equal(escenario.QA, qa_escenario)
+    assert escenario['QA'][(2, 10, 3)] == qa_escenario[1, 9, 2]
+    for nombre in parametros.nombres_arreglos:
+        if nombre != 'QA':
+            np.testing.assert_array_equal(getattr(escenario, nombre), getattr(parametros, nombre))
+    assert escenario['V_0'] == parametros['V_0']
+
+    escenario['QA'][(1, 1, 1)] = -1.0
+    qa_escenario[0, 0, 0] = -2.0
+    assert escenario.QA[0, 0, 0] == -1.0  # Copia propia del QA entregado
+    np.testing.assert_array_equal(parametros.QA, QA_base)
+    assert parametros.huella() == huella
+    assert hashlib.sha256(LIBRO.read_bytes()).hexdigest() == contenido
+
+
+def test_escenario_en_memoria_desde_dict(parametros):
+    qa_escenario = parametros.QA * 0.5
+    desde_dict = escenario_en_memoria(parametros.a_dict(), qa_escenario)
+    assert desde_dict.huella() == escenario_en_memoria(parametros, qa_escenario).huella()
+    assert desde_dict.huella() != parametros.huella()
@@ -0,0 +1,137 @@
+"""
+cargar_parametros_excel (lectura por columnas y caché .npz) contra el cargador
+original celda por celda (tests/cargador_referencia.py)
+"""
+
+import contextlib
+import io
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cargar_datos_5temporadas
+from cargar_datos_5temporadas import cargar_parametros_excel
+from tests import cargador_referencia
+
+LIBRO = Path(__file__).resolve().parent.parent / "Parametros_Nuevos.xlsx"
+
+
+def _cargar(funcion, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funcion(*args, **kwargs)
+
+
+def _comparar(obtenido, esperado):
+    assert set(obtenido) == set(esperado)
+    for nombre, valor in esperado.items():
+        if isinstance(valor, dict):
+            assert set(obtenido[nombre]) == set(valor), nombre
+            for clave, v in valor.items():
+                assert obtenido[nombre][clave] == pytest.approx(v, rel=0, abs=1e-12), (nombre, clave)
+        else:
+            assert float(obtenido[nombre]) == pytest.approx(float(valor), rel=0, abs=1e-12), nombre
+
+
+@pytest.fixture(scope="module")
+def referencia():
+    return _cargar(cargador_referencia.cargar_parametros_excel, str(LIBRO))
+
+
+@pytest.fixture
+def libro_temporal(tmp_path):
+    """Copia del libro en una carpeta temporal, para no tocar el caché del repositorio"""
+    copia = tmp_path / LIBRO.name
+    shutil.copy(LIBRO, copia)
+    return copia
+
+
+def test_sin_cache_igual_a_referencia(referencia):
+    _comparar(_cargar(cargar_parametros_excel, str(LIBRO), usar_cache=False).a_dict(), referencia)
+
+
+def test_cache_igual_a_referencia(referencia, libro_temporal):
+    ruta_cache = libro_temporal.with_name(f"{libro_temporal.stem}.cache.npz")
+    generado = _cargar(cargar_parametros_excel, str(libro_temporal))
+    assert ruta_cache.exists()
+    leido = _cargar(cargar_parametros_excel, str(libro_temporal))
+    _comparar(generado.a_dict(), referencia)
+    _comparar(leido.a_dict(), referencia)
+    arreglos_leidos, arreglos_generados = leido.a_arreglos(), generado.a_arreglos()
+    assert set(arreglos_leidos) == set(arreglos_generados)
+    for nombre, arreglo in arreglos_generados.items():
+        np.testing.assert_array_equal(arreglos_leidos[nombre], arreglo)
+
+
+def test_cache_desactualizado_se_regenera(referencia, libro_temporal):
+    ruta_cache = libro_temporal.with_name(f"{libro_temporal.stem}.cache.npz")
+    _cargar(cargar_parametros_excel, str(libro_temporal))
+    with np.load(ruta_cache) as datos:
+        arreglos = {c: datos[c] for c in datos.files}
+    arreglos['__huella__'] = np.array("otra")
+    np.savez(ruta_cache, **arreglos)
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        parametros = cargar_parametros_excel(str(libro_temporal))
+    assert "desde caché" not in salida.getvalue()
+    _comparar(parametros.a_dict(), referencia)
+
+
+def test_nombres_desde_cache_sin_abrir_libro(libro_temporal, monkeypatch):
+    parametros, nombres = _cargar(cargar_datos_5temporadas.cargar_parametros_y_nombres, str(libro_temporal))
+    assert nombres == cargador_referencia.cargar_nombres_centrales(str(LIBRO))
+
+    def sin_excel(*args, **kwargs):
+        raise AssertionError("Se abrió el libro con el caché válido")
+    monkeypatch.setattr(cargar_datos_5temporadas, "abrir_libro", sin_excel)
+    monkeypatch.setattr(cargar_datos_5temporadas.pd, "read_excel", sin_excel)
+    leidos, nombres_leidos = _cargar(cargar_datos_5temporadas.cargar_parametros_y_nombres, str(libro_temporal))
+    assert nombres_leidos == nombres
+    _comparar(leidos.a_dict(), parametros.a_dict())
+
+
+def _escenario(semilla, n_temporadas=2):
+    rng = np.random.default_rng(semilla)
+    filas = [{'Afluente': a, 'Temporada': t, **{f'S{w}': round(rng.uniform(0, 100), 3) for w in range(1, 49)}}
+             for t in range(1, n_temporadas + 1) for a in range(1, 7)]
+    return pd.DataFrame(filas)
+
+
+def _escribir_escenarios(ruta, escenarios):
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        pd.DataFrame({'Nota': ['resumen']}).to_excel(writer, sheet_name='Resumen', index=False)
+        for n, df in escenarios.items():
+            df.to_excel(writer, sheet_name=f'Escenario_{n}', index=False)
+
+
+def test_tensor_de_escenarios_y_su_cache(tmp_path, monkeypatch):
+    ruta = tmp_path / "todos_escenarios.xlsx"
+    escenarios = {n: _escenario(n) for n in (10, 2, 7)}
+    _escribir_escenarios(ruta, escenarios)
+
+    tensor, numeros = _cargar(cargar_datos_5temporadas.cargar_escenarios_afluentes, ruta)
+    assert numeros == [2, 7, 10]
+    assert tensor.shape == (3, 6, 48, 2)
+    for s, n in enumerate(numeros):
+        np.testing.assert_array_equal(tensor[s], cargar_datos_5temporadas.afluentes_desde_escenario(escenarios[n]))
+    assert len(list(tmp_path.glob("*.afluentes.npy"))) == 1
+
+    def sin_excel(*args, **kwargs):
+        raise AssertionError("Se abrió el libro con el caché válido")
+    with monkeypatch.context() as m:
+        m.setattr(cargar_datos_5temporadas.pd, "ExcelFile", sin_excel)
+        mapeado, numeros_cache = _cargar(cargar_datos_5temporadas.cargar_escenarios_afluentes, ruta, memmap=True)
+    assert isinstance(mapeado, np.memmap) and not mapeado.flags.writeable
+    assert numeros_cache == numeros
+    np.testing.assert_array_equal(mapeado, tensor)
+    del mapeado
+
+    escenarios[2] = _escenario(99)
+    _escribir_escenarios(ruta, escenarios)
+    nuevo, _ = _cargar(cargar_datos_5temporadas.cargar_escenarios_afluentes, ruta)
+    np.testing.assert_array_equal(nuevo[0], cargar_datos_5temporadas.afluentes_desde_escenario(escenarios[2]))
+    assert len(list(tmp_path.glob("*.afluentes.npy"))) == 1  # El caché anterior se borra
+    with pytest.raises(ValueError):
+        cargar_datos_5temporadas.cargar_escenarios_afluentes(ruta, usar_cache=False, memmap=True)
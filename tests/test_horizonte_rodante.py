@@ -0,0 +1,30 @@
+"""
+Parámetros de las ventanas del horizonte rodante
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from horizonte_rodante import parametros_ventana
+
+LIBRO = Path(__file__).resolve().parent.parent / "Parametros_Nuevos.xlsx"
+
+
+@pytest.fixture(scope="module")
+def parametros():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cargar_parametros_excel(str(LIBRO))
+
+
+def test_condicion_terminal_solo_en_la_ultima_ventana(parametros):
+    V_F = parametros['V_F']
+    intermedia = parametros_ventana(parametros, 1, 2, parametros['V_0'], parametros['V_30Nov_1'], final=False)
+    final = parametros_ventana(parametros, 5, 2, 3000.0, 3100.0)
+    assert intermedia['V_F'] == intermedia.get('V_MIN', 1400)
+    assert final['V_F'] == V_F
+    assert parametros['V_F'] == V_F  # Los parámetros base no cambian
+    assert final['V_0'] == 3000.0 and final.QA.shape[2] == 2
@@ -0,0 +1,93 @@
+"""
+Ida y vuelta exportar_resultados -> leer_resultados -> completar_valores
+"""
+
+import contextlib
+import copy
+import io
+from pathlib import Path
+
+import gurobipy as gp
+import numpy as np
+import pytest
+from gurobipy import GRB
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from comparar_formulaciones_pwl import resolver_highs
+from inicio_resultados import completar_valores, leer_resultados
+from modelo_laja_latex import ModeloLajaLatex
+
+LIBRO = Path(__file__).resolve().parent.parent / "Parametros_Nuevos.xlsx"
+
+
+class _Valor:
+    """Valor de una variable en una solución, con la interfaz que usa exportar_resultados"""
+
+    def __init__(self, x):
+        self.X = x
+
+    def getValue(self):
+        return self.X
+
+
+@pytest.fixture(scope="module")
+def parametros():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cargar_parametros_excel(str(LIBRO))
+
+
+def _modelo_temporada(parametros, **opciones):
+    modelo = ModeloLajaLatex(**opciones)
+    modelo.model.Params.OutputFlag = 0
+    modelo.T = modelo.T[:1]
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.cargar_parametros(parametros, QA=parametros.QA[:, :, :1])
+        modelo.construir_modelo()
+    return modelo
+
+
+def _exportar(modelo, x, carpeta):
+    """
+    Exporta la solución x (orden de model.getVars()) con exportar_resultados
+
+    La licencia limitada de Gurobi no resuelve el modelo, así que la solución
+    viene de HiGHS: una copia del modelo reemplaza cada variable por su valor y
+    el modelo de Gurobi por uno trivial ya resuelto (exportar_resultados solo
+    mira su estado).
+    """
+    exportador = copy.copy(modelo)
+    for familia in modelo.VARIABLES_MODELO:
+        variables = getattr(modelo, familia)
+        setattr(exportador, familia, gp.tupledict(
+            {c: _Valor(x[v.index]) if isinstance(v, gp.Var) else v for c, v in variables.items()}))
+    exportador.model = gp.Model()
+    exportador.model.Params.OutputFlag = 0
+    exportador.model.addVar()
+    exportador.model.optimize()
+    with contextlib.redirect_stdout(io.StringIO()):
+        exportador.exportar_resultados(str(carpeta))
+
+
+@pytest.mark.parametrize("opciones", [{}, {'formulacion_pwl': 'logaritmica'}])
+def test_leer_y_completar_reproduce_la_solucion(parametros, tmp_path, opciones):
+    modelo = _modelo_temporada(parametros, **opciones)
+    resultado = resolver_highs(modelo.model, 300, 1e-6, con_solucion=True)
+    assert resultado['estado'] == 0, resultado
+    x = resultado['x']
+    _exportar(modelo, x, tmp_path)
+
+    valores, ceros = leer_resultados(tmp_path)
+    completar_valores(modelo, valores, ceros)
+    comparadas = 0
+    for familia in modelo.VARIABLES_MODELO:
+        for clave, var in getattr(modelo, familia).items():
+            if not isinstance(var, gp.Var):
+                continue
+            assert clave in valores.get(familia, {}), (familia, clave)
+            leido = valores[familia][clave]
+            if var.VType == GRB.CONTINUOUS:
+                assert leido == pytest.approx(x[var.index], abs=2e-6), (familia, clave)
+            else:
+                assert round(leido) == round(x[var.index]), (familia, clave)
+            comparadas += 1
+    assert comparadas == modelo.model.NumVars
@@ -0,0 +1,63 @@
+"""
+RegistroFases: fases anidadas, marcas secuenciales y reporte JSON
+"""
+
+import json
+import time
+
+from instrumentacion import RegistroFases
+
+
+def test_fases_anidadas_y_marcas():
+    registro = RegistroFases()
+    with registro.fase('construccion'):
+        registro.marcar('restricciones.1')
+        time.sleep(0.02)
+        registro.marcar('restricciones.2')
+        registro.cerrar_marca()
+        registro.marcar('restricciones.3')  # Queda abierta: la cierra el fin de la fase
+    with registro.fase('optimize'):
+        pass
+
+    rutas = [f['ruta'] for f in registro.fases]
+    assert rutas == ['construccion/restricciones.1', 'construccion/restricciones.2',
+                     'construccion/restricciones.3', 'construccion', 'optimize']
+    assert [f['nivel'] for f in registro.fases] == [1, 1, 1, 0, 0]
+    fases = {f['ruta']: f for f in registro.fases}
+    assert fases['construccion/restricciones.1']['reloj_s'] >= 0.02
+    assert fases['construccion']['reloj_s'] >= sum(
+        fases[f'construccion/restricciones.{n}']['reloj_s'] for n in (1, 2, 3))
+    assert all(f['cpu_s'] >= 0 for f in registro.fases)
+
+
+def test_fase_se_cierra_con_excepcion():
+    registro = RegistroFases()
+    try:
+        with registro.fase('falla'):
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert [f['ruta'] for f in registro.fases] == ['falla']
+    assert not registro._pila
+
+
+def test_registro_inactivo_no_mide():
+    registro = RegistroFases(activo=False)
+    with registro.fase('construccion'):
+        registro.marcar('restricciones.1')
+    registro.cerrar_marca()
+    assert registro.fases == []
+
+
+def test_guardar_json(tmp_path):
+    registro = RegistroFases()
+    registro.info['caso'] = 'prueba'
+    with registro.fase('carga_excel'):
+        pass
+    ruta = registro.guardar_json(tmp_path / 'resultados')
+    with open(ruta, encoding='utf-8') as f:
+        reporte = json.load(f)
+    assert reporte['info'] == {'caso': 'prueba'}
+    assert [f['nombre'] for f in reporte['fases']] == ['carga_excel']
+    assert reporte['reloj_total_s'] >= reporte['fases'][0]['reloj_s']
+    assert {'rss_max_mb', 'rss_incremento_mb', 'cpu_s'} <= set(reporte['fases'][0])
@@ -0,0 +1,246 @@
+"""
+Construcción de ModeloLajaLatex: opciones por omisión e índices dispersos
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import gurobipy as gp
+import numpy as np
+import pytest
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from comparar_formulaciones_pwl import resolver_highs
+from formulaciones_pwl import relajacion_exacta
+from modelo_laja_latex import ModeloLajaLatex
+
+LIBRO = Path(__file__).resolve().parent.parent / "Parametros_Nuevos.xlsx"
+
+
+@pytest.fixture(scope="module")
+def parametros():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cargar_parametros_excel(str(LIBRO))
+
+
+def _modelo(parametros, **opciones):
+    modelo = ModeloLajaLatex(**opciones)
+    modelo.model.Params.OutputFlag = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.cargar_parametros(parametros)
+    return modelo
+
+
+@pytest.fixture(scope="module")
+def optimo_base(parametros):
+    """Óptimo de la primera temporada con las opciones por omisión"""
+    return _optimo(_modelo_temporada(parametros))
+
+
+def _modelo_temporada(parametros, detectar_convexidad=True, **opciones):
+    """Modelo construido con solo la primera temporada (cabe en HiGHS en segundos)"""
+    modelo = ModeloLajaLatex(**opciones)
+    modelo.model.Params.OutputFlag = 0
+    modelo.T = modelo.T[:1]
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.cargar_parametros(parametros, QA=parametros.QA[:, :, :1])
+        modelo.construir_modelo(detectar_convexidad=detectar_convexidad)
+    return modelo
+
+
+def _optimo(modelo):
+    """Óptimo con HiGHS (gap 1e-6)"""
+    resultado = resolver_highs(modelo.model, 300, 1e-6)
+    assert resultado['estado'] == 0, resultado
+    return resultado['objetivo']
+
+
+def test_preprocesamiento_desactivado_por_omision():
+    modelo = ModeloLajaLatex()
+    assert modelo.bigm == 'global'
+    assert not (modelo.indices_dispersos or modelo.fijar_alcance or modelo.acotar_red or modelo.reducir)
+
+
+@pytest.mark.parametrize("indices_dispersos", [False, True])
+def test_crear_variables_sin_construir_modelo(parametros, indices_dispersos):
+    modelo = _modelo(parametros, indices_dispersos=indices_dispersos)
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.crear_variables()
+    riego = len(modelo.D) * len(modelo.J) * len(modelo.W) * len(modelo.T)
+    assert sum(isinstance(v, gp.Var) for v in modelo.qp.values()) == len(modelo.qp_activo)
+    assert sum(isinstance(v, gp.Var) for v in modelo.deficit.values()) == len(modelo.demanda_activa)
+    if indices_dispersos:
+        assert len(modelo.demanda_activa) < riego
+    else:
+        assert len(modelo.qp_activo) == riego
+
+
+def test_cortes_de_usuario_solo_familias_validas(parametros):
+    modelo = _modelo(parametros)
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.construir_modelo()
+        for familia in ('enlace_semanas', 'deficit_eta'):
+            with pytest.raises(ValueError):
+                modelo.agregar_cortes((familia,), 'usuario')
+        modelo.agregar_cortes(('orden_zonas',), 'usuario')
+        assert modelo.agregar_cortes(('deficit_eta',), 'estatico') > 0  # bigm='global': M > QD
+
+
+def test_curvas_generales_se_mantienen_como_mip(parametros):
+    modelo = _modelo(parametros)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert modelo.analizar_curvas() == frozenset()
+
+
+def test_relajacion_exacta_segun_forma_y_sentido():
+    x = [0.0, 1.0, 2.0, 3.0]
+    concava, convexa, lineal = [0.0, 2.0, 3.0, 3.5], [0.0, 0.5, 1.5, 3.5], [1.0, 2.0, 3.0, 4.0]
+    assert relajacion_exacta(x, [concava], (1,)) and relajacion_exacta(x, [convexa], (-1,))
+    assert not relajacion_exacta(x, [concava], (-1,)) and not relajacion_exacta(x, [convexa], (1,))
+    assert relajacion_exacta(x, [lineal], (0,)) and not relajacion_exacta(x, [concava], (0,))
+    assert not relajacion_exacta(x, [concava, convexa], (1, 1))
+
+
+def test_curva_concava_formulada_como_lp_conserva_el_optimo(parametros):
+    concavos = parametros.copiar()
+    v = concavos.VC / concavos.VC.max()
+    concavos.VUC[0] = 600 + 1300 * np.sqrt(v)  # vr_k y vg_k cóncavas: VR_0 y VG_0 nunca conviene bajarlas
+    concavos.VUC[1] = 1200 * np.sqrt(v)
+    lp = _modelo_temporada(concavos)
+    mip = _modelo_temporada(concavos, detectar_convexidad=False)
+    assert lp.curvas_lp == {'v30'} and not lp.phi_30
+    assert lp.model.NumBinVars < mip.model.NumBinVars
+    assert _optimo(lp) == pytest.approx(_optimo(mip), rel=1e-6)
+
+
+def test_calcular_bigm(parametros):
+    M = parametros['M']
+    QD = parametros.QD[:, :, :48]
+
+    modelo = _modelo(parametros, bigm='optimalidad')
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.calcular_bigm()
+    assert modelo.M_vol_min == min(M, modelo.V_MIN)
+    assert modelo.M_vol_max == min(M, modelo.v_k[modelo.K[-1]] - modelo.V_MAX)
+    np.testing.assert_array_equal(modelo.M_deficit, np.minimum(QD, M))
+    assert modelo.M_vol_max < M and (modelo.M_deficit < M).all()
+
+    general = _modelo(parametros, bigm='optimalidad', formulacion_pwl='gurobi')
+    with contextlib.redirect_stdout(io.StringIO()):
+        general.calcular_bigm()
+    assert general.M_vol_max == modelo.M_vol_max  # Las cotas de V reemplazan la extrapolación
+
+    glob = _modelo(parametros)
+    glob.calcular_bigm()
+    assert glob.M_vol_min == glob.M_vol_max == M and (glob.M_deficit == M).all()
+    with pytest.raises(ValueError):
+        ModeloLajaLatex(bigm='ajustado')
+
+
+def test_bigm_de_optimalidad_conserva_el_optimo(parametros, optimo_base):
+    assert _optimo(_modelo_temporada(parametros, bigm='optimalidad')) == pytest.approx(optimo_base, rel=1e-6)
+
+
+def test_reducir_conserva_el_optimo(parametros, optimo_base):
+    modelo = _modelo_temporada(parametros, reducir=True)
+    assert modelo.model.NumVars < _modelo_temporada(parametros).model.NumVars
+    assert optimo_base == pytest.approx(4876.49, abs=0.01)
+    assert _optimo(modelo) == pytest.approx(optimo_base, rel=1e-6)
+
+
+@pytest.mark.parametrize("opciones", [
+    {'fijar_alcance': True},
+    {'fijar_alcance': True, 'reducir': True, 'indices_dispersos': True, 'bigm': 'optimalidad'},
+])
+def test_fijar_alcance_conserva_el_optimo(parametros, optimo_base, opciones):
+    modelo = _modelo_temporada(parametros, **opciones)
+    V_min, V_max = modelo.alcance_V
+    assert np.allclose(V_min / modelo.PASO_ALCANCE, np.round(V_min / modelo.PASO_ALCANCE))
+    assert _optimo(modelo) == pytest.approx(optimo_base, rel=1e-6)
+
+
+@pytest.mark.parametrize("opciones", [
+    {'acotar_red': True},
+    {'acotar_red': True, 'fijar_alcance': True, 'reducir': True, 'indices_dispersos': True, 'bigm': 'optimalidad'},
+])
+def test_acotar_red_conserva_el_optimo(parametros, optimo_base, opciones):
+    assert _optimo(_modelo_temporada(parametros, **opciones)) == pytest.approx(optimo_base, rel=1e-6)
+
+
+def _matrices(model):
+    model.update()
+    variables, restricciones = model.getVars(), model.getConstrs()
+    return {
+        'A': model.getA().tocsr(),
+        'RHS': np.array(model.getAttr('RHS', restricciones)),
+        'Sense': model.getAttr('Sense', restricciones),
+        'LB': np.array(model.getAttr('LB', variables)),
+        'UB': np.array(model.getAttr('UB', variables)),
+        'Obj': np.array(model.getAttr('Obj', variables)),
+    }
+
+
+@pytest.mark.parametrize("opciones", [
+    {},
+    {'reducir': True, 'indices_dispersos': True},
+    {'fijar_alcance': True},
+    {'fijar_alcance': True, 'acotar_red': True},
+])
+def test_actualizar_afluentes_igual_a_reconstruir(parametros, opciones):
+    QA = parametros.QA * np.random.default_rng(3).uniform(0.5, 1.5, parametros.QA.shape)
+    actualizado = _modelo(parametros, **opciones)
+    with contextlib.redirect_stdout(io.StringIO()):
+        actualizado.construir_modelo()
+        actualizado.actualizar_afluentes(QA)
+    reconstruido = _modelo(parametros, **opciones)
+    with contextlib.redirect_stdout(io.StringIO()):
+        reconstruido.cargar_parametros(parametros, QA=QA)
+        reconstruido.construir_modelo()
+
+    obtenido, esperado = _matrices(actualizado.model), _matrices(reconstruido.model)
+    assert obtenido['Sense'] == esperado['Sense']
+    assert abs(obtenido['A'] - esperado['A']).max() == 0
+    for nombre in ('RHS', 'LB', 'UB', 'Obj'):
+        np.testing.assert_allclose(obtenido[nombre], esperado[nombre], rtol=1e-12, atol=1e-12, err_msg=nombre)
+
+
+@pytest.mark.parametrize("opciones", [{}, {'reducir': True, 'indices_dispersos': True}])
+def test_cache_de_modelo_ida_y_vuelta(parametros, tmp_path, opciones):
+    construido = _modelo(parametros, **opciones)
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        construido.construir_modelo(carpeta_cache=tmp_path)
+    assert "Caché de modelo actualizado" in salida.getvalue()
+    leido = _modelo(parametros, **opciones)
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        leido.construir_modelo(carpeta_cache=tmp_path)
+    assert "Modelo cargado desde caché" in salida.getvalue()
+
+    assert (leido.model.NumVars, leido.model.NumConstrs, leido.model.NumBinVars) == \
+           (construido.model.NumVars, construido.model.NumConstrs, construido.model.NumBinVars)
+    construido.model.write(str(tmp_path / "construido.lp"))
+    leido.model.write(str(tmp_path / "leido.lp"))
+    assert (tmp_path / "construido.lp").read_bytes() == (tmp_path / "leido.lp").read_bytes()
+
+    for familia in ModeloLajaLatex.VARIABLES_MODELO:
+        esperado, obtenido = getattr(construido, familia), getattr(leido, familia)
+        assert set(obtenido) == set(esperado), familia
+        for clave, var in esperado.items():
+            if isinstance(var, gp.Var):
+                assert obtenido[clave].VarName == var.VarName and obtenido[clave].index == var.index
+            else:  # Alias de reducir=True o índice omitido: misma expresión
+                assert str(obtenido[clave]) == str(var)
+    for restricciones in ('balance_lago', 'balance_red'):
+        esperado, obtenido = getattr(construido, restricciones), getattr(leido, restricciones)
+        assert {c: r.ConstrName for c, r in obtenido.items()} == {c: r.ConstrName for c, r in esperado.items()}
+
+
+def test_formulacion_gurobi_no_extrapola_las_curvas(parametros):
+    modelo = _modelo_temporada(parametros, formulacion_pwl='gurobi')
+    modelo.model.update()
+    rango = (modelo.v_k[modelo.K[0]], modelo.v_k[modelo.K[-1]])
+    assert modelo.model.NumGenConstrs == len(modelo.V) + 2 * len(modelo.V_30Nov)
+    for var in list(modelo.V.values()) + list(modelo.V_30Nov.values()):
+        assert (var.LB, var.UB) == rango
@@ -0,0 +1,57 @@
+"""
+ModeloLajaMatricial contra ModeloLajaLatex: mismo archivo LP
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from modelo_laja_latex import ModeloLajaLatex
+from modelo_laja_matricial import ModeloLajaMatricial, comparar_archivos_lp
+
+LIBRO = Path(__file__).resolve().parent.parent / "Parametros_Nuevos.xlsx"
+
+
+@pytest.fixture(scope="module")
+def parametros():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cargar_parametros_excel(str(LIBRO))
+
+
+def _construir(clase, parametros, **opciones):
+    modelo = clase(**opciones)
+    modelo.model.Params.OutputFlag = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.cargar_parametros(parametros)
+        modelo.construir_modelo()
+    return modelo
+
+
+@pytest.mark.parametrize("bigm", ['global', 'optimalidad', 'indicador'])
+def test_mismo_archivo_lp(parametros, tmp_path, bigm):
+    original = _construir(ModeloLajaLatex, parametros, bigm=bigm)
+    matricial = _construir(ModeloLajaMatricial, parametros, bigm=bigm)
+    iguales, ruta_a, ruta_b = comparar_archivos_lp(original, matricial, str(tmp_path))
+    assert iguales, f"{ruta_a} y {ruta_b} difieren"
+
+    nombres = lambda restricciones: {c: r.ConstrName for c, r in restricciones.items()}
+    assert nombres(matricial.balance_lago) == nombres(original.balance_lago)
+    assert nombres(matricial.balance_red) == nombres(original.balance_red)
+    assert {c: v.VarName for c, v in matricial.qg.items()} == {c: v.VarName for c, v in original.qg.items()}
+
+
+def test_opciones_no_implementadas():
+    for opciones in ({'formulacion_pwl': 'sos2'}, {'reducir': True}, {'indices_dispersos': True}):
+        with pytest.raises(ValueError):
+            ModeloLajaMatricial(**opciones)
+
+
+def test_actualizar_afluentes_igual_que_el_original(parametros, tmp_path):
+    original = _construir(ModeloLajaLatex, parametros)
+    matricial = _construir(ModeloLajaMatricial, parametros)
+    for modelo in (original, matricial):
+        modelo.actualizar_afluentes(parametros.QA * 0.8)
+    assert comparar_archivos_lp(original, matricial, str(tmp_path))[0]
@@ -0,0 +1,70 @@
+"""
+ParametrosLaja: vista tipo diccionario, formato plano .npz y huella
+"""
+
+import numpy as np
+import pytest
+
+from parametros_laja import ParametrosLaja
+
+
+@pytest.fixture
+def dict_parametros():
+    return {
+        'V_0': 3000.0,
+        'psi': 1000,
+        'FC': {1: 5.0, 2: 10.0, 3: 12.0},
+        'QA': {(a, w, t): 10.0 * a + w + 0.5 * t for a in (1, 2) for w in (1, 2, 3) for t in (1, 2)},
+        'QD': {(1, 1, 1): 4.0, (2, 3, 2): 1.5},  # Con claves ausentes (máscara)
+    }
+
+
+def test_desde_dict_conserva_claves_y_valores(dict_parametros):
+    parametros = ParametrosLaja.desde_dict(dict_parametros)
+    assert parametros.a_dict() == dict_parametros
+    assert parametros.QA.shape == (2, 3, 2)
+    assert parametros.QA[1, 2, 0] == dict_parametros['QA'][2, 3, 1]
+    assert parametros['QD'].get((1, 1, 2)) is None  # Posición sin clave
+    assert (1, 1, 2) not in parametros['QD'] and (2, 3, 2) in parametros['QD']
+    assert parametros.presentes('QD').sum() == 2
+    assert ParametrosLaja.desde_dict(parametros) is parametros
+
+
+def test_a_arreglos_ida_y_vuelta(dict_parametros):
+    parametros = ParametrosLaja.desde_dict(dict_parametros)
+    plano = parametros.a_arreglos()
+    assert all(isinstance(v, np.ndarray) and v.dtype != object for v in plano.values())
+    assert 'mascara__QD' in plano and 'mascara__QA' not in plano
+    leido = ParametrosLaja.desde_arreglos(plano)
+    assert leido.a_dict() == dict_parametros
+    assert leido.huella() == parametros.huella()
+
+
+def test_huella_sigue_al_contenido(dict_parametros):
+    parametros = ParametrosLaja.desde_dict(dict_parametros)
+    huella = parametros.huella()
+    assert ParametrosLaja.desde_dict(dict(dict_parametros)).huella() == huella
+
+    copia = parametros.copiar()
+    copia['QA'][1, 1, 1] = 99.0
+    assert copia.huella() != huella
+    assert parametros.huella() == huella  # copiar() no comparte arreglos
+
+    sin_clave = parametros.copiar()
+    sin_clave['QD'][(1, 1, 2)] = 0.0  # Mismo arreglo, otra máscara
+    assert sin_clave.huella() != huella
+
+    escalar = parametros.copiar()
+    escalar['V_0'] = 3000.5
+    assert escalar.huella() != huella
+
+
+def test_con_afluentes_solo_copia_QA(dict_parametros):
+    parametros = ParametrosLaja.desde_dict(dict_parametros)
+    QA = parametros.QA * 2
+    escenario = parametros.con_afluentes(QA)
+    np.testing.assert_array_equal(escenario.QA, QA)
+    assert escenario.QA is not QA and escenario.FC is parametros.FC
+    np.testing.assert_array_equal(parametros.QA, QA / 2)
+    with pytest.raises(ValueError):
+        parametros.con_afluentes(QA[0])
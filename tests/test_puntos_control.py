@@ -0,0 +1,82 @@
+"""
+Puntos de control: escritura atómica, lectura y carga como MIP start
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+from gurobipy import GRB
+
+from cargar_datos_5temporadas import cargar_parametros_excel
+from modelo_laja_latex import ModeloLajaLatex
+from puntos_control import cargar_punto_control, guardar_punto_control, leer_punto_control
+
+LIBRO = Path(__file__).resolve().parent.parent / "Parametros_Nuevos.xlsx"
+
+
+@pytest.fixture(scope="module")
+def parametros():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cargar_parametros_excel(str(LIBRO))
+
+
+def _modelo_temporada(parametros, **opciones):
+    modelo = ModeloLajaLatex(**opciones)
+    modelo.model.Params.OutputFlag = 0
+    modelo.T = modelo.T[:1]
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.cargar_parametros(parametros, QA=parametros.QA[:, :, :1])
+        modelo.construir_modelo()
+    modelo.model.update()
+    return modelo
+
+
+def _start(modelo):
+    modelo.model.update()
+    return np.array(modelo.model.getAttr('Start', modelo.model.getVars()))
+
+
+def test_guardar_y_leer_punto_control(tmp_path):
+    ruta = tmp_path / "control" / "punto_control.npz"
+    x = np.linspace(0.0, 1.0, 7)
+    guardar_punto_control(ruta, x, 4876.5, 4890.1, 12.5, "abc")
+    guardar_punto_control(ruta, x * 2, 4880.0, 4889.0, 20.0, "abc")  # Reemplaza al anterior
+
+    punto = leer_punto_control(ruta)
+    np.testing.assert_array_equal(punto['x'], x * 2)
+    assert (punto['objetivo'], punto['cota'], punto['tiempo_s'], punto['huella']) == (4880.0, 4889.0, 20.0, "abc")
+    assert [p.name for p in ruta.parent.iterdir()] == ["punto_control.npz"]  # Sin temporales
+
+
+def test_cargar_punto_control_como_start(parametros, tmp_path):
+    modelo = _modelo_temporada(parametros)
+    ruta = tmp_path / "punto_control.npz"
+    x = np.random.default_rng(0).uniform(0, 10, modelo.model.NumVars)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert cargar_punto_control(modelo, ruta) is None  # Sin archivo
+    guardar_punto_control(ruta, x, 4876.5, 4890.1, 12.5, modelo.huella_modelo())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert cargar_punto_control(modelo, ruta) == 4876.5
+    np.testing.assert_array_equal(_start(modelo), x)
+
+
+@pytest.mark.parametrize("cambio", ['huella', 'largo'])
+def test_cargar_punto_control_de_otro_modelo(parametros, tmp_path, cambio):
+    modelo = _modelo_temporada(parametros)
+    ruta = tmp_path / "punto_control.npz"
+    if cambio == 'huella':
+        otro = _modelo_temporada(parametros, bigm='optimalidad')  # Mismas variables, otras filas
+        assert otro.model.NumVars == modelo.model.NumVars
+        guardar_punto_control(ruta, np.ones(modelo.model.NumVars), 1.0, 2.0, 3.0, otro.huella_modelo())
+    else:
+        guardar_punto_control(ruta, np.ones(modelo.model.NumVars - 1), 1.0, 2.0, 3.0, modelo.huella_modelo())
+
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        assert cargar_punto_control(modelo, ruta) is None
+    assert "es de otro modelo" in salida.getvalue()
+    assert (_start(modelo) == GRB.UNDEFINED).all()
@@ -0,0 +1,84 @@
+"""
+IncidenciaRed contra el recorrido arco por arco de ARCOS_RED
+"""
+
+import numpy as np
+import pytest
+
+from modelo_laja_latex import ModeloLajaLatex
+from red_laja import IncidenciaRed
+
+
+def _valores(semilla, n_w=48, n_t=2):
+    rng = np.random.default_rng(semilla)
+    return {
+        'qa': rng.uniform(0, 50, (6, n_w, n_t)),
+        'qg': rng.uniform(0, 50, (16, n_w, n_t)),
+        'qv': rng.uniform(0, 50, (16, n_w, n_t)),
+        'qer': rng.uniform(0, 50, (n_w, n_t)),
+        'qeg': rng.uniform(0, 50, (n_w, n_t)),
+        'qf': rng.uniform(0, 50, (n_w, n_t)),
+        'qp': rng.uniform(0, 50, (3, 4, n_w, n_t)),
+    }
+
+
+def _residuo_por_arcos(arcos, valores):
+    """Balance de cada nodo sumando arco por arco (como el modelo antes de IncidenciaRed)"""
+    nodos = list(dict.fromkeys(a['nodo'] for a in arcos))
+    residuo = np.zeros((len(nodos),) + valores['qf'].shape)
+    for a in arcos:
+        if a['var'] == 'qp_sum':
+            caudal = valores['qp'][:, a['idx'] - 1].sum(axis=0)
+        elif a['idx'] is None:
+            caudal = valores[a['var']]
+        else:
+            caudal = valores[a['var']][a['idx'] - 1]
+        residuo[nodos.index(a['nodo'])] += caudal if a['tipo'] == 'in' else -caudal
+    return residuo
+
+
+@pytest.fixture(scope="module")
+def arcos():
+    return ModeloLajaLatex().ARCOS_RED
+
+
+def test_residuo_igual_al_recorrido_de_arcos(arcos):
+    red = IncidenciaRed(arcos)
+    valores = _valores(0)
+    np.testing.assert_allclose(red.residuo(valores), _residuo_por_arcos(arcos, valores), rtol=0, atol=1e-9)
+    entrante, saliente = red.flujos(valores)
+    assert (entrante >= 0).all() and (saliente >= 0).all()
+
+
+def test_terminos_mas_constante_igual_al_residuo(arcos):
+    red = IncidenciaRed(arcos)
+    valores = _valores(1)
+    esperado = red.constante(valores['qa'])
+    for n, terminos in enumerate(red.terminos):
+        for familia, prefijo, signo in terminos:
+            indice = tuple(i - 1 for i in prefijo)
+            esperado[n] += signo * valores[familia][indice]
+    np.testing.assert_allclose(red.residuo(valores), esperado, rtol=0, atol=1e-9)
+
+
+def test_residuo_nulo_si_se_cumplen_los_balances():
+    arcos = [
+        {'nodo': 'Lago', 'tipo': 'in', 'var': 'qa', 'idx': 1},
+        {'nodo': 'Lago', 'tipo': 'out', 'var': 'qg', 'idx': 1},
+        {'nodo': 'Lago', 'tipo': 'out', 'var': 'qf', 'idx': None},
+        {'nodo': 'Canal', 'tipo': 'in', 'var': 'qg', 'idx': 1},
+        {'nodo': 'Canal', 'tipo': 'out', 'var': 'qp_sum', 'idx': 2},
+    ]
+    red = IncidenciaRed(arcos)
+    valores = _valores(2, n_w=3, n_t=1)
+    valores['qg'][0] = valores['qp'][:, 1].sum(axis=0)
+    valores['qa'][0] = valores['qg'][0] + valores['qf']
+    assert red.nodos == ('Lago', 'Canal')
+    np.testing.assert_allclose(red.residuo(valores), 0.0, atol=1e-9)
+
+
+def test_arco_no_reconocido():
+    with pytest.raises(ValueError):
+        IncidenciaRed([{'nodo': 'X', 'tipo': 'in', 'var': 'qz', 'idx': 1}])
+    with pytest.raises(ValueError):
+        IncidenciaRed([{'nodo': 'X', 'tipo': 'entra', 'var': 'qg', 'idx': 1}])
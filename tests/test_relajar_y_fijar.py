@@ -0,0 +1,86 @@
+"""
+Relajar y fijar: bloques de binarias, Start y restitución de tipos y cotas
+"""
+
+import contextlib
+import io
+from types import SimpleNamespace
+
+import gurobipy as gp
+import pytest
+from gurobipy import GRB
+
+from relajar_y_fijar import FAMILIAS_BINARIAS, bloques_binarias, relajar_y_fijar
+
+
+def _modelo_juguete(infactible=False):
+    """
+    Modelo pequeño con la estructura que usa relajar_y_fijar (binarias alpha
+    por semana y phi_30 por temporada), resoluble con la licencia limitada
+    """
+    W, T = [1, 2, 3, 4], [1, 2]
+    model = gp.Model()
+    model.Params.OutputFlag = 0
+    modelo = SimpleNamespace(model=model, W=W, T=T, **{familia: gp.tupledict() for familia in FAMILIAS_BINARIAS})
+    modelo.alpha = model.addVars(W, T, vtype=GRB.BINARY, name="alpha")
+    modelo.phi_30 = model.addVars([1, 2], T, vtype=GRB.BINARY, name="phi_30")
+    x = model.addVars(W, T, name="x")
+    model.addConstrs((x[w, t] <= 2.5 * modelo.alpha[w, t] for w in W for t in T), name="activa")
+    model.addConstrs((modelo.alpha.sum('*', t) <= 2 + modelo.phi_30.sum('*', t) for t in T), name="cupo")
+    model.addConstr(modelo.phi_30.sum() <= 1, name="ampliacion")
+    if infactible:
+        model.addConstr(modelo.alpha[4, 2] >= 2, name="imposible")
+    model.setObjective(x.sum() - 0.5 * modelo.phi_30.sum(), GRB.MAXIMIZE)
+    # Cotas fijadas antes de la heurística (como las de fijar_alcance), se deben conservar
+    modelo.alpha[1, 1].LB = 1
+    modelo.phi_30[2, 2].UB = 0
+    model.Params.TimeLimit = 50
+    model.update()
+    return modelo
+
+
+def _estado(modelo):
+    variables = modelo.model.getVars()
+    return {atributo: modelo.model.getAttr(atributo, variables) for atributo in ('VType', 'LB', 'UB')}
+
+
+def test_bloques_binarias():
+    modelo = _modelo_juguete()
+    bloques = bloques_binarias(modelo, semanas_por_bloque=2)
+    nombres = [sorted(v.VarName for v in bloque) for bloque in bloques]
+    assert len(bloques) == 4
+    assert nombres[0] == sorted(["alpha[1,1]", "alpha[2,1]", "phi_30[1,1]", "phi_30[2,1]"])
+    assert nombres[3] == sorted(["alpha[3,2]", "alpha[4,2]"])
+
+
+def test_restituye_tipos_y_cotas_y_carga_start():
+    modelo = _modelo_juguete()
+    original = _estado(modelo)
+    with contextlib.redirect_stdout(io.StringIO()):
+        objetivo = relajar_y_fijar(modelo, semanas_por_bloque=2, time_limit_bloque=10, mip_gap_bloque=0)
+    assert objetivo is not None
+    assert _estado(modelo) == original
+    assert (modelo.model.Params.TimeLimit, modelo.model.Params.MIPGap) == (50, 1e-4)
+
+    # El Start es una solución del MIP completo con el objetivo informado
+    modelo.model.update()
+    variables = modelo.model.getVars()
+    start = dict(zip(variables, modelo.model.getAttr('Start', variables)))
+    assert all(start[v] == round(start[v]) for v in variables if v.VType == GRB.BINARY)
+    assert start[modelo.alpha[1, 1]] == 1 and start[modelo.phi_30[2, 2]] == 0
+    assert sum(v.Obj * start[v] for v in variables) == pytest.approx(objetivo)
+    valores = [start[v] for v in variables]
+    modelo.model.setAttr('LB', variables, valores)
+    modelo.model.setAttr('UB', variables, valores)
+    modelo.model.optimize()
+    assert modelo.model.Status == GRB.OPTIMAL and modelo.model.ObjVal == pytest.approx(objetivo)
+
+
+def test_sin_solucion_restituye_y_no_carga_start():
+    modelo = _modelo_juguete(infactible=True)
+    original = _estado(modelo)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert relajar_y_fijar(modelo, semanas_por_bloque=2, time_limit_bloque=10) is None
+    assert _estado(modelo) == original
+    modelo.model.update()
+    assert all(s == GRB.UNDEFINED for s in modelo.model.getAttr('Start', modelo.model.getVars()))
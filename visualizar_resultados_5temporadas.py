@@ -703,14 +703,13 @@ for j in J:
 print("\n7. Generando gráfico de generación por central...")
 
 # Cargar nombres de centrales desde Excel
-from cargar_datos_5temporadas import cargar_parametros_excel, cargar_nombres_centrales
+from cargar_datos_5temporadas import cargar_parametros_y_nombres
 
-# Cargar nombres de centrales
-nombres_centrales = cargar_nombres_centrales()
+# Cargar nombres de centrales y parámetros (una sola apertura del libro)
+parametros, nombres_centrales = cargar_parametros_y_nombres()
 print(f"  Nombres de centrales cargados: {len(nombres_centrales)} centrales")
 
 # Cargar datos de rendimiento para filtrar centrales con rho > 0
-parametros = cargar_parametros_excel()
 rho = parametros['rho']  # Diccionario {i: rendimiento}
 
 # Filtrar centrales con rendimiento > 0